@@ -19,13 +19,14 @@ import sys
 
 from magiconfig import ArgumentParser, MagiConfigOptions
 
-from pdf_parsers import process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic
-from pdf_parsers import process_file_table_no_lines_term_lastname_firstname_institution_laboratory
-from pdf_parsers import process_file_table_with_lines_name_institution_laboratory_term
-from pdf_parsers import process_file_table_with_lines_name_institution_laboratory_area
+from ingest_manifest import IngestManifest, MANIFEST_PATH
+from layout_detection import plan_input_files
+from layout_detection import wdts_programs
+from page_cache import page_cache
 from person import get_people, save_people
 from plotter import plot_map
-from utilities import filter_people_by_topic
+from school_registry import school_registry
+from utilities import filter_people_by_topic, get_peak_memory_usage
 
 def wdts_scraper(argv = None):
     """The main function for this scrip
@@ -46,17 +47,41 @@ def wdts_scraper(argv = None):
     all options using the command line:
         `python3 WDTSscraper.py -f data/WDTS-SULI-CCI-VFP-Summer-2021.pdf -t VFP -y 2021`
 
+    detecting the programs and years of a directory of files:
+        `python3 WDTSscraper.py -f data/SULI/`
+
     using a magiconfig file:
         `python3 python/WDTSscraper.py -C python/configs/config_all-programs_2021.py`"""
     )
+    parser.add_argument("-c", "--char-columns", action = "store_true",
+                        help = "Split the columns of the tables without dividing lines using the positions of the characters, with the\n"
+                               "column boundaries learned from the first page of each file, instead of the spacing of the text (default=%(default)s)")
     parser.add_argument("-d", "--debug", action = "store_true",
                         help="Shows some extra information in order to debug this program (default=%(default)s)")
     parser.add_argument("-f", "--files", nargs = "+",
-                        help = "The absolute paths to the files to scrape (default=%(default)s)")
+                        help = "The absolute paths to the files, or to directories of PDF files, to scrape (default=%(default)s)")
     parser.add_argument("-F", "--formats", nargs = "+", default = ["png"], choices = ["png", "pdf", "ps", "eps", "svg"],
                         help = "List of formats with which to save the resulting map (default=%(default)s)")
     parser.add_argument("-i", "--interactive", action = "store_true",
                         help = "Show the plot during program execution (default=%(default)s)")
+    parser.add_argument("-I", "--incremental", action = "store_true",
+                        help = "Only parse the PDF files which are new or have changed since the last incremental run. The people found\n"
+                               f"in the other files are read back from the shards listed in {MANIFEST_PATH} (default=%(default)s)")
+    parser.add_argument("-j", "--jobs", type = int, default = 1,
+                        help = "The number of processes used to parse the PDF files (default=%(default)s)")
+    parser.add_argument("-J", "--page-jobs", type = int, default = 1,
+                        help = "The number of processes used to extract the pages of each PDF file. When the files are parsed by several\n"
+                               "processes (-j), it's capped at the number of CPUs divided by the number of file processes (default=%(default)s)")
+    parser.add_argument("-L", "--low-memory", action = "store_true",
+                        help = "Release the objects of each page as soon as it's extracted and reopen the PDF files every few pages,\n"
+                               "trading some speed for a bounded memory use. The peak memory use is reported at the end (default=%(default)s)")
+    parser.add_argument("-m", "--max-school-memory", type = float, default = None,
+                        help = "The maximum memory, in MB, used to hold the postsecondary school databases. The least recently used\n"
+                               "years, and then the least recently used school names of all the years, are unloaded when the limit is reached\n"
+                               "(default=%(default)s)")
+    parser.add_argument("--no-cache", action = "store_true",
+                        help = "Do not read or write the on-disk caches of the school databases, the institution resolutions,\n"
+                               "and the rows extracted from the PDF files (default=%(default)s)")
     parser.add_argument("-n", "--no-lines", action = "store_true",
                         help = "Do not plot the lines connecting the home institutions and the national laboratories (default=%(default)s)")
     parser.add_argument("-N", "--no-draw", action = "store_true",
@@ -65,14 +90,20 @@ def wdts_scraper(argv = None):
                         help = "Directory in which to save the resulting maps (default=%(default)s)")
     parser.add_argument("-s", "--save-list-of-people", action = "store_true",
                         help = "Save a serialized list of people to a text file (default=%(default)s)")
+    parser.add_argument("--save-format", default = "txt", choices = ["txt", "jsonl", "npz"],
+                        help = "The format of the saved list of people. The jsonl files (JSON Lines) are written and read one person at a\n"
+                               "time and the npz archives (NumPy) are much faster to read back than the text files. All of them can be given\n"
+                               "as input files (default=%(default)s)")
     parser.add_argument("-S", "--strict-filtering", action = "store_true",
                         help = "More tightly filter out participants by removing those whose topic is unknown (default=%(default)s)")
-    parser.add_argument("-t", "--types", choices = ["VFP", "SULI", "CCI", "SCGSR"], nargs = "+",
-                        help = "A list of the types of files being processed (default=%(default)s)")
+    parser.add_argument("-t", "--types", choices = wdts_programs, nargs = "+",
+                        help = "A list of the types of files being processed. Detected from the first page of each PDF file if not given\n"
+                               "(default=%(default)s)")
     parser.add_argument("-T", "--filter-by-topic", action = "store_true",
                         help = "Filter the participants by topic if the topic is available (default=%(default)s)")
     parser.add_argument("-y", "--years", nargs = "+", type = int,
-                        help = "A list of years to help determine how to process each file (default=%(default)s)")
+                        help = "A list of years to help determine how to process each file. Detected from the first page of each PDF\n"
+                               "file if not given (default=%(default)s)")
     args = parser.parse_args(args = argv)
 
     if args.debug:
@@ -83,44 +114,16 @@ def wdts_scraper(argv = None):
     if args.files is None:
         raise ValueError("You must specify at least one file to process.")
 
-    if any(len(lst) != len(args.files) for lst in [args.types, args.years]):
-        raise ValueError(f"The number of files ({len(args.files)}), types ({len(args.types)}), and years ({len(args.years)}) must be the same.")
-
-    process_file_map = {
-      ('VFP', 2021): process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic,
-      ('VFP', 2020): process_file_table_no_lines_term_lastname_firstname_institution_laboratory,
-      ('VFP', 2019): process_file_table_with_lines_name_institution_laboratory_term,
-      ('VFP', 2018): process_file_table_with_lines_name_institution_laboratory_term,
-      ('VFP', 2017): process_file_table_with_lines_name_institution_laboratory_term,
-      ('VFP', 2016): process_file_table_with_lines_name_institution_laboratory_term,
-      ('VFP', 2015): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2021): process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic,
-      ('SULI', 2020): process_file_table_no_lines_term_lastname_firstname_institution_laboratory,
-      ('SULI', 2019): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2018): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2017): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2016): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2015): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SULI', 2014): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2021): process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic,
-      ('CCI', 2020): process_file_table_no_lines_term_lastname_firstname_institution_laboratory,
-      ('CCI', 2019): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2018): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2017): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2016): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2015): process_file_table_with_lines_name_institution_laboratory_term,
-      ('CCI', 2014): process_file_table_with_lines_name_institution_laboratory_term,
-      ('SCGSR', 2021): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2020): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2019): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2018): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2017): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2016): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2015): process_file_table_with_lines_name_institution_laboratory_area,
-      ('SCGSR', 2014): process_file_table_with_lines_name_institution_laboratory_area,
-    }
-
-    people = get_people(args.files, args.types, args.years, process_file_map, args.debug)
+    args.files, args.types, args.years, process_file_map = plan_input_files(args.files, args.types, args.years)
+
+    school_registry.use_cache = not args.no_cache
+    page_cache.enabled = not args.no_cache
+    if args.max_school_memory is not None:
+        school_registry.max_memory = int(args.max_school_memory * 1024 * 1024)
+
+    people = get_people(args.files, args.types, args.years, process_file_map, args.debug, jobs = args.jobs,
+                        manifest = IngestManifest() if args.incremental else None, page_jobs = args.page_jobs,
+                        low_memory = args.low_memory, char_engine = args.char_columns)
 
     if args.filter_by_topic:
         people = filter_people_by_topic(people, strict = args.strict_filtering, topics = ["HEP", "High Energy Physics"])
@@ -139,5 +142,10 @@ def wdts_scraper(argv = None):
     if args.save_list_of_people:
         save_people(args, people)
 
+    if args.low_memory or args.debug:
+        peak, peak_children = get_peak_memory_usage()
+        if peak is not None:
+            print(f"Peak memory use: {peak:.1f} MB (largest worker process: {peak_children:.1f} MB)")
+
 if __name__ == "__main__":
     wdts_scraper()
@@ -0,0 +1,189 @@
+#!/bin/env python3
+
+"""char_columns
+
+This module contains an extraction engine for the tables without dividing lines which works directly on the characters
+of a page instead of on its rendered text. The column boundaries are inferred once per file from a histogram of the x
+coordinates covered by the characters of the first page: a boundary is placed in the middle of each vertical strip which
+is empty on (nearly) every line and wider than a normal space. The characters of each page are then assigned to their
+line and column in a single vectorized NumPy pass, so the cells no longer depend on how many spaces separate them.
+
+Constants
+---------
+char_column_settings : dict
+    The tuning parameters of the engine, which are part of the signature of the layouts using it
+
+Functions
+---------
+char_arrays
+    Return the coordinates and the text of the visible characters of a page, sorted by line and then by position
+extract_rows_no_lines_program
+    Extract the rows of a page of a table with no dividing lines and a program column using the learned columns
+extract_rows_no_lines_term
+    Extract the rows of a page of a table with no dividing lines and a term column using the learned columns
+learn_columns
+    Infer the column boundaries of a table with no dividing lines from the characters of the first page
+split_chars
+    Assign the characters of a page to lines and cells and return the text of the non-empty cells of each line
+"""
+
+import numpy as np
+
+char_column_settings = {
+    # the characters whose tops are within this distance, in points, are on the same line
+    "line_tolerance" : 3,
+    # a space is inserted between two characters separated by more than this fraction of the median character width
+    "word_gap" : 0.25,
+    # the minimum width, in median character widths, of an empty strip separating two columns
+    "min_gap" : 1.5,
+    # the largest fraction of the lines allowed to cross a column boundary (i.e. titles)
+    "max_occupancy" : 0.1,
+}
+
+def char_arrays(page):
+    """Return the coordinates and the text of the visible characters of a page, sorted by line and then by position
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to read
+
+    Returns
+    -------
+    tuple
+        The numpy arrays of the left edge, right edge, and line number of each character, the list of their text, and
+        the median width of the characters
+    """
+
+    chars = [char for char in page.chars if char["text"].strip()]
+    if not chars:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype = int), [], 0.0
+
+    lefts = np.array([char["x0"] for char in chars], dtype = float)
+    rights = np.array([char["x1"] for char in chars], dtype = float)
+    top = np.array([char["top"] for char in chars], dtype = float)
+
+    # start a new line wherever the gap between two consecutive tops is larger than the tolerance
+    by_top = np.argsort(top, kind = "stable")
+    line = np.empty(len(chars), dtype = int)
+    line[by_top] = np.concatenate([[0], np.cumsum(np.diff(top[by_top]) > char_column_settings["line_tolerance"])])
+
+    order = np.lexsort((lefts, line))
+    return lefts[order], rights[order], line[order], [chars[i]["text"] for i in order], float(np.median(rights - lefts))
+
+def extract_rows_no_lines_program(page, ipage, columns = None):
+    """Extract the rows of a page of a table with no dividing lines and a program column using the learned columns
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to extract
+    ipage : int
+        The (zero-based) number of the page
+    columns : list, optional
+        The x coordinates of the column boundaries (see learn_columns)
+
+    Returns
+    -------
+    list
+        The rows of the page, each of which is a list of strings
+    """
+
+    rows = split_chars(page, columns)
+    return rows[3:] if ipage == 0 else rows
+
+def extract_rows_no_lines_term(page, ipage, columns = None): # pylint: disable=unused-argument
+    """Extract the rows of a page of a table with no dividing lines and a term column using the learned columns
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to extract
+    ipage : int
+        The (zero-based) number of the page
+    columns : list, optional
+        The x coordinates of the column boundaries (see learn_columns)
+
+    Returns
+    -------
+    list
+        The non-blank rows of the page, each of which is a list of strings
+    """
+
+    return split_chars(page, columns)
+
+def learn_columns(page):
+    """Infer the column boundaries of a table with no dividing lines from the characters of the first page
+
+    Each character adds one to the bins of a 1 point wide histogram covered by its extent. Since the characters of a
+    line don't overlap, each bin then counts the lines which have text at that x coordinate.
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+
+    Returns
+    -------
+    list
+        The x coordinates of the column boundaries, from left to right
+    """
+
+    lefts, rights, line, _, width = char_arrays(page)
+    if len(lefts) == 0:
+        return []
+
+    left = int(np.floor(lefts.min()))
+    coverage = np.zeros(int(np.ceil(rights.max())) - left + 1, dtype = int)
+    np.add.at(coverage, np.floor(lefts - left).astype(int), 1)
+    np.add.at(coverage, np.ceil(rights - left).astype(int), -1)
+    empty = np.cumsum(coverage)[:-1] <= char_column_settings["max_occupancy"] * (line.max() + 1)
+
+    # find the runs of empty bins which are wide enough to separate two columns
+    edges = np.diff(np.concatenate([[0], empty.astype(int), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    wide = ends - starts >= char_column_settings["min_gap"] * width
+    return [float(left + (start + end) / 2) for start, end in zip(starts[wide], ends[wide])]
+
+def split_chars(page, columns = None):
+    """Assign the characters of a page to lines and cells and return the text of the non-empty cells of each line
+
+    A line containing a word which straddles a column boundary (i.e. a title) is kept as a single cell.
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to split
+    columns : list, optional
+        The x coordinates of the column boundaries (see learn_columns)
+
+    Returns
+    -------
+    list
+        The lines of the page, each of which is a list of strings
+    """
+
+    lefts, rights, line, text, width = char_arrays(page)
+    if len(lefts) == 0:
+        return []
+
+    column = np.searchsorted(np.asarray(columns if columns else [], dtype = float), (lefts + rights) / 2)
+    new_line = np.concatenate([[True], line[1:] != line[:-1]])
+    new_word = new_line | np.concatenate([[True], lefts[1:] - rights[:-1] > char_column_settings["word_gap"] * width])
+
+    # merge the cells of the lines containing a word which straddles a column boundary
+    word_starts = np.flatnonzero(new_word)
+    straddles = np.minimum.reduceat(column, word_starts) != np.maximum.reduceat(column, word_starts)
+    column[np.isin(line, line[word_starts[straddles]])] = 0
+
+    new_cell = new_line | np.concatenate([[True], column[1:] != column[:-1]])
+    pieces = [(" " if word and not cell else "") + char for char, word, cell in zip(text, new_word, new_cell)]
+    cell_starts = np.flatnonzero(new_cell)
+    cell_lines = line[cell_starts]
+
+    rows = []
+    for icell, (start, end) in enumerate(zip(cell_starts, np.append(cell_starts[1:], len(pieces)))):
+        if icell == 0 or cell_lines[icell] != cell_lines[icell - 1]:
+            rows.append([])
+        rows[-1].append("".join(pieces[start : end]))
+    return rows
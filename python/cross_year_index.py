@@ -0,0 +1,228 @@
+#!/bin/env python3
+
+"""cross_year_index
+
+This module contains the index used to look up the names of the postsecondary schools which are missing from their
+own year of school information in all of the other available years. The union of the names of every year is only
+built the first time a name is missing, and it can be stored on disk as a compact table with one row per name and
+year, so that the shapefiles of the other years don't need to be loaded again.
+
+Classes
+----------
+CrossYearIndex
+    Maps the names of the postsecondary schools of every available year to their records, for the names missing from one year
+
+Functions
+---------
+entry_size
+    Return the estimated size, in bytes, of the records of a name
+"""
+
+from collections import OrderedDict
+import sys
+
+import pandas as pd
+
+from institution import load_schools
+from institution import normalize_institution_name
+from institution import school_schema
+from institution import SchoolIndex
+from school_cache import read_cache
+from school_cache import write_cache
+
+class CrossYearIndex:
+    """A lookup table which maps the names of the postsecondary schools of every available year to their records.
+
+    Schools close, merge, and get renamed, so a name missing from one year of school information can often be found
+    in a neighbouring year. The union of the names of all the years is built the first time a name is looked up, and
+    each name keeps at most one record per year, so finding the record of the nearest year is a single dictionary
+    access followed by a comparison of a handful of years. The records of the years whose SchoolIndex is already
+    loaded are reused, and the union can be stored on disk as a compact table so that the shapefiles of the other
+    years don't need to be loaded again. To fit within a memory cap, the least recently used names can be dropped. The
+    union is then built again the first time a dropped name is looked up.
+
+    Attributes
+    ----------
+    years : list
+        The years of school information to include
+    loader : callable
+        A function returning the normalized table of schools (see load_schools) for a given year
+    indexes : dict
+        A dict of {int : SchoolIndex} containing the indexes already loaded, whose records are reused (None if there
+        are none)
+    cache_path : str
+        The location of the compact table of all the years (None to disable the on-disk table, which is the default)
+    signature : str
+        A string which changes whenever the source shapefiles change, used to validate the on-disk table
+    records : OrderedDict
+        A dict of {str : tuple} mapping each normalized name to a tuple of (year, record) pairs, ordered from the least
+        to the most recently used name (None until built)
+    complete : bool
+        False if some of the names were dropped from the records (see shrink)
+    size : int
+        The estimated size of the records in bytes (0 until built)
+
+    Methods
+    -------
+    build
+        Build the union of the school names, reading it from the on-disk table when it's up to date, unless it's complete
+    clear
+        Remove the records from memory, they're built again the next time a name is looked up
+    find(home_institution, year)
+        Returns the (year, record) pair from the year nearest to the given year, or None if the name is unknown
+    memory_usage
+        Returns the estimated size of the records in bytes
+    shrink(max_memory)
+        Drops the least recently used names until the records fit within max_memory
+    """
+
+    def __init__(self, years, loader = None, indexes = None, cache_path = None, signature = None):
+        """This method initializes the data members of the CrossYearIndex class.
+
+        Parameters
+        ----------
+        years : list
+            The years of school information to include
+        loader : callable, optional
+            A function returning the normalized table of schools for a given year (default is load_schools)
+        indexes : dict, optional
+            A dict of {int : SchoolIndex} containing the indexes already loaded, whose records are reused
+        cache_path : str, optional
+            The location of the compact table of all the years (None to disable the on-disk table)
+        signature : str, optional
+            A string which changes whenever the source shapefiles change, used to validate the on-disk table
+        """
+
+        self.years = sorted(years)
+        self.loader = loader if loader is not None else load_schools
+        self.indexes = indexes
+        self.cache_path = cache_path
+        self.signature = signature
+        self.records = None
+        self.complete = False
+        self.size = 0
+
+    def __len__(self):
+        """Return the number of unique school names in the index"""
+
+        return len(self.build())
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"CrossYearIndex({self.years})"
+
+    def build(self):
+        """Build the union of the school names, reading it from the on-disk table when it's up to date, unless it's complete
+
+        The names dropped by shrink are restored. When the on-disk table is missing or out of date, the records of
+        each year are taken from its loaded SchoolIndex, or from a temporary one, and the on-disk table (one row per
+        name and year) is written for the next time.
+
+        Returns
+        -------
+        dict
+            A dict of {str : tuple} mapping each normalized name to a tuple of (year, record) pairs
+        """
+
+        if self.records is not None and self.complete:
+            return self.records
+
+        table = read_cache(self.cache_path, self.signature) if self.cache_path is not None else None
+        records = {}
+        if table is not None:
+            for key, year, *record in zip(*(table[column].tolist() for column in ["key", "year", *school_schema])):
+                records.setdefault(key, []).append((year, tuple(record)))
+        else:
+            for year in self.years:
+                index = self.indexes.get(year) if self.indexes is not None else None
+                for name, record in (index if index is not None else SchoolIndex(self.loader(year), year)).records.items():
+                    records.setdefault(name, []).append((year, record))
+            if self.cache_path is not None:
+                rows = [(name, year, *record) for name, entries in records.items() for year, record in entries]
+                try:
+                    write_cache(self.cache_path, pd.DataFrame(rows, columns = ["key", "year", *school_schema]), self.signature)
+                except OSError as error:
+                    print(f"WARNING::Unable to write the cross-year school table {self.cache_path} ({error})")
+
+        self.records = OrderedDict((name, tuple(entries)) for name, entries in records.items())
+        self.complete = True
+        self.size = sys.getsizeof(self.records) + sum(entry_size(name, entries) for name, entries in self.records.items())
+        return self.records
+
+    def clear(self):
+        """Remove the records from memory, they're built again the next time a name is looked up"""
+
+        self.records = None
+        self.complete = False
+        self.size = 0
+
+    def find(self, home_institution, year):
+        """Return the record of a school from the year nearest to the given year
+
+        When two years are equally close, the later one is used.
+
+        Parameters
+        ----------
+        home_institution : str
+            The name of the school to look up
+        year : int
+            The year the postsecondary school information was collected
+
+        Returns
+        -------
+        tuple
+            A (year, record) pair, where the record is a (name, city, state, latitude, longitude) tuple,
+            or None if the name isn't in any year
+        """
+
+        name = normalize_institution_name(home_institution)
+        entries = self.records.get(name) if self.records is not None else None
+        if entries is None and not self.complete:
+            entries = self.build().get(name)
+        if entries is None:
+            return None
+        self.records.move_to_end(name)
+        return min(entries, key = lambda entry: (abs(entry[0] - year), -entry[0]))
+
+    def memory_usage(self):
+        """Return the estimated size of the records in bytes (0 if they aren't built)"""
+
+        return self.size
+
+    def shrink(self, max_memory):
+        """Drop the least recently used names until the records fit within max_memory
+
+        Parameters
+        ----------
+        max_memory : int
+            The maximum estimated size, in bytes, of the records
+        """
+
+        while self.records and self.size > max_memory:
+            name, entries = self.records.popitem(last = False)
+            self.size -= entry_size(name, entries)
+            self.complete = False
+        if self.records is not None and not self.records:
+            self.clear()
+
+def entry_size(name, entries):
+    """Return the estimated size, in bytes, of the records of a name
+
+    Parameters
+    ----------
+    name : str
+        The normalized name of the school
+    entries : tuple
+        The (year, record) pairs of the name
+
+    Returns
+    -------
+    int
+        The estimated size of the name and its records
+    """
+
+    size = sys.getsizeof(name) + sys.getsizeof(entries)
+    for entry in entries:
+        size += sys.getsizeof(entry) + sys.getsizeof(entry[1]) + sum(sys.getsizeof(item) for item in entry[1])
+    return size
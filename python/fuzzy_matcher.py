@@ -0,0 +1,205 @@
+#!/bin/env python3
+
+"""fuzzy_matcher
+
+This module contains a fuzzy matching engine for the names of institutions. The names are normalized (case, punctuation,
+and common spelling variations like "St." and "Saint") and broken up into character trigrams. An inverted index from
+each trigram to the names containing it is built once, so a query only has to score the few names which share one of
+its rarer trigrams instead of comparing against every name in the database.
+
+Constants
+---------
+name_substitutions : list
+    A list of (regex, str) pairs applied, in order, to the lowercase name of an institution during normalization
+
+Classes
+----------
+FuzzyMatcher
+    Finds the names most similar to a query using an inverted index of character trigrams
+
+Functions
+---------
+normalize_name
+    Put the name of an institution into the canonical form used for fuzzy matching
+trigrams
+    Return the set of character trigrams of a normalized name
+"""
+
+from collections import defaultdict
+import math
+import re
+
+name_substitutions = [
+    (re.compile(r"[‐–—]"), "-"),
+    (re.compile(r"&"), " and "),
+    (re.compile(r"\bst\.?(?=\s)"), "saint"),
+    (re.compile(r"\bft\.?(?=\s)"), "fort"),
+    (re.compile(r"\bmt\.?(?=\s)"), "mount"),
+    (re.compile(r"\buniv\.?(?=\s|$)"), "university"),
+    (re.compile(r"\s+at\s+|\s*[-/|:,]\s*"), " "),
+    (re.compile(r"[^a-z0-9 ]"), ""),
+    (re.compile(r"^the\s+"), ""),
+    (re.compile(r"\s+"), " "),
+]
+
+class FuzzyMatcher:
+    """A class which finds the names most similar to a query using an inverted index of character trigrams.
+
+    The similarity score is a weighted Dice coefficient of the trigrams of the two normalized names, where each trigram
+    is weighted by its inverse document frequency. Trigrams shared by many names (like those in "university") count for
+    little, which keeps names such as "University of Alabama" and "University of Alaska" apart. The score is between 0
+    (nothing in common) and 1 (the normalized names are identical).
+
+    Attributes
+    ----------
+    names : list
+        The original names which can be matched
+    exact : dict
+        A dict of {str : int} mapping each normalized name to the position of the first name with that normalized form
+    grams : list
+        The set of trigrams of each name
+    norms : list
+        The sum of the trigram weights of each name
+    index : dict
+        A dict of {str : list} mapping each trigram to the positions of the names which contain it
+    weights : dict
+        A dict of {str : float} containing the inverse document frequency of each trigram
+    unseen_weight : float
+        The weight given to the trigrams of a query which aren't in any of the names
+    max_postings : int
+        The trigrams contained in more names than this are not used to find candidates (but still count in the score)
+
+    Methods
+    -------
+    match(query, limit = 5, min_score = 0.0)
+        Returns a list of (name, score) tuples for the names most similar to the query, ordered by decreasing score
+    """
+
+    def __init__(self, names, max_postings = 250):
+        """This method builds the inverted index.
+
+        Parameters
+        ----------
+        names : iterable
+            The names which can be matched
+        max_postings : int, optional
+            The trigrams contained in more names than this are not used to find candidates
+        """
+
+        self.names = list(names)
+        self.max_postings = max_postings
+        self.exact = {}
+        self.grams = []
+        self.index = defaultdict(list)
+
+        for position, name in enumerate(self.names):
+            normalized = normalize_name(name)
+            self.exact.setdefault(normalized, position)
+            grams = trigrams(normalized)
+            self.grams.append(grams)
+            for gram in grams:
+                self.index[gram].append(position)
+
+        total = len(self.names) + 1
+        self.weights = {gram : math.log(total / len(positions)) for gram, positions in self.index.items()}
+        self.norms = [sum(self.weights[gram] for gram in grams) for grams in self.grams]
+        self.unseen_weight = math.log(total)
+
+    def __len__(self):
+        """Return the number of names in the index"""
+
+        return len(self.names)
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"FuzzyMatcher({len(self)} names, {len(self.index)} trigrams)"
+
+    def match(self, query, limit = 5, min_score = 0.0):
+        """Return the names most similar to the query
+
+        Parameters
+        ----------
+        query : str
+            The name to look for
+        limit : int, optional
+            The maximum number of matches to return
+        min_score : float, optional
+            The matches with a lower score are not returned
+
+        Returns
+        -------
+        list
+            A list of (name, score) tuples ordered by decreasing score
+        """
+
+        normalized = normalize_name(query)
+        if normalized in self.exact:
+            return [(self.names[self.exact[normalized]], 1.0)]
+
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+        query_weights = {gram : self.weights.get(gram, self.unseen_weight) for gram in query_grams}
+        query_norm = sum(query_weights.values())
+
+        # only the rarer trigrams are used to find the candidates, unless the query contains nothing else
+        candidates = set()
+        for gram in query_grams:
+            positions = self.index.get(gram, [])
+            if len(positions) <= self.max_postings:
+                candidates.update(positions)
+        if not candidates:
+            for gram in query_grams:
+                candidates.update(self.index.get(gram, []))
+
+        scores = []
+        for position in candidates:
+            shared = sum(query_weights[gram] for gram in query_grams & self.grams[position])
+            score = 2.0 * shared / (query_norm + self.norms[position])
+            if score >= min_score:
+                scores.append((score, position))
+        scores.sort(key = lambda item: (-item[0], item[1]))
+
+        return [(self.names[position], score) for score, position in scores[:limit]]
+
+def normalize_name(name):
+    """Put the name of an institution into the canonical form used for fuzzy matching
+
+    Parameters
+    ----------
+    name : str
+        The name of the institution
+
+    Returns
+    -------
+    str
+        The lowercase name with the punctuation removed and the common spelling variations replaced
+    """
+
+    normalized = name.lower()
+    for pattern, replacement in name_substitutions:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip()
+
+def trigrams(normalized):
+    """Return the set of character trigrams of a normalized name
+
+    Each word is padded with a space on both sides, so that the beginnings and ends of words form their own trigrams.
+
+    Parameters
+    ----------
+    normalized : str
+        The normalized name of the institution (see normalize_name)
+
+    Returns
+    -------
+    set
+        The set of character trigrams
+    """
+
+    grams = set()
+    for word in normalized.split():
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
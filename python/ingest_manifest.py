@@ -0,0 +1,291 @@
+#!/bin/env python3
+
+"""ingest_manifest
+
+This module contains the manifest used to ingest the PDF files incrementally. Every time a PDF file is parsed for a
+program and a year, the people found in it are written to a shard (a text file in the format of save_people) and the
+manifest records the path of the file, the hash of its content, the parser and the options used, the signatures of the
+code and data the people depend on, the number of people found, and the location of the shard. On the next run, the
+files whose content, parser, options, and signatures haven't changed are not parsed again: their people are read
+back from the shards and merged, in the order of the input files, with the people of the new or changed files. Adding
+a new year of PDF files to a long list of historical ones then only costs the parsing of the new files.
+
+Constants
+---------
+MANIFEST_PATH : str
+    The default location of the manifest
+RESULT_OPTIONS : list
+    The names of the parser options which change the people found in a file (the others only change how fast the
+    files are parsed)
+result_modules : list
+    The modules, besides the layouts and the name resolution, whose content changes the people found in a file
+
+Classes
+----------
+IngestManifest
+    Keeps track of the PDF files already parsed and of the shards containing their people
+
+Functions
+---------
+entry_key
+    Return the key of the entry of the manifest for a file, program, and year
+result_options
+    Return the options passed to a parser which change the people found in a file
+"""
+
+import hashlib
+import json
+import os
+
+from magiconfig import MagiConfig
+
+from layout_detection import layout_parsers
+from page_cache import file_digest
+from pdf_parsers import pdf_layouts
+from person import read_header, read_people, write_people
+from resolution_cache import code_signature
+from school_registry import school_registry
+
+MANIFEST_PATH = "data/.cache/manifest.json"
+RESULT_OPTIONS = ["char_engine"]
+result_modules = ["laboratory.py", "person.py", "row_repairs.py"]
+
+class IngestManifest:
+    """A class which keeps track of the PDF files already parsed and of the shards containing their people.
+
+    The manifest is a JSON file containing one entry per file, program, and year. The shards are stored in the 'shards'
+    directory next to the manifest.
+
+    Attributes
+    ----------
+    path : str
+        The location of the manifest
+    entries : dict
+        A dict of {str : dict} containing the path, hash, parser, options, signatures, row count, and shard of each
+        parsed file, program, and year
+    digests : dict
+        A dict of {str : str} containing the hash of each of the files looked up during this run
+    signatures : dict
+        A dict of {(str, int, bool) : dict} containing the signatures of each of the parsers, years, and engines looked
+        up during this run
+
+    Methods
+    -------
+    digest(filename)
+        Returns the hash of the content of a file, computing it only once per run
+    get(filename, year, programs, parser, options)
+        Returns the people found in a file in the same form as the parser, or None if the file has to be parsed
+    put(filename, year, programs, parser, options, result)
+        Writes the shards of the people found in a file for each of the programs and records them in the manifest
+    save
+        Writes the manifest to disk
+    signature(parser, year, options)
+        Returns the signatures of the code and data which the people found by a parser for a year depend on
+    """
+
+    def __init__(self, path = MANIFEST_PATH):
+        """This method initializes the data members of the IngestManifest class and reads the existing manifest.
+
+        Parameters
+        ----------
+        path : str, optional
+            The location of the manifest
+        """
+
+        self.path = path
+        self.entries = {}
+        self.digests = {}
+        self.signatures = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf8") as file:
+                    self.entries = json.load(file)["entries"]
+            except (OSError, ValueError, KeyError) as error:
+                print(f"WARNING::Unable to read the manifest {path} ({error}). All of the files will be parsed again.")
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"IngestManifest({self.path}, entries = {len(self.entries)})"
+
+    def digest(self, filename):
+        """Return the hash of the content of a file, computing it only once per run
+
+        Parameters
+        ----------
+        filename : str
+            The path to the file
+
+        Returns
+        -------
+        str
+            The SHA-1 hash of the content of the file
+        """
+
+        if filename not in self.digests:
+            self.digests[filename] = file_digest(filename)
+        return self.digests[filename]
+
+    def get(self, filename, year, programs, parser, options):
+        """Return the people found in a file in the same form as the parser, or None if the file has to be parsed
+
+        Parameters
+        ----------
+        filename : str
+            The path to the PDF file
+        year : int
+            The year the program took place
+        programs : list
+            The programs selected from the file
+        parser : str
+            The name of the parser used for the file
+        options : dict
+            The options passed to the parser (only the RESULT_OPTIONS are compared)
+
+        Returns
+        -------
+        list
+            The list of Person objects, or a list of such lists (one per program) if there are several programs, or None
+            if any of the programs is missing or out of date
+        """
+
+        digest = self.digest(filename)
+        expected = {"hash" : digest, "parser" : parser, "options" : result_options(options), "signature" : self.signature(parser, year, options)}
+        results = []
+        for program in programs:
+            entry = self.entries.get(entry_key(filename, program, year))
+            if entry is None or any(entry.get(key) != value for key, value in expected.items()) or not os.path.exists(entry["shard"]):
+                return None
+            with open(entry["shard"], "r", encoding="utf8") as file:
+                read_header(file)
+                results.append(read_people(file, header_removed = True))
+        return results if len(programs) > 1 else results[0]
+
+    def put(self, filename, year, programs, parser, options, result):
+        """Write the shards of the people found in a file for each of the programs and record them in the manifest
+
+        Parameters
+        ----------
+        filename : str
+            The path to the PDF file
+        year : int
+            The year the program took place
+        programs : list
+            The programs selected from the file
+        parser : str
+            The name of the parser used for the file
+        options : dict
+            The options passed to the parser
+        result : list
+            The list of Person objects returned by the parser, or a list of such lists (one per program) if there are
+            several programs
+        """
+
+        shard_path = os.path.join(os.path.dirname(self.path), "shards")
+        os.makedirs(shard_path, exist_ok = True)
+        for program, people in zip(programs, result if len(programs) > 1 else [result]):
+            key = entry_key(filename, program, year)
+            entry = {
+                "path" : filename,
+                "program" : program,
+                "year" : year,
+                "hash" : self.digest(filename),
+                "parser" : parser,
+                "options" : result_options(options),
+                "signature" : self.signature(parser, year, options),
+                "rows" : len(people),
+            }
+            entry["shard"] = os.path.join(shard_path, hashlib.sha1(json.dumps(entry, sort_keys = True).encode("utf8")).hexdigest()[:16] + ".txt")
+
+            config = MagiConfig()
+            config.files, config.types, config.years = [filename], [program], [year]
+            write_people(entry["shard"], config, people)
+
+            # remove the shard of the previous version of the file
+            previous = self.entries.get(key)
+            if previous is not None and previous["shard"] != entry["shard"] and os.path.exists(previous["shard"]):
+                os.remove(previous["shard"])
+            self.entries[key] = entry
+
+    def save(self):
+        """Write the manifest to disk, replacing the previous version only once it's completely written"""
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok = True)
+        with open(self.path + ".tmp", "w", encoding="utf8") as file:
+            json.dump({"entries" : self.entries}, file, indent = 4, sort_keys = True)
+        os.replace(self.path + ".tmp", self.path)
+
+    def signature(self, parser, year, options):
+        """Return the signatures of the code and data which the people found by a parser for a year depend on
+
+        The signatures are the one of the layout used by the parser (see pdf_parsers.PDFLayout.signature), taking the
+        char_engine option into account, the hash of the result_modules, the version of the code which resolves the
+        institution names (see resolution_cache.code_signature), and the signature of the school databases (see
+        school_registry.SchoolRegistry.school_signature). They're only computed once per run.
+
+        Parameters
+        ----------
+        parser : str
+            The name of the parser used for the file
+        year : int
+            The year the program took place
+        options : dict
+            The options passed to the parser
+
+        Returns
+        -------
+        dict
+            A dict of {str : str} containing the 'layout' (None if the parser doesn't use one of the pdf_layouts),
+            'modules', 'resolution', and 'schools' signatures
+        """
+
+        key = (parser, year, bool(options.get("char_engine")))
+        if key not in self.signatures:
+            layouts = [name for name, process_file in layout_parsers.items() if process_file.__name__ == parser]
+            layout = pdf_layouts[layouts[0]] if layouts else None
+            if layout is not None and key[2]:
+                layout = pdf_layouts.get(f"{layout.name}_chars", layout)
+            self.signatures[key] = {
+                "layout" : layout.signature() if layout is not None else None,
+                "modules" : code_signature(result_modules),
+                "resolution" : code_signature(),
+                "schools" : school_registry.school_signature(year),
+            }
+        return self.signatures[key]
+
+def entry_key(filename, program, year):
+    """Return the key of the entry of the manifest for a file, program, and year
+
+    Parameters
+    ----------
+    filename : str
+        The path to the PDF file
+    program : str
+        The program selected from the file
+    year : int
+        The year the program took place
+
+    Returns
+    -------
+    str
+        The key of the entry
+    """
+
+    return f"{os.path.normpath(filename)}|{program}|{year}"
+
+def result_options(options):
+    """Return the options passed to a parser which change the people found in a file
+
+    Parameters
+    ----------
+    options : dict
+        The options passed to the parser
+
+    Returns
+    -------
+    dict
+        The subset of the options which are listed in RESULT_OPTIONS
+    """
+
+    return {name : options[name] for name in RESULT_OPTIONS if options.get(name)}
@@ -7,29 +7,67 @@ about a person's home institution, usually a college or university.
 
 Constants
 ---------
+FUZZY_MATCH_THRESHOLD : float
+    The minimum score needed to accept a fuzzy match when all of the other ways of finding an institution failed
 home_institution_replacements : dict
     A dict of {str : str} for storing previously encountered institution names and the corresponding names
     in the US Department of Education database
+school_schema : list
+    The names of the columns of the year-independent tables returned by load_schools
+shared_institutions : dict
+    A dict of {tuple : Institution} containing the single Institution object used for each school record
 
 Classes
 ----------
 Institution
     Stores information about a specific institution
+SchoolIndex
+    Maps the names of the postsecondary schools for a given year to their location information
 
 Functions
 ---------
 append_institutions
     Add some extra institutions to the database of postsecondary schools
+available_school_years
+    Return the years for which a shapefile of postsecondary school locations has been downloaded
+compact_schools
+    Convert a table of postsecondary schools to the compact data types used by the normalized schema
+find_fallback_record
+    Find a school whose name couldn't be matched directly or through home_institution_replacements
 get_institution
     Find the correct postsecondary school in the database, store the relevant information in an Institution
     object, and return that object
+get_institutions
+    Find the postsecondary schools for a whole list of institution names in a single batch
 load_schools
     Load the correct database of postsecondary school information
+normalize_institution_name
+    Put the name of an institution into the canonical form used for lookups
+school_columns
+    Return the names of the columns used from the database of postsecondary schools
+school_filename
+    Return the path to the shapefile containing the postsecondary school locations for a given year
+secondary_replacement
+    Apply the first matching entry of home_institution_secondary_replacements to the name of an institution
+shared_institution
+    Return the Institution object shared by all of the people from a school
 """
 
-import geopandas as gpd
+import glob
+import os
+import re
+import sys
+
 import pandas as pd
 
+from fuzzy_matcher import FuzzyMatcher
+from school_cache import load_cached_table
+from utilities import intern_string
+
+FUZZY_MATCH_THRESHOLD = 0.8
+school_schema = ["name", "city", "state", "latitude", "longitude"]
+shared_institutions = {}
+
 # pylint: disable=C0301
 home_institution_replacements = {
     "The Ohio State University Main Campus" : "Ohio State University-Main Campus",
@@ -262,8 +300,13 @@ class Institution:
         The latitude where the institution is located
     longitude : float
         The longitude where the institution is located
+
+    The objects are shared by all of the people from the same institution (see shared_institution), so they must not
+    be modified once created.
     """
 
+    __slots__ = ("name", "city", "state", "latitude", "longitude")
+
     def __init__(self, name, city, state, latitude, longitude):
         """This method initializes the data members of the Institution class.
 
@@ -281,59 +324,60 @@ class Institution:
             The longitude where the institution is located
         """
 
-        self.name = name
-        self.city = city
-        self.state = state
+        self.name = intern_string(name)
+        self.city = intern_string(city)
+        self.state = intern_string(state)
         self.latitude = latitude
         self.longitude = longitude
 
+    def __reduce__(self):
+        """Pickle the institution through shared_institution, so the copies returned by the worker processes are shared"""
+
+        return shared_institution, (self.name, self.city, self.state, self.latitude, self.longitude)
+
     def __repr__(self):
         """Return a formated string representation of the class object"""
 
         return f"Institution({self.name})"
 
-def append_institutions(schools, year, inst_name):
+def append_institutions(schools):
     """Add some extra institutions to the database of postsecondary schools
 
     Parameters
     ----------
-    schools : GeoDataFrame
-        The dataframe in which to append the new information
-    year : int
-        The year the postsecondary school information was collected
-    inst_name : string
-        The keyword to use when looking up the name of a school in the GeoDataFrame
+    schools : DataFrame
+        The normalized table (see load_schools) in which to append the new information
 
     Returns
     -------
-    GeoDataFrame
-        The dataframe containing both the old and the new information
+    DataFrame
+        The table containing both the old and the new information
     """
 
     df2 = pd.DataFrame(
         {
-            inst_name : [
+            "name" : [
                 "Woods Hole Oceanographic Institution", "Arts et Metiers ParisTech", "University of Canterbury", "McGill University",
                 "Trinity College Dublin", "Wilfrid Laurier University", "University of Melbourne", "University of Oxford",
                 "Imperial College London", "National Tsing Hua University", "University of Toronto", "Pensacola Christian College",
                 "University of Durham", "University of British Columbia", "Universidad de Antioquia", "University of Padua",
                 "University of Bath", "University of Ottawa"
             ],
-            "CITY" : [
+            "city" : [
                 "Falmouth", "Paris", "Christchurch", "Montreal", "Dublin", "Waterloo", "Melbourne", "Oxford", "London", "Hsinchu City",
                 "Toronto", "Pensacola", "Durham", "Vancouver", "Antioquia", "Padova PD", "Bath", "Ottawa"
             ],
-            "STABBR" if year == 2015 else "STATE" : [
+            "state" : [
                 "MA", "France", "New Zealand", "Canada", "Ireland", "Canada", "Australia", "United Kingdom", "United Kingdom",
                  "Taiwan", "Canada", "FL", "United Kingdom", "Canada", "Colombia", "Italy", "England", "Canada"
             ],
-            "LAT1516" if year == 2015 else "LAT" : [
+            "latitude" : [
                 41.524781001932716, 48.833508810585855, -43.52243692283857, 45.50543135620449,
                 53.34434434753582, 43.474536145835756, -37.798583273349905, 51.75540084373608, 51.49896243904694,
                 24.796345696985465, 43.661591621428244, 30.473591759462174, 54.765146814889256, 49.260822236130316,
                 6.2689002766401485, 45.40693922363649, 51.378276373474485, 45.423279573514655
             ],
-            "LON1516" if year == 2015 else "LON" : [
+            "longitude" : [
                 -70.6711607, 2.358395261383819, 172.5800791301893, -73.57646445446471,
                 -6.254485769308092, -80.5273405693174, 144.96136023807165, -1.2540234772696208, -0.174830586222553,
                 120.99670208429329, -79.39612346136519, -87.23406222329352, -1.5780956131069162, -123.24589724211424,
@@ -342,7 +386,234 @@ def append_institutions(schools, year, inst_name):
         },
     )
     schools = pd.concat([schools, df2], ignore_index = True, axis = 0)
-    return schools
+    return compact_schools(schools)
+
+class SchoolIndex:
+    """A lookup table which maps the names of the postsecondary schools for a given year to their location information.
+
+    The index is built once per year of school information. The extra institutions are appended a single time when
+    the index is built and every name is stored as a compact record, which makes each lookup a single dictionary access
+    rather than a scan of the whole table.
+
+    Attributes
+    ----------
+    year : int
+        The year the postsecondary school information was collected
+    version : str
+        A string which identifies the content of the database (None if unknown)
+    resolution_cache : ResolutionCache
+        The on-disk cache of name resolutions consulted before any lookup (None to disable, which is the default)
+    fallback : CrossYearIndex
+        The index of the other years (see cross_year_index) consulted before the fuzzy matching (None to disable, which is the default)
+    records : dict
+        A dict of {str : tuple} mapping the normalized name of each school to a (name, city, state, latitude, longitude) tuple
+    records_table : Series
+        The records indexed by the normalized names (built the first time table() is called)
+    matcher : FuzzyMatcher
+        The fuzzy matching engine for the school names (built the first time fuzzy_match() is called)
+
+    Methods
+    -------
+    find(home_institution)
+        Returns the record for a school name, or None if the name is unknown
+    fuzzy_match(home_institution, limit = 5, min_score = 0.0)
+        Returns the records of the schools whose names are most similar to a given name, along with their scores
+    lookup(home_institution)
+        Returns an Institution object for a school name, or None if the name is unknown
+    memory_usage
+        Returns the estimated size of the index in bytes
+    table
+        Returns the records as a Series indexed by the normalized names, which is used for vectorized lookups
+    """
+
+    def __init__(self, schools, year, version = None):
+        """This method builds the index from a database of postsecondary schools.
+
+        Parameters
+        ----------
+        schools : DataFrame
+            The normalized table containing information about postsecondary schools in the United States (see load_schools)
+        year : int
+            The year the postsecondary school information was collected
+        version : str, optional
+            A string which identifies the content of the database, used to key the cached resolutions
+        """
+
+        self.year = year
+        self.version = version
+        self.resolution_cache = None
+        self.fallback = None
+
+        schools = append_institutions(schools)
+
+        # keep the first entry for each name, which matches the behavior of the original DataFrame lookups
+        self.matcher = None
+        self.records_table = None
+        self.records = {}
+        for record in zip(*(schools[column].tolist() for column in school_schema)):
+            if isinstance(record[0], str):
+                self.records.setdefault(normalize_institution_name(record[0]), record)
+
+    def __contains__(self, home_institution):
+        """Return True if the name of the school is in the index"""
+
+        return normalize_institution_name(home_institution) in self.records
+
+    def __len__(self):
+        """Return the number of unique school names in the index"""
+
+        return len(self.records)
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"SchoolIndex({self.year}, {len(self)} schools)"
+
+    def find(self, home_institution):
+        """Return the (name, city, state, latitude, longitude) record for a school, or None if the name is unknown
+
+        Parameters
+        ----------
+        home_institution : str
+            The name of the school to look up
+        """
+
+        return self.records.get(normalize_institution_name(home_institution))
+
+    def fuzzy_match(self, home_institution, limit = 5, min_score = 0.0):
+        """Return the records of the schools whose names are most similar to a given name
+
+        The fuzzy matching engine is built the first time this method is called.
+
+        Parameters
+        ----------
+        home_institution : str
+            The name of the school to look up
+        limit : int, optional
+            The maximum number of matches to return
+        min_score : float, optional
+            The matches with a lower score are not returned
+
+        Returns
+        -------
+        list
+            A list of (record, score) tuples ordered by decreasing score, where the score is between 0 and 1
+        """
+
+        if self.matcher is None:
+            self.matcher = FuzzyMatcher(record[0] for record in self.records.values())
+        return [(self.find(name), score) for name, score in self.matcher.match(home_institution, limit, min_score)]
+
+    def lookup(self, home_institution):
+        """Return an Institution object for a school, or None if the name is unknown
+
+        Parameters
+        ----------
+        home_institution : str
+            The name of the school to look up
+        """
+
+        record = self.find(home_institution)
+        return shared_institution(*record) if record is not None else None
+
+    def table(self):
+        """Return the records as a Series indexed by the normalized names, which is used for vectorized lookups"""
+
+        if self.records_table is None:
+            self.records_table = pd.Series(self.records, dtype = object)
+        return self.records_table
+
+    def memory_usage(self):
+        """Return the estimated size of the index in bytes"""
+
+        size = sys.getsizeof(self.records)
+        for key, record in self.records.items():
+            size += sys.getsizeof(key) + sys.getsizeof(record) + sum(sys.getsizeof(item) for item in record)
+        return size
+
+def available_school_years():
+    """Return the years for which a shapefile of postsecondary school locations has been downloaded
+
+    Returns
+    -------
+    list
+        The sorted list of years
+    """
+
+    years = []
+    for filename in glob.glob(os.path.join(os.path.dirname(school_filename(2021)), "*.shp")):
+        match = re.fullmatch(r"Postsecondary_School_Locations_(\d{4})-\d{2}\.shp", os.path.basename(filename))
+        year = int(match.group(1)) if match else 2021
+        if school_filename(year) == filename:
+            years.append(year)
+    return sorted(years)
+
+def compact_schools(schools):
+    """Convert a table of postsecondary schools to the compact data types used by the normalized schema
+
+    The cities and states repeat a lot, so they are stored as categoricals, and single precision is plenty for
+    the coordinates of a point on a map.
+
+    Parameters
+    ----------
+    schools : DataFrame
+        A table with the columns listed in school_schema
+
+    Returns
+    -------
+    DataFrame
+        The same table with the compact data types
+    """
+
+    return schools.astype(
+        {"name" : object, "city" : "category", "state" : "category", "latitude" : "float32", "longitude" : "float32"}
+    )
+
+def find_fallback_record(schools, home_institution, debug = False):
+    """Find a school whose name couldn't be matched directly or through home_institution_replacements
+
+    The home_institution_secondary_replacements are tried first. If they don't lead to a school, the name (and its
+    secondary replacement) is looked up in the other years of school information, when the index has a cross-year
+    fallback. As a last resort, the most similar school name is used, as long as its fuzzy matching score is at least
+    FUZZY_MATCH_THRESHOLD.
+
+    Parameters
+    ----------
+    schools : SchoolIndex
+        The index containing information about postsecondary schools in the United States
+    home_institution : str
+        The name of the home institution for the program participant
+    debug : bool, optional
+        Prints extra information useful in debugging problems
+
+    Returns
+    -------
+    tuple
+        The (name, city, state, latitude, longitude) record of the school or None if no school was found
+    """
+
+    replacement = secondary_replacement(home_institution)
+    if replacement is not None:
+        record = schools.find(replacement)
+        if record is not None:
+            return record
+
+    if schools.fallback is not None:
+        for name in [home_institution] if replacement is None else [home_institution, replacement]:
+            found = schools.fallback.find(name, schools.year)
+            if found is not None:
+                if debug:
+                    print(f"\tUsing the {found[0]} record for {name}, which is missing from {schools.year}")
+                return found[1]
+
+    matches = schools.fuzzy_match(home_institution, limit = 2)
+    if matches and matches[0][1] >= FUZZY_MATCH_THRESHOLD:
+        if debug:
+            print(f"\tWARNING::{home_institution} fuzzy matched to {matches[0][0][0]} (confidence = {matches[0][1]:.2f})")
+        return matches[0][0]
+    if debug and matches:
+        print(f"\tThe best candidates for {home_institution} were " + ", ".join(f"{record[0]} ({score:.2f})" for record, score in matches))
+    return None
 
 def get_institution(schools, home_institution, year, debug = False):
     """Find the correct postsecondary school in the database, store the relevant information in an Institution
@@ -350,8 +621,9 @@ def get_institution(schools, home_institution, year, debug = False):
 
     Parameters
     ----------
-    schools : GeoDataFrame
-        The dataframe containing information about postsecondary schools in the United States
+    schools : SchoolIndex or DataFrame
+        The index (or the dataframe) containing information about postsecondary schools in the United States.
+        Passing a DataFrame will build a new SchoolIndex for every call, so callers should build the index once.
     home_institution : str
         The name of the home institution for the program participant
     year : int
@@ -365,94 +637,217 @@ def get_institution(schools, home_institution, year, debug = False):
         The Institution object containing the relevant data about the participants home institution
     """
 
-    #pylint: disable=R0912
-
     if debug:
-        print(f"Getting the home institution details for {home_institution} ... ", end="")
-
-    inst_name = "INSTNM" if year < 2017 else "NAME"
-
-    # fix a known parsing error (probably a unicode error)
-    if "‐" in home_institution:
-        home_institution = home_institution.replace("‐", "-")
-
-    # append specific institutions to the existing GeoDataFrame
-    schools = append_institutions(schools, year, inst_name)
-
-    # start by trying the original value
-    institution = schools.loc[schools[inst_name].isin([home_institution])]
-
-    # replace home_institution with known good values
-    if institution.size == 0 and home_institution in home_institution_replacements:
-        home_institution = home_institution_replacements[home_institution]
-        institution = schools.loc[schools[inst_name].isin([home_institution])]
-
-    # if the institution is still not found, try some more replacements
-    if institution.size == 0:
-        for key, modifications in home_institution_secondary_replacements.items():
-            if key in home_institution:
-                # Cases: 1 = direct search, 2 = single replacement, 3 = prefix + replacement, 4 = double replacement
-                if len(modifications) == 1:
-                    institution = schools.loc[
-                        schools[inst_name].isin(
-                            [modifications[0]]
-                        )
-                    ]
-                elif len(modifications) == 2:
-                    institution = schools.loc[
-                        schools[inst_name].isin(
-                            [home_institution.replace(modifications[0], modifications[1])]
-                        )
-                    ]
-                elif len(modifications) == 3:
-                    institution = schools.loc[
-                        schools[inst_name].isin(
-                            [modifications[0] + home_institution.replace(modifications[1], modifications[2])]
-                        )
-                    ]
-                elif len(modifications) == 4:
-                    institution = schools.loc[
-                        schools[inst_name].isin(
-                            [home_institution.replace(modifications[0], modifications[1]).replace(modifications[2], modifications[3])]
-                        )
-                    ]
-                break
-
-    if institution.size == 0:
-        if debug:
-            print(f"\n\tWARNING::{home_institution} not found (year = {year}).")
-        institution = None
-    elif institution is not None and institution.size != 0:
-        if debug:
-            print("DONE")
+        print(f"Getting the home institution details for {home_institution} ... ")
 
-        institution = Institution(
-            name = institution.iloc[0][inst_name],
-            city = institution.iloc[0]['CITY'],
-            state = institution.iloc[0]['STABBR'] if year == 2015 else institution.iloc[0]['STATE'],
-            latitude = institution.iloc[0]['LAT1516'] if year == 2015 else institution.iloc[0]['LAT'],
-            longitude = institution.iloc[0]['LON1516'] if year == 2015 else institution.iloc[0]['LON'],
-        )
+    institution = get_institutions(schools, [home_institution], year, debug = debug)[0]
+
+    if debug and institution is not None:
+        print(f"\tFound {institution.name}")
 
     return institution
 
-def load_schools(year):
+def get_institutions(schools, home_institutions, year, debug = False):
+    """Find the postsecondary schools for a whole list of institution names in a single batch
+
+    The names are resolved column-wise: the exact matches and the home_institution_replacements are applied to all
+    of the unique names at once and only the names which are still unknown fall back to the slower, per-name replacements.
+    If the index has a resolution cache, the names resolved by earlier runs are taken from the cache and the new
+    resolutions are added to it.
+
+    Parameters
+    ----------
+    schools : SchoolIndex or DataFrame
+        The index (or the dataframe) containing information about postsecondary schools in the United States
+    home_institutions : list
+        A list of strings containing the names of the home institutions for the program participants
+    year : int
+        The year the postsecondary school information was collected
+    debug : bool, optional
+        Prints extra information useful in debugging problems
+
+    Returns
+    -------
+    list
+        A list of Institution objects (or None for the unknown names) in the same order as home_institutions
+    """
+
+    if not isinstance(schools, SchoolIndex):
+        schools = SchoolIndex(schools, year)
+
+    # start with the resolutions stored by earlier runs
+    unique_names = list(dict.fromkeys(home_institutions))
+    cache = schools.resolution_cache if schools.version is not None else None
+    cached = cache.get_many(unique_names, schools.version, year) if cache is not None else {}
+
+    records = {}
+    unresolved = [raw for raw in unique_names if raw not in cached]
+    if len(unresolved) > 0:
+        # fix a known parsing error (probably a unicode error)
+        names = pd.DataFrame({"raw" : pd.Series(unresolved, dtype = object)})
+        names["name"] = names["raw"].str.replace("‐", "-", regex = False)
+
+        # exact matches
+        names["record"] = names["name"].str.split().str.join(" ").map(schools.table())
+
+        # replace the names with known good values
+        missing = names["record"].isna()
+        replaced = names.loc[missing, "name"].map(home_institution_replacements).dropna().astype(str)
+        names.loc[replaced.index, "name"] = replaced
+        names.loc[replaced.index, "record"] = replaced.str.split().str.join(" ").map(schools.table())
+
+        # resolve the leftovers one at a time
+        records = dict(zip(names["raw"], names["record"]))
+        for raw, name in zip(names["raw"], names["name"]):
+            if isinstance(records[raw], tuple):
+                continue
+            records[raw] = find_fallback_record(schools, name, debug = debug)
+            if records[raw] is None and debug:
+                print(f"\tWARNING::{name} not found (year = {year}).")
+
+        if cache is not None:
+            cache.put_many(records, schools.version, year)
+
+    records.update(cached)
+    return [shared_institution(*records[raw]) if records[raw] is not None else None for raw in home_institutions]
+
+def load_schools(year, use_cache = True):
     """Load the correct database of postsecondary school locations
 
+    Only the name, city, state, latitude, and longitude columns are kept. The first time a shapefile is read,
+    those columns are stored in a columnar cache file, which is used for later loads (see school_cache). Whatever the
+    year, the columns are renamed to school_schema and converted to compact data types (see compact_schools).
+
     Parameters
     ----------
     year : int
         The year the postsecondary school information was collected
+    use_cache : bool, optional
+        Read from and write to the columnar cache of the shapefile
 
     Returns
     -------
-    GeoDataFrame
+    DataFrame
         A dataframe of school locations
     """
 
-    schools = None
+    schools = load_cached_table(school_filename(year), school_columns(year), use_cache = use_cache)
+    schools.columns = school_schema
+    return compact_schools(schools)
+
+def normalize_institution_name(home_institution):
+    """Put the name of an institution into the canonical form used for lookups
+
+    The lookups remain case sensitive, but known unicode parsing errors and stray whitespace are removed.
+
+    Parameters
+    ----------
+    home_institution : str
+        The name of the institution
+
+    Returns
+    -------
+    str
+        The normalized name of the institution
+    """
+
+    return " ".join(home_institution.replace("‐", "-").split())
+
+def school_columns(year):
+    """Return the names of the columns used from the shapefile of postsecondary schools
+
+    Parameters
+    ----------
+    year : int
+        The year the postsecondary school information was collected
+
+    Returns
+    -------
+    list
+        The names of the name, city, state, latitude, and longitude columns (in that order)
+    """
+
+    return [
+        "INSTNM" if year < 2017 else "NAME",
+        "CITY",
+        "STABBR" if year == 2015 else "STATE",
+        "LAT1516" if year == 2015 else "LAT",
+        "LON1516" if year == 2015 else "LON",
+    ]
+
+def school_filename(year):
+    """Return the path to the shapefile containing the postsecondary school locations for a given year
+
+    Parameters
+    ----------
+    year : int
+        The year the postsecondary school information was collected
+
+    Returns
+    -------
+    str
+        The path to the shapefile
+    """
+
     if year == 2021:
-        schools = gpd.read_file("data/schools/EDGE_GEOCODE_POSTSECONDARYSCH_CURRENT.shp")
-    else:
-        schools = gpd.read_file(f"data/schools/Postsecondary_School_Locations_{year}-{year - 1999}.shp")
-    return schools
+        return "data/schools/EDGE_GEOCODE_POSTSECONDARYSCH_CURRENT.shp"
+    return f"data/schools/Postsecondary_School_Locations_{year}-{year - 1999}.shp"
+
+def secondary_replacement(home_institution):
+    """Apply the first matching entry of home_institution_secondary_replacements to the name of an institution
+
+    Parameters
+    ----------
+    home_institution : str
+        The name of the institution
+
+    Returns
+    -------
+    str
+        The modified name of the institution or None if none of the keys matched
+    """
+
+    for key, modifications in home_institution_secondary_replacements.items():
+        if key in home_institution:
+            # Cases: 1 = direct search, 2 = single replacement, 3 = prefix + replacement, 4 = double replacement
+            if len(modifications) == 1:
+                return modifications[0]
+            if len(modifications) == 2:
+                return home_institution.replace(modifications[0], modifications[1])
+            if len(modifications) == 3:
+                return modifications[0] + home_institution.replace(modifications[1], modifications[2])
+            if len(modifications) == 4:
+                return home_institution.replace(modifications[0], modifications[1]).replace(modifications[2], modifications[3])
+            return None
+    return None
+
+def shared_institution(name, city, state, latitude, longitude):
+    """Return the Institution object shared by all of the people from a school
+
+    A multi-year list of people contains hundreds of participants from the same schools, so only one Institution object
+    is created for each record and its strings are interned.
+
+    Parameters
+    ----------
+    name : str
+        The name of the institution
+    city : str
+        The city where the institution is located
+    state : str
+        The state where the institution is located
+    latitude : float
+        The latitude where the institution is located
+    longitude : float
+        The longitude where the institution is located
+
+    Returns
+    -------
+    Institution
+        The Institution object for the record
+    """
+
+    key = (name, city, state, latitude, longitude)
+    institution = shared_institutions.get(key)
+    if institution is None:
+        institution = shared_institutions[key] = Institution(name, city, state, latitude, longitude)
+    return institution
@@ -5,16 +5,35 @@
 This module defines as class to store national laboratory information and a set of enums for the
 DOE national laboratories involved in the STEM educational pipeline programs tracked by WDTS
 
+Constants
+---------
+laboratory_aliases : dict
+    A dict of {str : Laboratories} containing the laboratory of each normalized name, abbreviation, and alias (Sandia's
+    shared names map to a tuple of both sites)
+non_alphanumeric : re.Pattern
+    A regex matching the characters dropped when normalizing the name of a laboratory
+
 Classes
 ----------
 Laboratory
     Stores information about a single DOE national laboratory
 Laboratories(ExtendedEnum)
     Sets enum aliases for each of the known DOE national laboratories
+
+Functions
+---------
+build_laboratory_aliases
+    Build the dict of the laboratory of each normalized name, abbreviation, and alias
+normalize_laboratory_name
+    Put the name of a laboratory into the form used as a key of laboratory_aliases
 """
 
+import re
+
 from utilities import ExtendedEnum
 
+non_alphanumeric = re.compile(r"[\W_]+")
+
 class Laboratory:
     """A class which contains the information about a single laboratory.
 
@@ -39,6 +58,8 @@ class Laboratory:
         Returns a formated string containing the city and state of the laboratory
     """
 
+    __slots__ = ("name", "abbreviation", "city", "state", "latitude", "longitude")
+
     def __init__(self, name, abbreviation, city, state, latitude, longitude):
         """This method initializes the data members of the Laboratory class.
 
@@ -82,6 +103,11 @@ class Laboratories(ExtendedEnum):
         1. https://www.findlatitudeandlongitude.com/find-latitude-and-longitude-from-address/
         2. https://www.latlong.net/
         3. https://www.maps.google.com
+
+    Methods
+    -------
+    resolve(raw_text, institution_text)
+        Returns the laboratory described by the text of a host laboratory column
     """
 
     # pylint: disable=C0103
@@ -133,3 +159,90 @@ class Laboratories(ExtendedEnum):
         """Return a formated string representation of the class object"""
 
         return f"<{self.__class__.__name__}.{self.name}: {self.value.__repr__()}>"
+
+    def __reduce_ex__(self, protocol):
+        """Pickle the member by name, since unpickling a new Laboratory object wouldn't match any of the values"""
+
+        return getattr, (self.__class__, self.name)
+
+    @classmethod
+    def resolve(cls, raw_text, institution_text = ""):
+        """Find the laboratory described by the text of a host laboratory column
+
+        The abbreviation in parentheses is tried first, followed by the rest of the text. The site of Sandia is chosen
+        from the home institution when the text doesn't give it.
+
+        Parameters
+        ----------
+        raw_text : str
+            The text of the host laboratory column (i.e. 'Argonne National Laboratory (ANL)', 'SNL NM', or 'GA / DIII-D')
+        institution_text : str, optional
+            The text of the home institution column
+
+        Returns
+        -------
+        Laboratories
+            The laboratory
+
+        Raises
+        ------
+        KeyError
+            If the text doesn't match any of the known laboratories
+        """
+
+        candidates = [raw_text]
+        if "(" in raw_text:
+            before, _, inside = raw_text.partition("(")
+            candidates = [inside[ : inside.rfind(")")] if ")" in inside else inside, before]
+        for candidate in candidates:
+            laboratory = laboratory_aliases.get(normalize_laboratory_name(candidate))
+            if isinstance(laboratory, tuple):
+                return laboratory[0] if any(word in institution_text for word in ["California", "Mills"]) else laboratory[1]
+            if laboratory is not None:
+                return laboratory
+        raise KeyError(raw_text)
+
+def build_laboratory_aliases():
+    """Build the dict of the laboratory of each normalized name, abbreviation, and alias
+
+    Returns
+    -------
+    dict
+        A dict of {str : Laboratories}, in which the names shared by the two sites of Sandia map to (SNL_CA, SNL_NM)
+    """
+
+    aliases = {}
+    for name, laboratory in Laboratories.__members__.items():
+        for alias in [name, laboratory.value.name, laboratory.value.abbreviation]:
+            key = normalize_laboratory_name(alias)
+            # the two sites of Sandia share their full name
+            aliases[key] = laboratory if aliases.get(key, laboratory) is laboratory else (Laboratories.SNL_CA, Laboratories.SNL_NM)
+
+    # the shortened names found in the PDF files
+    for alias in ["SNL", "Sandia", "Sandia National Laboratory"]:
+        aliases[normalize_laboratory_name(alias)] = (Laboratories.SNL_CA, Laboratories.SNL_NM)
+    for alias in ["General Atomics", "GA", "DIII-D"]:
+        aliases[normalize_laboratory_name(alias)] = Laboratories.GA_DIII_D
+    aliases[normalize_laboratory_name("TJNA")] = Laboratories.TJNAF
+    return aliases
+
+def normalize_laboratory_name(text):
+    """Put the name of a laboratory into the form used as a key of laboratory_aliases
+
+    Everything but the letters and digits is dropped, so the spaces, underscores, line breaks, and punctuation of the
+    different spellings don't matter.
+
+    Parameters
+    ----------
+    text : str
+        The name to normalize
+
+    Returns
+    -------
+    str
+        The normalized name
+    """
+
+    return non_alphanumeric.sub("", text).lower()
+
+laboratory_aliases = build_laboratory_aliases()
@@ -0,0 +1,229 @@
+#!/bin/env python3
+
+"""layout_detection
+
+This module works out how to parse each of the input files without any configuration. A quick fingerprint of the
+first page of a PDF file (the title, the presence of ruling lines, and column headers like 'Term' or 'PARTICIPANT')
+is enough to choose one of the known layouts and to find the program and the year the file describes, so that a
+whole directory of PDF files can be processed without listing their types and years. It also avoids wasting a full
+parse on the wrong parser.
+
+Constants
+---------
+detected_layouts : dict
+    A dict of {(str, int, int) : dict} containing the fingerprint already detected for each path, size, and
+    modification time of a PDF file
+known_layouts : dict
+    A dict of {(str, int) : str} containing the name of the layout known to be used by the files of each program and year
+layout_parsers : dict
+    A dict of {str : callable} containing the parser of each of the layouts of PDF files (see pdf_parsers.pdf_layouts)
+wdts_programs : list
+    The abbreviated names of the programs tracked by WDTS
+
+Functions
+---------
+detect_layout
+    Detect the layout, programs, and year of a PDF file by looking only at its first page
+fingerprint_page
+    Work out the layout, programs, and year of a PDF file from its first page
+plan_input_files
+    Work out how to process each of the input files, detecting the layout, programs, and year of the PDF files
+"""
+
+import glob
+import os
+import re
+
+import pdfplumber
+
+from pdf_parsers import process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic
+from pdf_parsers import process_file_table_no_lines_term_lastname_firstname_institution_laboratory
+from pdf_parsers import process_file_table_with_lines_name_institution_laboratory_term
+from pdf_parsers import process_file_table_with_lines_name_institution_laboratory_area
+
+detected_layouts = {}
+
+layout_parsers = {
+    "no_lines_program" : process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic,
+    "no_lines_term" : process_file_table_no_lines_term_lastname_firstname_institution_laboratory,
+    "with_lines_term" : process_file_table_with_lines_name_institution_laboratory_term,
+    "with_lines_area" : process_file_table_with_lines_name_institution_laboratory_area,
+}
+
+wdts_programs = ["VFP", "SULI", "CCI", "SCGSR"]
+
+known_layouts = {
+    ("VFP", 2021) : "no_lines_program",
+    ("VFP", 2020) : "no_lines_term",
+    ("VFP", 2019) : "with_lines_term",
+    ("VFP", 2018) : "with_lines_term",
+    ("VFP", 2017) : "with_lines_term",
+    ("VFP", 2016) : "with_lines_term",
+    ("VFP", 2015) : "with_lines_term",
+    ("SULI", 2021) : "no_lines_program",
+    ("SULI", 2020) : "no_lines_term",
+    ("SULI", 2019) : "with_lines_term",
+    ("SULI", 2018) : "with_lines_term",
+    ("SULI", 2017) : "with_lines_term",
+    ("SULI", 2016) : "with_lines_term",
+    ("SULI", 2015) : "with_lines_term",
+    ("SULI", 2014) : "with_lines_term",
+    ("CCI", 2021) : "no_lines_program",
+    ("CCI", 2020) : "no_lines_term",
+    ("CCI", 2019) : "with_lines_term",
+    ("CCI", 2018) : "with_lines_term",
+    ("CCI", 2017) : "with_lines_term",
+    ("CCI", 2016) : "with_lines_term",
+    ("CCI", 2015) : "with_lines_term",
+    ("CCI", 2014) : "with_lines_term",
+    ("SCGSR", 2021) : "with_lines_area",
+    ("SCGSR", 2020) : "with_lines_area",
+    ("SCGSR", 2019) : "with_lines_area",
+    ("SCGSR", 2018) : "with_lines_area",
+    ("SCGSR", 2017) : "with_lines_area",
+    ("SCGSR", 2016) : "with_lines_area",
+    ("SCGSR", 2015) : "with_lines_area",
+    ("SCGSR", 2014) : "with_lines_area",
+}
+
+def detect_layout(filename):
+    """Detect the layout, programs, and year of a PDF file by looking only at its first page
+
+    The programs and the year which can't be read from the first page are looked for in the name of the file. The
+    fingerprint of each file is only detected once, unless the file changes (see detected_layouts).
+
+    Parameters
+    ----------
+    filename : str
+        A string containing the path to the PDF file
+
+    Returns
+    -------
+    dict
+        A dict containing the name of the layout (a key of pdf_layouts), the list of programs (possibly empty), and
+        the year (None if it couldn't be found)
+    """
+
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    if key in detected_layouts:
+        return dict(detected_layouts[key])
+
+    with pdfplumber.open(filename) as pdf:
+        fingerprint = fingerprint_page(pdf.pages[0])
+
+    words = re.split(r"[^A-Za-z0-9]+", os.path.basename(filename))
+    if not fingerprint["programs"] or fingerprint["layout"] == "no_lines_program":
+        fingerprint["programs"] = [program for program in wdts_programs if program in fingerprint["programs"] or program in words]
+    if fingerprint["year"] is None:
+        years = [int(word) for word in words if re.fullmatch(r"(19|20)\d{2}", word)]
+        fingerprint["year"] = years[0] if years else None
+    detected_layouts[key] = fingerprint
+    return dict(fingerprint)
+
+def fingerprint_page(page):
+    """Work out the layout, programs, and year of a PDF file from its first page
+
+    The layouts are told apart by the ruling lines of the table and by the column headers. The tables with dividing
+    lines have a 'PARTICIPANT' column when they have a term column and an area column otherwise, while the tables
+    without dividing lines have a 'Term' column header unless they have a program column. The program is read from
+    the parentheses in the title, or from the names of the programs found on the page for the files which contain
+    several programs. The year is the first year found in the text of the page.
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+
+    Returns
+    -------
+    dict
+        A dict containing the name of the layout (a key of pdf_layouts), the list of programs (possibly empty), and
+        the year (None if it couldn't be found)
+    """
+
+    text = page.extract_text() or ""
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    words = set(re.split(r"[^A-Za-z0-9]+", text.upper()))
+    orientations = [edge["orientation"] for edge in page.edges]
+    ruled = orientations.count("v") >= 2 and orientations.count("h") >= 2
+
+    title = lines[0] if lines else ""
+    programs = [program for program in wdts_programs if f"({program})" in title]
+    if ruled:
+        area = "PARTICIPANT" not in words and ("AREA" in words or programs == ["SCGSR"])
+        layout = "with_lines_area" if area else "with_lines_term"
+    else:
+        layout = "no_lines_term" if any(line.startswith("Term") for line in lines) else "no_lines_program"
+    if layout == "no_lines_program" or not programs:
+        programs = [program for program in wdts_programs if program in words]
+
+    year = re.search(r"\b(19|20)\d{2}\b", text)
+    return {"layout" : layout, "programs" : programs, "year" : int(year.group()) if year is not None else None}
+
+def plan_input_files(files, types = None, years = None):
+    """Work out how to process each of the input files, detecting the layout, programs, and year of the PDF files
+
+    The directories are replaced by the PDF files they contain. When the types or the years aren't given, they're
+    detected from the first page of each PDF file (see detect_layout) and a file containing several programs is
+    requested once per program. The parser of each PDF file is chosen from the layouts known to be used for its
+    program and year, or from the detected layout otherwise. The first page isn't read when the types and the years
+    are given and the layout of the program and year is known. A warning is printed when the known and the detected
+    layouts disagree.
+
+    Parameters
+    ----------
+    files : list
+        A list of strings containing the paths to the input files or to directories of PDF files
+    types : list, optional
+        The program which each of the files describes (detected if not given)
+    years : list, optional
+        The year which each of the files describes (detected if not given)
+
+    Returns
+    -------
+    tuple
+        The lists of files, types, and years, one entry per requested program, and the dict of {(str, int) : callable}
+        returning the parser to use for each program and year
+
+    Raises
+    ------
+    RuntimeError
+        If the program or the year of a PDF file can't be detected
+    ValueError
+        If the number of types or years doesn't match the number of files, or if two PDF files of the same program
+        and year need different parsers
+    """
+
+    paths = []
+    for filename in files:
+        paths += sorted(glob.glob(os.path.join(filename, "*.pdf"))) if os.path.isdir(filename) else [filename]
+    for name, values in [("types", types), ("years", years)]:
+        if values is not None and len(values) != len(paths):
+            raise ValueError(f"The number of files ({len(paths)}) and {name} ({len(values)}) must be the same.")
+
+    planned = ([], [], [])
+    layouts = {}
+    for ipath, path in enumerate(paths):
+        programs = [types[ipath]] if types is not None else [None]
+        year = years[ipath] if years is not None else None
+        if os.path.splitext(path)[1] == ".pdf":
+            fingerprint = None
+            if None in programs or year is None or (programs[0], year) not in known_layouts:
+                fingerprint = detect_layout(path)
+                programs = programs if types is not None else fingerprint["programs"]
+                year = year if year is not None else fingerprint["year"]
+            if not programs or year is None:
+                raise RuntimeError(f"Unable to detect the program and year of {path}, please specify the types and years.")
+            for program in programs:
+                layout = known_layouts.get((program, year), fingerprint["layout"] if fingerprint is not None else None)
+                if fingerprint is not None and layout != fingerprint["layout"]:
+                    print(f"WARNING::{path} looks like a '{fingerprint['layout']}' file, but {program} files from {year} use the '{layout}' layout")
+                other_layout, other_path = layouts.setdefault((program, year), (layout, path))
+                if other_layout != layout:
+                    raise ValueError(f"{other_path} and {path} are both {program} files from {year}, but they use different layouts "
+                                     f"('{other_layout}' and '{layout}').")
+        for program in programs:
+            for values, value in zip(planned, [path, program, year]):
+                values.append(value)
+    return (*planned, {key : layout_parsers[layout] for key, (layout, _) in layouts.items()})
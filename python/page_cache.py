@@ -0,0 +1,195 @@
+#!/bin/env python3
+
+"""page_cache
+
+This module contains an on-disk cache of the rows extracted from the pages of the PDF files. Extracting the text and
+the tables with pdfplumber is by far the slowest part of parsing a file, so the rows of each page are stored in an
+SQLite database and reused as long as neither the file nor the extraction code has changed. Only the cheap steps,
+which turn the rows into Person objects, are repeated.
+
+Each page is keyed by the SHA-1 hash of the content of the PDF file and by the signature of the layout used to extract
+it (see PDFLayout.signature in pdf_parsers), which covers the extraction functions, their settings, and the version of
+pdfplumber. The header information read from the first page and the number of pages are stored along with the rows.
+
+Constants
+---------
+PAGE_CACHE_PATH : str
+    The default location of the cache database
+page_cache : PageCache
+    The cache shared by all of the parsers in the process
+
+Classes
+----------
+PageCache
+    Stores and retrieves the rows extracted from the pages of the PDF files in an SQLite database
+
+Functions
+---------
+file_digest
+    Return the SHA-1 hash of the content of a file
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+PAGE_CACHE_PATH = "data/.cache/pages.sqlite"
+
+class PageCache:
+    """A class which stores and retrieves the rows extracted from the pages of the PDF files in an SQLite database.
+
+    The database is only opened the first time it's used. If it can't be opened, a warning is printed and the cache
+    is disabled for the rest of the process.
+
+    Attributes
+    ----------
+    path : str
+        The location of the cache database
+    enabled : bool
+        Read from and write to the cache
+    connection : sqlite3.Connection
+        The open connection to the cache database (None until the first use)
+
+    Methods
+    -------
+    close
+        Close the connection to the cache database
+    connect
+        Return the open connection to the cache database, or None if the cache is disabled
+    get(digest, signature)
+        Returns the header, the number of pages, and a dict of the rows of each of the cached pages of a file
+    put(digest, signature, header, npages, pages)
+        Stores the header, the number of pages, and a dict of the rows of some of the pages of a file
+    """
+
+    def __init__(self, path = PAGE_CACHE_PATH, enabled = True):
+        """This method initializes the data members of the PageCache class.
+
+        Parameters
+        ----------
+        path : str, optional
+            The location of the cache database
+        enabled : bool, optional
+            Read from and write to the cache
+        """
+
+        self.path = path
+        self.enabled = enabled
+        self.connection = None
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"PageCache({self.path}, enabled = {self.enabled})"
+
+    def close(self):
+        """Close the connection to the cache database"""
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def connect(self):
+        """Return the open connection to the cache database, or None if the cache is disabled"""
+
+        if not self.enabled:
+            return None
+        if self.connection is None:
+            try:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok = True)
+                self.connection = sqlite3.connect(self.path, timeout = 30)
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS pages ("
+                    "digest TEXT NOT NULL, signature TEXT NOT NULL, page INTEGER NOT NULL, content TEXT NOT NULL, "
+                    "PRIMARY KEY (digest, signature, page))"
+                )
+                self.connection.commit()
+            except (OSError, sqlite3.Error) as error:
+                print(f"WARNING::Unable to use the page cache {self.path} ({error})")
+                self.enabled = False
+                self.connection = None
+        return self.connection
+
+    def get(self, digest, signature):
+        """Return the cached information about a file
+
+        Parameters
+        ----------
+        digest : str
+            The hash of the content of the PDF file (see file_digest)
+        signature : str
+            The signature of the layout used to extract the rows
+
+        Returns
+        -------
+        tuple
+            The header (None if it isn't cached), the number of pages (None if unknown), and a dict of {int : list}
+            containing the rows of each of the cached pages
+        """
+
+        header, npages, pages = None, None, {}
+        connection = self.connect()
+        if connection is None:
+            return header, npages, pages
+
+        # the header and the number of pages are stored as page -1
+        rows = connection.execute("SELECT page, content FROM pages WHERE digest = ? AND signature = ?", (digest, signature))
+        for ipage, content in rows:
+            if ipage < 0:
+                header, npages = json.loads(content)
+            else:
+                pages[ipage] = json.loads(content)
+        return header, npages, pages
+
+    def put(self, digest, signature, header, npages, pages):
+        """Store the information about a file
+
+        Parameters
+        ----------
+        digest : str
+            The hash of the content of the PDF file (see file_digest)
+        signature : str
+            The signature of the layout used to extract the rows
+        header : dict
+            The header information read from the first page (must be JSON serializable)
+        npages : int
+            The number of pages in the file
+        pages : dict
+            A dict of {int : list} containing the rows of the pages to store
+        """
+
+        connection = self.connect()
+        if connection is None:
+            return
+
+        values = [(digest, signature, -1, json.dumps([header, npages]))]
+        values += [(digest, signature, ipage, json.dumps(rows)) for ipage, rows in pages.items()]
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", values)
+        except sqlite3.Error as error:
+            print(f"WARNING::Unable to write to the page cache {self.path} ({error})")
+
+page_cache = PageCache()
+
+def file_digest(filename):
+    """Return the SHA-1 hash of the content of a file
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file
+
+    Returns
+    -------
+    str
+        The hexadecimal digest
+    """
+
+    digest = hashlib.sha1()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,185 @@
+#!/bin/env python3
+
+"""page_extraction
+
+This module contains the functions which extract the rows of the pages of a PDF file with a given layout (see
+pdf_parsers.PDFLayout). The pages are extracted in page order, either in the current process or in a pool of processes,
+and the rows are taken from the page cache whenever possible. The objects of each page are released as soon as its
+rows are extracted, and in low-memory mode the file is reopened every few pages so the memory used doesn't grow with
+the length of the file.
+
+Constants
+---------
+LOW_MEMORY_WINDOW : int
+    The number of pages extracted each time a PDF file is opened in low-memory mode
+
+Functions
+---------
+extract_page_range
+    Opens a PDF file and extracts the rows of some of its pages (used by the worker processes)
+iter_page_range
+    Opens a PDF file and yields the rows of some of its pages, releasing the objects of each page once it's extracted
+iter_pages
+    Yields the header and the rows of each page of a PDF file, in page order, using the page cache when possible
+page_chunks
+    Splits a list of page numbers into contiguous chunks which are spread over several processes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pdfplumber
+
+from page_cache import file_digest
+from page_cache import page_cache
+
+LOW_MEMORY_WINDOW = 25
+
+def extract_page_range(filename, extract_rows, page_numbers):
+    """Open a PDF file and extract the rows of some of its pages (used by the worker processes)
+
+    Parameters
+    ----------
+    filename : str
+        A string containing the path to the PDF file
+    extract_rows : callable
+        A function (page, ipage) returning the rows of a page
+    page_numbers : list
+        The (zero-based) numbers of the pages to extract
+
+    Returns
+    -------
+    list
+        The rows of each of the requested pages
+    """
+
+    return list(iter_page_range(filename, extract_rows, page_numbers))
+
+def iter_page_range(filename, extract_rows, page_numbers):
+    """Open a PDF file and yield the rows of some of its pages, releasing the objects of each page once it's extracted
+
+    Only the requested pages are loaded and pdfplumber's cache of the characters, the layout, and the text map of a
+    page is flushed as soon as its rows have been extracted. The file is closed when the generator finishes or is
+    closed.
+
+    Parameters
+    ----------
+    filename : str
+        A string containing the path to the PDF file
+    extract_rows : callable
+        A function (page, ipage) returning the rows of a page
+    page_numbers : list
+        The (zero-based) numbers of the pages to extract
+
+    Yields
+    ------
+    list
+        The rows of each of the requested pages, in the same order as page_numbers
+    """
+
+    if not page_numbers:
+        return
+    with pdfplumber.open(filename, pages = [ipage + 1 for ipage in page_numbers]) as pdf:
+        pdf_pages = {page.page_number - 1 : page for page in pdf.pages}
+        for ipage in page_numbers:
+            rows = extract_rows(pdf_pages[ipage], ipage)
+            pdf_pages[ipage].close()
+            yield rows
+
+def iter_pages(layout, filename, page_jobs = 1, low_memory = False):
+    """Yield the header and the rows of each page of a PDF file, in page order, using the page cache when possible
+
+    The first page is always extracted in the current process, since the header information comes from it. When
+    page_jobs is greater than one, the remaining pages are extracted by a pool of processes and yielded in order as
+    they become available. Only the pages missing from the page cache are extracted and each new page is added to
+    the cache as soon as it's extracted. The objects of each page are released as soon as its rows are extracted and
+    the file is always closed before returning (see iter_page_range).
+
+    Parameters
+    ----------
+    layout : PDFLayout
+        The layout of the PDF file
+    filename : str
+        A string containing the path to the PDF file
+    page_jobs : int, optional
+        The number of processes used to extract the text from the pages of the PDF file
+    low_memory : bool, optional
+        Reopen the file every LOW_MEMORY_WINDOW pages, which bounds the memory used by pdfminer at the cost of some speed
+
+    Yields
+    ------
+    tuple
+        The header (a dict), the (zero-based) number of the page, and the rows of the page
+    """
+
+    digest = file_digest(filename) if page_cache.enabled else None
+    signature = layout.signature()
+    header, npages, pages = page_cache.get(digest, signature) if digest is not None else (None, None, {})
+
+    if header is not None and npages is not None and len(pages) >= npages:
+        for ipage in range(npages):
+            yield header, ipage, pages.pop(ipage)
+        return
+
+    # load the pdf of names and read the header from the first page
+    if header is None or 0 not in pages:
+        with pdfplumber.open(filename) as pdf:
+            npages = len(pdf.pages)
+            header, rows = layout.read_first_page(pdf.pages[0])
+            pdf.pages[0].close()
+        if digest is not None:
+            page_cache.put(digest, signature, header, npages, {0 : rows})
+        pages[0] = rows
+
+    # fan the remaining pages out to a pool of processes or extract them one at a time
+    extract_rows = layout.row_extractor(header.get("columns"))
+    executor = None
+    missing = [ipage for ipage in range(npages) if ipage not in pages]
+    if page_jobs > 1 and len(missing) > 1:
+        chunks = page_chunks(missing, page_jobs)
+        executor = ProcessPoolExecutor(max_workers = min(page_jobs, len(chunks)))
+        extracted = (rows for chunk in executor.map(extract_page_range, repeat(filename), repeat(extract_rows), chunks)
+                     for rows in chunk)
+    else:
+        # in low-memory mode the file is reopened for each window of pages, so pdfminer's caches don't grow with its length
+        size = LOW_MEMORY_WINDOW if low_memory else max(1, len(missing))
+        extracted = (rows for first in range(0, len(missing), size)
+                     for rows in iter_page_range(filename, extract_rows, missing[first : first + size]))
+
+    # interleave the cached pages with the newly extracted ones to keep the page order
+    try:
+        start = 0
+        for ipage, rows in zip(missing, extracted):
+            for jpage in range(start, ipage):
+                yield header, jpage, pages.pop(jpage)
+            if digest is not None:
+                page_cache.put(digest, signature, header, npages, {ipage : rows})
+            yield header, ipage, rows
+            start = ipage + 1
+        for jpage in range(start, npages):
+            yield header, jpage, pages.pop(jpage)
+    finally:
+        extracted.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures = True)
+
+def page_chunks(page_numbers, jobs):
+    """Split a list of page numbers into contiguous chunks which are spread over several processes
+
+    A few chunks are made per process, so that a process which gets the slow pages doesn't hold up the others.
+
+    Parameters
+    ----------
+    page_numbers : list
+        The page numbers to split up
+    jobs : int
+        The number of processes
+
+    Returns
+    -------
+    list
+        A list of lists of page numbers
+    """
+
+    size = max(1, -(-len(page_numbers) // (4 * jobs)))
+    return [page_numbers[start : start + size] for start in range(0, len(page_numbers), size)]
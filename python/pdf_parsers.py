@@ -4,10 +4,44 @@
 
 This module contains functions which are involved in parsing a PDF file containing a list of program participants and some accompanying information
 
+Constants
+---------
+pdf_layouts : dict
+    A dict of {str : PDFLayout} containing the known layouts of PDF files, keyed by their short names
+
+Classes
+----------
+PDFLayout
+    Describes how to extract, read, and interpret the rows of one of the layouts of PDF files
+
 Functions
 ---------
+create_entries_no_lines_program
+    Turns the rows of a page of a table with no dividing lines and a program column into the entries for create_people
+create_entries_no_lines_term
+    Turns the rows of a page of a table with no dividing lines and a term column into the entries for create_people
+create_entries_with_lines_area
+    Turns the rows of a page of a table with dividing lines and a research area column into the entries for create_people
+create_entries_with_lines_term
+    Turns the rows of a page of a table with dividing lines and a term column into the entries for create_people
+create_people
+    Resolves the home institutions of a list of participants in a single batch and creates the Person objects
+create_people_table
+    Resolves the home institutions of a list of participants in a single batch and stores them in a PeopleTable
+extract_rows_no_lines_program
+    Extracts the rows of a page containing a table with no dividing lines and a program column
+extract_rows_no_lines_term
+    Extracts the rows of a page containing a table with no dividing lines and a term column
+extract_rows_with_lines
+    Extracts the rows of a page containing a table with dividing lines
 handle_known_issues_parsing_input
     Corrects some known issues when parsing the PDF files (kind of like an empirical catch-all function)
+iter_file
+    Yields the program participants of a PDF file page by page, as soon as each page has been parsed
+learn_table_geometry
+    Learns the geometry of a table with dividing lines from the first page and extracts its rows
+parse_file
+    Returns a list of program participants by parsing a PDF file with a given layout
 process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic
     Returns a list of program participants by parsing a PDF file
 process_file_table_no_lines_term_lastname_firstname_institution_laboratory
@@ -16,25 +50,494 @@ process_file_table_with_lines_name_institution_laboratory_term
     Returns a list of program participants by parsing a PDF file
 process_file_table_with_lines_name_institution_laboratory_area
     Returns a list of program participants by parsing a PDF file
+read_header_no_header
+    Reads the header of a file whose first page doesn't contain any header information
+read_header_no_lines_term
+    Reads the program and job from the first line of a table with no dividing lines
+read_header_with_lines_area
+    Reads the program and job from the title of a table with dividing lines and a research area column
+read_header_with_lines_term
+    Reads the program and job from the title and column headers of a table with dividing lines and a term column
 """
 
 # pylint: disable=C0103
 # pylint: disable=W0613
 # pylint: disable=R0912
 
-import operator
+from functools import partial
+import hashlib
+import inspect
+import json
 
 import pdfplumber
 
-from institution import get_institution
-from institution import load_schools
+import char_columns
+from institution import get_institutions
 from laboratory import Laboratories
+from page_extraction import iter_pages
+from people_table import PeopleTable
 from person import Person
 from person import Jobs
+from person import sort_people
+from row_repairs import repair_rows
+from school_registry import get_school_index
+
+class PDFLayout:
+    """A class which describes how to extract, read, and interpret the rows of one of the layouts of PDF files.
+
+    Parsing a file is split into three steps. The rows of text are extracted from each page independently, which is
+    the slow part and can be spread over several processes. The header information (program, job, etc.) is read from
+    the first page and its rows. Finally, the rows of each page are turned into the information needed to create each
+    Person object, one page at a time, so that the people can be streamed as the pages are parsed. A layout can also
+    learn some settings (i.e. the column boundaries) from the first page, which are stored in the header under the
+    'columns' key and passed to extract_rows for every page.
+
+    Attributes
+    ----------
+    name : str
+        The short name of the layout
+    extract_rows : callable
+        A function (page, ipage) returning the rows of a page as a list of lists of strings
+    read_header : callable
+        A function (page, rows) returning a dict of information shared by the whole file, based on the first page
+    create_entries : callable
+        A function (rows, ipage, year, header, program_filter) returning the list of entries for create_people
+        found in the rows of a single page
+    learn_columns : callable
+        A function (page) returning the JSON serializable settings learned from the first page, which are passed to
+        extract_rows as its 'columns' argument (None if the layout doesn't learn anything)
+    learn_rows : bool
+        True if learn_columns returns a tuple of the settings and the rows of the first page, so that the first page
+        isn't extracted a second time
+    settings : dict
+        The tuning parameters of the extraction functions, which are part of the signature
+
+    Methods
+    -------
+    read_first_page(page)
+        Returns the header, including the settings learned from the first page, and the rows of the first page
+    row_extractor(columns)
+        Returns the function (page, ipage) extracting the rows of a page with the settings learned from the first page
+    signature
+        Returns a string which changes whenever the rows, the header, or the entries found with this layout could change
+    """
+
+    def __init__(self, name, extract_rows, read_header, create_entries, learn_columns = None, learn_rows = False, settings = None):
+        """This method initializes the data members of the PDFLayout class.
+
+        Parameters
+        ----------
+        name : str
+            The short name of the layout
+        extract_rows : callable
+            A function (page, ipage) returning the rows of a page as a list of lists of strings
+        read_header : callable
+            A function (page, rows) returning a dict of information shared by the whole file, based on the first page
+        create_entries : callable
+            A function (rows, ipage, year, header, program_filter) returning the list of entries for create_people
+        learn_columns : callable, optional
+            A function (page) returning the settings learned from the first page
+        learn_rows : bool, optional
+            True if learn_columns also returns the rows of the first page
+        settings : dict, optional
+            The tuning parameters of the extraction functions
+        """
+
+        self.name = name
+        self.extract_rows = extract_rows
+        self.read_header = read_header
+        self.create_entries = create_entries
+        self.learn_columns = learn_columns
+        self.learn_rows = learn_rows
+        self.settings = settings if settings is not None else {}
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"PDFLayout({self.name})"
+
+    def read_first_page(self, page):
+        """Learn the settings of the layout from the first page, then extract its rows and read the header
+
+        Parameters
+        ----------
+        page : pdfplumber.page.Page
+            The first page of the file
+
+        Returns
+        -------
+        tuple
+            The header (a dict, including the learned settings under the 'columns' key) and the rows of the page
+        """
+
+        columns = self.learn_columns(page) if self.learn_columns is not None else None
+        if self.learn_rows:
+            columns, rows = columns
+        else:
+            rows = self.row_extractor(columns)(page, 0)
+        header = self.read_header(page, rows)
+        if self.learn_columns is not None:
+            header["columns"] = columns
+        return header, rows
+
+    def row_extractor(self, columns = None):
+        """Return the function (page, ipage) extracting the rows of a page with the settings learned from the first page
+
+        Parameters
+        ----------
+        columns : optional
+            The settings returned by learn_columns (ignored if the layout doesn't learn anything)
+
+        Returns
+        -------
+        callable
+            The extraction function, which can be sent to the worker processes
+        """
+
+        return partial(self.extract_rows, columns = columns) if self.learn_columns is not None else self.extract_rows
+
+    def signature(self):
+        """Return a string which changes whenever the rows, the header, or the entries found with this layout could change
+
+        The signature is built from the name of the layout, the version of pdfplumber, the source code of the
+        extraction, header, and entry functions (or of their whole module when they come from a dedicated engine like
+        char_columns), and the settings. It's used to key the cached rows (see page_cache) and the shards of the
+        incremental ingestion (see ingest_manifest).
+        """
+
+        digest = hashlib.sha1()
+        for function in [self.extract_rows, self.read_header, self.create_entries, self.learn_columns]:
+            if function is not None:
+                module = inspect.getmodule(function)
+                digest.update(inspect.getsource(function if module.__name__ == __name__ else module).encode("utf8"))
+        if self.settings:
+            digest.update(json.dumps(self.settings, sort_keys = True).encode("utf8"))
+        return f"{self.name}|pdfplumber {pdfplumber.__version__}|{digest.hexdigest()}"
+
+def create_entries_no_lines_program(rows, ipage, year, header, program_filter = None):
+    """Turn the rows of a page of a table with no dividing lines and a program column into the entries for create_people
+
+    Parameters
+    ----------
+    rows : list
+        The rows of the page (see extract_rows_no_lines_program)
+    ipage : int
+        The (zero-based) number of the page
+    year : int
+        The year the program took place
+    header : dict
+        The information read from the first page (unused)
+    program_filter : list, optional
+        A list of strings containing the programs to select for
+
+    Returns
+    -------
+    list
+        A list of dicts containing the arguments needed to create each Person
+    """
+
+    entries = []
+    good_lines = handle_known_issues_parsing_input(list(rows), year)
+    good_vfp_lines = [line for line in good_lines if any(filter in line[0] for filter in program_filter)] \
+                     if program_filter is not None else good_lines
+    for line in good_vfp_lines:
+        if len(line) != 5:
+            print("ERROR::" + str(line))
+            continue
+        entries.append(
+            {
+                "program" : line[0].split()[0] if " " in line[0] else line[0],
+                "job" : Jobs[line[0].split()[1] if " " in line[0] else "Student" \
+                             if any(i in line[0] for i in ["SULI", "CCI"]) else "Unknown"],
+                "first_name" : line[1].split(",")[1],
+                "last_name" : line[1].split(",")[0],
+                "home_institution" : line[2],
+                "host_doe_laboratory" : Laboratories.resolve(line[3], line[2]),
+                "topic" : line[4],
+                "year" : year,
+            }
+        )
+    return entries
+
+def create_entries_no_lines_term(rows, ipage, year, header, program_filter = None):
+    """Turn the rows of a page of a table with no dividing lines and a term column into the entries for create_people
+
+    Parameters
+    ----------
+    rows : list
+        The rows of the page (see extract_rows_no_lines_term)
+    ipage : int
+        The (zero-based) number of the page
+    year : int
+        The year the program took place
+    header : dict
+        The program and the name of the job read from the first page
+    program_filter : list, optional
+        Unused, since these files only contain a single program
+
+    Returns
+    -------
+    list
+        A list of dicts containing the arguments needed to create each Person
+    """
+
+    # Remove the title lines above the column headers of the first page, which can be split into several cells when
+    # the gaps between their words line up with the column boundaries
+    if ipage == 0:
+        iheader = next((iline for iline, line in enumerate(rows) if line[0].strip().startswith("Term")), 0)
+        rows = rows[iheader:]
+
+    # Remove the page headers, the page numbers, and the column headers (wherever they are repeated)
+    lines = [line for line in rows if len(line) > 1 and not line[0].strip().startswith("Term")]
+
+    entries = []
+    for line in lines:
+        # Handle case when Institution and Host Lab columns are merged
+        #if len(line) == 4 and any(l in line[-1] for l in Laboratories.list_names()):
+        #    line = line[:-1] + [" ".join(line[-1].split()[:-1])] + [line[-1].split()[-1]]
+
+        # What to do if the number of columns still isn't right
+        if len(line) != 5:
+            print("ERROR::" + str(line))
+            continue
+
+        # Store the information needed to create the Person object
+        entries.append(
+            {
+                "program" : header["program"],
+                "job" : Jobs[header["job"]],
+                "first_name" : line[2].lstrip().strip(),
+                "last_name" : line[1].lstrip().strip(),
+                "home_institution" : line[3].lstrip().strip(),
+                "host_doe_laboratory" : Laboratories.resolve(line[4], line[3]),
+                "topic" : "",
+                "year" : year,
+            }
+        )
+    return entries
+
+def create_entries_with_lines_area(rows, ipage, year, header, program_filter = None):
+    """Turn the rows of a page of a table with dividing lines and a research area column into the entries for create_people
+
+    Parameters
+    ----------
+    rows : list
+        The rows of the page (see extract_rows_with_lines)
+    ipage : int
+        The (zero-based) number of the page
+    year : int
+        The year the program took place
+    header : dict
+        The program and the name of the job read from the first page
+    program_filter : list, optional
+        Unused, since these files only contain a single program
+
+    Returns
+    -------
+    list
+        A list of dicts containing the arguments needed to create each Person
+    """
+
+    table = rows[1:] if ipage == 0 else rows
+
+    entries = []
+    for row in table:
+        entries.append(
+            {
+                "program" : header["program"],
+                "job" : Jobs[header["job"]],
+                "first_name" : " ".join(row[0].split()[:-1]),
+                "last_name" : row[0].split()[-1],
+                "home_institution" : " ".join(row[1].split()),
+                "host_doe_laboratory" : Laboratories.resolve(row[2], row[1]),
+                "topic" : row[3].replace("\n", "").strip(),
+                "year" : year,
+            }
+        )
+    return entries
+
+def create_entries_with_lines_term(rows, ipage, year, header, program_filter = None):
+    """Turn the rows of a page of a table with dividing lines and a term column into the entries for create_people
+
+    Parameters
+    ----------
+    rows : list
+        The rows of the page (see extract_rows_with_lines)
+    ipage : int
+        The (zero-based) number of the page
+    year : int
+        The year the program took place
+    header : dict
+        The program and the name of the job read from the first page
+    program_filter : list, optional
+        Unused, since these files only contain a single program
+
+    Returns
+    -------
+    list
+        A list of dicts containing the arguments needed to create each Person
+    """
+
+    # Skip the pages without a table
+    if len(rows) == 0:
+        return []
+
+    table = rows
+    if ipage == 0:
+        table = table[1:]
+    if ipage > 0 and "PARTICIPANT" in table[0][0]:
+        table = table[1:]
+
+    entries = []
+    for row in table:
+        # Check for blank rows
+        if all(not r for r in row):
+            continue
+
+        # Store the information needed to create the Person object
+        entries.append(
+            {
+                "program" : header["program"],
+                "job" : Jobs[header["job"]] if header["job"] else "",
+                "first_name" : " ".join(row[0].split()[:-1]),
+                "last_name" : row[0].split()[-1],
+                "home_institution" : " ".join(row[1].split()),
+                "host_doe_laboratory" : Laboratories.resolve(row[2], row[1]),
+                "topic" : "",
+                "year" : year,
+            }
+        )
+    return entries
+
+def create_people(entries, year, debug = False):
+    """Resolve the home institutions of a list of participants in a single batch and create the Person objects
+
+    Parameters
+    ----------
+    entries : list
+        A list of dicts containing the arguments needed to create each Person, where 'home_institution' is the
+        name of the home institution as written in the PDF file
+    year : int
+        The year the program took place
+    debug : bool, optional
+        Print extra information useful for debugging issues
+
+    Returns
+    -------
+    list
+        A list of Person objects in the same order as the entries
+    """
+
+    institutions = get_institutions(get_school_index(year), [entry["home_institution"] for entry in entries], year, debug = debug)
+    return [Person(**{**entry, "home_institution" : institution}) for entry, institution in zip(entries, institutions)]
+
+def create_people_table(entries, year, debug = False):
+    """Resolve the home institutions of a list of participants in a single batch and store them in a PeopleTable
+
+    Parameters
+    ----------
+    entries : list
+        A list of dicts containing the arguments needed to create each Person (see create_people)
+    year : int
+        The year the program took place
+    debug : bool, optional
+        Print extra information useful for debugging issues
+
+    Returns
+    -------
+    PeopleTable
+        The participants in the same order as the entries
+    """
+
+    institutions = get_institutions(get_school_index(year), [entry["home_institution"] for entry in entries], year, debug = debug)
+    return PeopleTable.from_entries(entries, institutions)
+
+def extract_rows_no_lines_program(page, ipage):
+    """Extract the rows of a page containing a table with no dividing lines and a program column
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to extract
+    ipage : int
+        The (zero-based) number of the page
+
+    Returns
+    -------
+    list
+        The rows of the page, each of which is a list of strings
+    """
+
+    split_lines = page.extract_text(layout = False, x_tolerance = 1).split('\n')
+    split_lines_no_blanks = [x.split(' ') for x in split_lines]
+    if ipage == 0:
+        split_lines_no_blanks = split_lines_no_blanks[3:]
+    return [[item.replace("\xa0", " ").strip() for item in line] for line in split_lines_no_blanks]
+
+def extract_rows_no_lines_term(page, ipage):
+    """Extract the rows of a page containing a table with no dividing lines and a term column
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to extract
+    ipage : int
+        The (zero-based) number of the page
+
+    Returns
+    -------
+    list
+        The non-blank rows of the page, each of which is a list of strings
+    """
+
+    lines = [l.split("  ") for l in page.extract_text(layout=True, keep_blank_chars=True, x_tolerance=1).split("\n")]
+    lines = [[l for l in line if l] for line in lines]
+
+    # Removes blanks
+    return [line for line in lines if len(line) > 0]
+
+def extract_rows_with_lines(page, ipage, columns = None):
+    """Extract the rows of a page containing a table with dividing lines
+
+    When the geometry of the table was learned from the first page, the page is cropped to the horizontal extent of
+    the table and the column dividers are passed to pdfplumber as explicit vertical lines, so only the horizontal lines
+    of the table have to be found. The whole height of the page is kept, since the table of the first page starts
+    below the title. The default table detection is used if that doesn't give a table with the learned number of
+    columns (or if nothing was learned).
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The page to extract
+    ipage : int
+        The (zero-based) number of the page
+    columns : dict, optional
+        The bounding box and the column dividers of the table learned from the first page (see learn_table_geometry)
+
+    Returns
+    -------
+    list
+        The rows of the table, each of which is a list of strings (empty if the page doesn't contain a table)
+    """
+
+    table = None
+    if columns:
+        left, _, right, _ = columns["bbox"]
+        x0, top, x1, bottom = page.bbox
+        region = page.crop((max(x0, left - 1), top, min(x1, right + 1), bottom))
+        dividers = columns["columns"]
+        table = region.find_table({"vertical_strategy" : "explicit", "explicit_vertical_lines" : dividers, "horizontal_strategy" : "lines"})
+        if table is not None and any(len(row.cells) != len(dividers) - 1 for row in table.rows):
+            table = None
+    if table is None:
+        table = page.find_table()
+    return table.extract() if table is not None else []
 
 def handle_known_issues_parsing_input(lines, year, debug = False):
     """Corrects some known issues when parsing the PDF files (kind of like an empirical catch-all function)
 
+    The fixes themselves are the rules of the row_repairs module.
+
     Parameters
     ----------
     lines : list
@@ -52,60 +555,78 @@ def handle_known_issues_parsing_input(lines, year, debug = False):
 
     if debug:
         print("Handling known parsing issues ...")
-    for iline, line in enumerate(lines):
+    return repair_rows(lines, year, debug = debug)
+
+def iter_file(layout, filename, year, debug = False, program_filter = None, page_jobs = 1, low_memory = False):
+    """Parse a PDF file with a given layout and yield the program participants page by page
+
+    The home institutions are resolved in one batch per page and the people are yielded in the order in which they
+    appear in the file, so the downstream stages can start before the whole file has been parsed.
+
+    Parameters
+    ----------
+    layout : PDFLayout
+        The layout of the PDF file
+    filename : str
+        A string containing the path to the PDF file
+    year : int
+        The year the program took place
+    debug : bool, optional
+        Print extra information useful for debugging issues
+    program_filter : list, optional
+        A list of strings containing the programs to select for, in case the PDF contains information about multiple programs
+    page_jobs : int, optional
+        The number of processes used to extract the text from the pages of the PDF file
+    low_memory : bool, optional
+        Bound the memory used to extract the pages of the PDF file, at the cost of some speed (see page_extraction.iter_pages)
+
+    Yields
+    ------
+    Person
+        The next program participant
+    """
+
+    for header, ipage, rows in iter_pages(layout, filename, page_jobs = page_jobs, low_memory = low_memory):
+        people = create_people(layout.create_entries(rows, ipage, year, header, program_filter), year, debug = debug)
         if debug:
-            print(line)
-        tmp = []
-        if any("Thomas Jefferson National" in item for item in line):
-            tmp = line[0:3]
-            tmp += line[3].split("TJNA")
-            tmp[3] += "TJNAF)"
-
-        # 2021
-        if year == 2021 and "Ouango, Boinzemwende Jarmila Roxa" in line[1]:
-            tmp = line[0:1]
-            tmp += line[1].split("Roxa")
-            tmp[1] += "Roxane"
-            tmp += line[2:]
-
-        # 2020
-        if year == 2020 and len(line) >=2 and "\"" in line[1]:
-            tmp = line[0:1]
-            tmp.append(line[1][:line[1].rfind("\"") + 1])
-            tmp.append(line[1][line[1].rfind("\"") + 1:])
-            tmp += line[2:]
-        elif year == 2020 and "Vazquez Olivas" in line[0]:
-            tmp = [" ".join(line[0].split()[0:2])] + [line[0].split()[2]] + line[1:]
-        elif year == 2020 and "Teutu Talla Serges Love" in line[0]:
-            tmp = [" ".join(line[0].split()[0:2])] + [" ".join(line[0].split()[2:4])] + [" ".join(line[0].split()[4:])] + [line[1]]
-        elif year == 2020 and (len(line[0].split()) > 1 or len(line[1].split()) > 1):
-            for line_part in line:
-                tmp += line_part.split()
-            if tmp[0] == "De":
-                tmp = [" ".join(tmp[0:2])] + tmp[2:]
-            tmp = tmp[0:2] + [" ".join(tmp[2:-1] if tmp[-2] != "SNL" else tmp[2:-2])] + ([tmp[-1]] if tmp[-2] != "SNL" else tmp[-2:])
-        elif year == 2020 and len(line) == 3 and any(l in line[2] for l in Laboratories.list_names()):
-            inst_lab = line[2].split()
-            tmp = line[0:2] + [" ".join(inst_lab[0:-1] if inst_lab[-2] != "SNL" else inst_lab[0:-2])] + \
-                  ([inst_lab[-1]] if inst_lab[-2] != "SNL" else inst_lab[-2:])
-
-        if len(tmp) > 0:
-            if debug:
-                print(tmp)
-            lines[iline] = tmp
-
-    return lines
-
-def process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic(filename, year, debug = False, program_filter = None, sort = True):
-    """Parses a PDF file containing a table with no dividing lines and containing the following columns of information:
-        - Abbreviated program name
-        - The participant's last and first name
-        - The participant's home institution
-        - The national laboratory which hosted the participant
-        - The topic of the research
+            print(people)
+        yield from people
+
+def learn_table_geometry(page):
+    """Learn the geometry of a table with dividing lines from the first page and extract its rows
+
+    The table found to learn the geometry is also the one whose rows are extracted, so the first page is only
+    searched once.
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+
+    Returns
+    -------
+    tuple
+        A dict containing the bounding box ('bbox') and the sorted x coordinates of the column dividers ('columns') of
+        the table, or None if the page doesn't contain a table, and the rows of the table (see extract_rows_with_lines)
+    """
+
+    table = page.find_table()
+    if table is None:
+        return None, []
+    geometry = {"bbox" : list(table.bbox), "columns" : sorted({x for cell in table.cells for x in (cell[0], cell[2])})}
+    return geometry, table.extract()
+
+def parse_file(layout, filename, year, debug = False, program_filter = None, sort = True, program_filters = None, stream = False,
+               char_engine = False, table = False, **page_options):
+    """Parse a PDF file with a given layout and return the list of program participants
+
+    When program_filters is given, the pages are only extracted once and the rows are then selected with each of the
+    filters in turn, which is much faster than parsing the file once per program.
 
     Parameters
     ----------
+    layout : PDFLayout
+        The layout of the PDF file
     filename : str
         A string containing the path to the PDF file
     year : int
@@ -116,51 +637,80 @@ def process_file_table_no_lines_program_lastfirstname_institution_laboratory_top
         A list of strings containing the programs to select for, in case the PDF contains information about multiple programs
     sort : bool, optional
         Sort the resulting list of people by job classification ("Faculty", "Student", etc.)
+    program_filters : list, optional
+        A list of program filters (see program_filter) to apply to the same rows
+    stream : bool, optional
+        Return a generator which yields the people page by page (see iter_file), in which case sort and program_filters
+        are ignored
+    char_engine : bool, optional
+        Split the columns using the characters of the pages (see char_columns), if the layout has such a variant
+    table : bool, optional
+        Return a PeopleTable instead of a list of Person objects (or a list of PeopleTable objects if program_filters
+        is given)
+    **page_options
+        The options of page_extraction.iter_pages: page_jobs (the number of processes used to extract the text from the pages of the
+        PDF file) and low_memory (bound the memory used to extract the pages, at the cost of some speed)
 
     Returns
     -------
     list
-        A list of Person objects containing the information obtained from the PDF file
+        A list of Person objects containing the information obtained from the PDF file, or a list of such lists
+        (one per filter) if program_filters is given
     """
 
-    # declare the return object
-    people = []
-
-    # load the database for the home institutions
-    schools = load_schools(year)
-
-    # load the pdf of names
-    pdf = pdfplumber.open(filename)
-    for ipage, page in enumerate(pdf.pages):
-        split_lines = page.extract_text(layout = False, x_tolerance = 1).split('\n')
-        split_lines_no_blanks = [x.split(' ') for x in split_lines]
-        if ipage == 0:
-            split_lines_no_blanks = split_lines_no_blanks[3:]
-        split_lines_no_blanks = [[item.replace("\xa0", " ").strip() for item in line] for line in split_lines_no_blanks]
-        good_lines = handle_known_issues_parsing_input(split_lines_no_blanks, year)
-        good_vfp_lines = [line for line in good_lines if any(filter in line[0] for filter in program_filter)] \
-                         if program_filter is not None else good_lines
-        if len(good_vfp_lines) == 0:
-            continue
-        people += [Person(program = line[0].split()[0] if " " in line[0] else line[0],
-                          job = Jobs[line[0].split()[1] if " " in line[0] else "Student" \
-                                     if any(i in line[0] for i in ["SULI", "CCI"]) else "Unknown"],
-                          first_name = line[1].split(",")[1],
-                          last_name = line[1].split(",")[0],
-                          home_institution = get_institution(schools, line[2], year, debug = debug),
-                          host_doe_laboratory = Laboratories["GA_DIII_D"] if "General Atomics" in line[3] \
-                                                else Laboratories[line[3][line[3].find("(") + 1 : line[3].rfind(")")].replace(" ", "_")],
-                          topic = line[4],
-                          year = year) if len(line) == 5 else print("ERROR::" + str(line)) for line in good_vfp_lines]
-
-    if sort:
-        people.sort(key = operator.attrgetter("job.name"))
+    if char_engine:
+        layout = pdf_layouts.get(f"{layout.name}_chars", layout)
 
-    if debug:
-        print(people)
-    return people
+    if stream:
+        return iter_file(layout, filename, year, debug = debug, program_filter = program_filter, **page_options)
+
+    filters = program_filters if program_filters is not None else [program_filter]
+    entries = [[] for _ in filters]
+    for header, ipage, rows in iter_pages(layout, filename, **page_options):
+        for selected, selection in zip(entries, filters):
+            selected += layout.create_entries(rows, ipage, year, header, selection)
+
+    # resolve all of the home institutions in a single batch
+    people = (create_people_table if table else create_people)([entry for selected in entries for entry in selected], year, debug = debug)
+
+    groups = []
+    for selected in entries:
+        if sort:
+            groups.append(people[:len(selected)].sort_by_job() if table else sort_people(people[:len(selected)]))
+        else:
+            groups.append(people[:len(selected)])
+        people = people[len(selected):]
+        if debug:
+            print(groups[-1])
+    return groups if program_filters is not None else groups[0]
+
+def process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic(filename, year, **options):
+    """Parses a PDF file containing a table with no dividing lines and containing the following columns of information:
+        - Abbreviated program name
+        - The participant's last and first name
+        - The participant's home institution
+        - The national laboratory which hosted the participant
+        - The topic of the research
+
+    Parameters
+    ----------
+    filename : str
+        A string containing the path to the PDF file
+    year : int
+        The year the program took place
+    **options
+        The options of parse_file (debug, program_filter, sort, program_filters, stream, char_engine, table, page_jobs,
+        and low_memory)
+
+    Returns
+    -------
+    list
+        A list of Person objects containing the information obtained from the PDF file (see parse_file)
+    """
+
+    return parse_file(pdf_layouts["no_lines_program"], filename, year, **options)
 
-def process_file_table_no_lines_term_lastname_firstname_institution_laboratory(filename, year, debug = False, program_filter = None, sort = True):
+def process_file_table_no_lines_term_lastname_firstname_institution_laboratory(filename, year, **options):
     """Parses a PDF file containing a table with no dividing lines and containing the following columns of information:
         - The term (`season year`) in which the program took place
         - The participant's last
@@ -174,77 +724,19 @@ def process_file_table_no_lines_term_lastname_firstname_institution_laboratory(f
         A string containing the path to the PDF file
     year : int
         The year the program took place
-    debug : bool, optional
-        Print extra information useful for debugging issues
-    program_filter : list, optional
-        A list of strings containing the programs to select for, in case the PDF contains information about multiple programs
-    sort : bool, optional
-        Sort the resulting list of people by job classification ("Faculty", "Student", etc.)
+    **options
+        The options of parse_file (debug, program_filter, sort, program_filters, stream, char_engine, table, page_jobs,
+        and low_memory)
 
     Returns
     -------
     list
-        A list of Person objects containing the information obtained from the PDF file
+        A list of Person objects containing the information obtained from the PDF file (see parse_file)
     """
 
-    # declare the return object
-    people = []
-
-    # load the database for the home institutions
-    schools = load_schools(year)
-
-    # load the pdf of names
-    pdf = pdfplumber.open(filename)
-    for ipage, page in enumerate(pdf.pages):
-        lines = [l.split("  ") for l in page.extract_text(layout=True, keep_blank_chars=True, x_tolerance=1).split("\n")]
-        lines = [[l for l in line if l] for line in lines]
-
-        # Removes blanks
-        lines = [line for line in lines if len(line) > 0]
-
-        # Set the program and job values and then remove the page header and the page numbers
-        if ipage == 0:
-            program = lines[0][0]
-            program = program[program.find("(") + 1 : program.rfind(")")]
-            job = Jobs["Student" if "Participants" in lines[0][0] else lines[0][0].split()[-1].capitalize()]
-        lines = [line for line in lines if len(line) > 1]
-
-        # Remove the column headers (if they exist)
-        if "Term" in lines[0][0]:
-            lines = lines[1:]
-
-        for line in lines:
-            # Handle case when Institution and Host Lab columns are merged
-            #if len(line) == 4 and any(l in line[-1] for l in Laboratories.list_names()):
-            #    line = line[:-1] + [" ".join(line[-1].split()[:-1])] + [line[-1].split()[-1]]
-
-            # What to do if the number of columns still isn't right
-            if len(line) != 5:
-                print("ERROR::" + str(line))
-                continue
-
-            # Create the Person object and append it to the list
-            people.append(
-                Person(
-                    program = program,
-                    job = job,
-                    first_name = line[2].lstrip().strip(),
-                    last_name = line[1].lstrip().strip(),
-                    home_institution = get_institution(schools, line[3].lstrip().strip(), year, debug = debug),
-                    host_doe_laboratory = Laboratories[line[4].lstrip().strip().replace(" / ", "_").replace(" ", "_").replace("-", "_")],
-                    topic = "",
-                    year = year,
-                )
-            )
-
-    if sort:
-        people.sort(key = operator.attrgetter("job.name"))
-
-    if debug:
-        print(people)
-    return people
+    return parse_file(pdf_layouts["no_lines_term"], filename, year, **options)
 
-def process_file_table_with_lines_name_institution_laboratory_term(filename, year, debug = False, program_filter = None, sort = True):
+def process_file_table_with_lines_name_institution_laboratory_term(filename, year, **options):
     """Parses a PDF file containing a table with dividing lines and containing the following columns of information:
         - The participant's full name
         - The participant's home institution
@@ -257,89 +749,19 @@ def process_file_table_with_lines_name_institution_laboratory_term(filename, yea
         A string containing the path to the PDF file
     year : int
         The year the program took place
-    debug : bool, optional
-        Print extra information useful for debugging issues
-    program_filter : list, optional
-        A list of strings containing the programs to select for, in case the PDF contains information about multiple programs
-    sort : bool, optional
-        Sort the resulting list of people by job classification ("Faculty", "Student", etc.)
+    **options
+        The options of parse_file (debug, program_filter, sort, program_filters, stream, char_engine, table, page_jobs,
+        and low_memory)
 
     Returns
     -------
     list
-        A list of Person objects containing the information obtained from the PDF file
+        A list of Person objects containing the information obtained from the PDF file (see parse_file)
     """
 
-    # declare the return object
-    people = []
+    return parse_file(pdf_layouts["with_lines_term"], filename, year, **options)
 
-    # load the database for the home institutions
-    schools = load_schools(year)
-
-    # load the pdf of names
-    pdf = pdfplumber.open(filename)
-    program = ""
-    job = ""
-    for ipage, page in enumerate(pdf.pages):
-        table = page.extract_table()
-        if table is None:
-            continue
-
-        if ipage == 0:
-            program = page.extract_text().split("\n")[0]
-            program = program[program.find("(") + 1 : program.rfind(")")]
-            job = Jobs["Student" if table[0][0].split()[1].capitalize() == "Participant" else table[0][0].split()[1].capitalize()]
-            table = table[1:]
-        if ipage > 0 and "PARTICIPANT" in table[0][0]:
-            table = table[1:]
-
-        for row in table:
-            # Check for blank rows
-            if all(not r for r in row):
-                continue
-
-            # Find the laboratory information
-            lab = ""
-            if "(" in row[2]:
-                lab = row[2][row[2].find("(") + 1:row[2].rfind(")")]
-            else:
-                lab = row[2].replace(" ", "_").replace("\n", "")
-            if any(l in lab for l in ["SNL", "Sandia"]):
-                lab += "_CA" if any(w in row[1] for w in ["California","Mills"]) else "_NM"
-            if any(n in lab for n in ["General Atomics", "General_Atomics","General\xa0Atomics"]):
-                lab = "General_Atomics_DIII_D"
-            if lab == "TJNA": # Needed because sometimes the lab name gets cut off
-                lab = "TJNAF"
-            lab = lab.replace("\xa0","_")
-
-            # Get the name and institution of the person
-            last_name = row[0].split()[-1]
-            first_name = " ".join(row[0].split()[:-1])
-            home_institution = " ".join(row[1].split())
-            institution = get_institution(schools, home_institution, year, debug = debug)
-
-            # Create the Person object and append it to the list
-            people.append(
-                Person(
-                    program = program,
-                    job = job,
-                    first_name = first_name,
-                    last_name = last_name,
-                    home_institution = institution,
-                    host_doe_laboratory = Laboratories[lab],
-                    topic = "",
-                    year = year,
-                )
-            )
-
-    if sort:
-        people.sort(key = operator.attrgetter("job.name"))
-
-    if debug:
-        print(people)
-    return people
-
-def process_file_table_with_lines_name_institution_laboratory_area(filename, year, debug = False, program_filter = None, sort = True):
+def process_file_table_with_lines_name_institution_laboratory_area(filename, year, **options):
     """Parses a PDF file containing a table with dividing lines and containing the following columns of information:
         - The participant's full name
         - The participant's home institution
@@ -352,66 +774,114 @@ def process_file_table_with_lines_name_institution_laboratory_area(filename, yea
         A string containing the path to the PDF file
     year : int
         The year the program took place
-    debug : bool, optional
-        Print extra information useful for debugging issues
-    program_filter : list, optional
-        A list of strings containing the programs to select for, in case the PDF contains information about multiple programs
-    sort : bool, optional
-        Sort the resulting list of people by job classification ("Faculty", "Student", etc.)
+    **options
+        The options of parse_file (debug, program_filter, sort, program_filters, stream, char_engine, table, page_jobs,
+        and low_memory)
 
     Returns
     -------
     list
-        A list of Person objects containing the information obtained from the PDF file
+        A list of Person objects containing the information obtained from the PDF file (see parse_file)
     """
 
-    # declare the return object
-    people = []
-
-    # load the database for the home institutions
-    schools = load_schools(year)
-
-    # load the pdf of names
-    pdf = pdfplumber.open(filename)
-    program = ""
-    job = ""
-    for ipage, page in enumerate(pdf.pages):
-        table = page.extract_table()
-        if ipage == 0:
-            program = page.extract_text().split("\n")[0]
-            program = program[program.find("(") + 1 : program.rfind(")")]
-            job = Jobs["Student" if "Student" in page.extract_text().split("\n")[0] else "Faculty"]
-            table = table[1:]
-        for row in table:
-            lab = ""
-            if "(" in row[2] and ")" in row[2]:
-                lab = row[2][row[2].find("(") + 1:row[2].rfind(")")]
-            else:
-                lab = row[2][ : row[2].find("(") - 1].replace(" ", "_").replace("\xa0","_")
-            if "SNL" in lab or "Sandia" in lab:
-                lab += "_CA" if any(w in row[1] for w in ["California","Mills"]) else "_NM"
-            if any(n in lab for n in ["General Atomics", "General_Atomics"]):
-                lab = "General_Atomics_DIII_D"
-            last_name = row[0].split()[-1]
-            first_name = " ".join(row[0].split()[:-1])
-            home_institution = " ".join(row[1].split())
-            institution = get_institution(schools, home_institution, year, debug = debug)
-            people.append(
-                Person(
-                    program = program,
-                    job = job,
-                    first_name = first_name,
-                    last_name = last_name,
-                    home_institution = institution,
-                    host_doe_laboratory = Laboratories[lab],
-                    topic = row[3].replace("\n", "").strip(),
-                    year = year,
-                )
-            )
-
-    if sort:
-        people.sort(key = operator.attrgetter("job.name"))
+    return parse_file(pdf_layouts["with_lines_area"], filename, year, **options)
 
-    if debug:
-        print(people)
-    return people
+def read_header_no_header(page, rows):
+    """Read the header of a file whose first page doesn't contain any header information
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+    rows : list
+        The rows of the first page
+
+    Returns
+    -------
+    dict
+        An empty dict
+    """
+
+    return {}
+
+def read_header_no_lines_term(page, rows):
+    """Read the program and job from the title, the first line of a table with no dividing lines
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+    rows : list
+        The rows of the first page (see extract_rows_no_lines_term)
+
+    Returns
+    -------
+    dict
+        A dict containing the program and the name of the job of the participants
+    """
+
+    # the title can be split into several cells when the gaps between its words line up with the column boundaries
+    title = " ".join(cell.strip() for cell in rows[0])
+    program = title[title.find("(") + 1 : title.rfind(")")]
+    job = Jobs["Student" if "Participants" in title else title.split()[-1].capitalize()]
+    return {"program" : program, "job" : job.name}
+
+def read_header_with_lines_area(page, rows):
+    """Read the program and job from the title of a table with dividing lines and a research area column
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+    rows : list
+        The rows of the first page (see extract_rows_with_lines)
+
+    Returns
+    -------
+    dict
+        A dict containing the program and the name of the job of the participants
+    """
+
+    title = page.extract_text().split("\n")[0]
+    program = title[title.find("(") + 1 : title.rfind(")")]
+    job = Jobs["Student" if "Student" in title else "Faculty"]
+    return {"program" : program, "job" : job.name}
+
+def read_header_with_lines_term(page, rows):
+    """Read the program and job from the title and column headers of a table with dividing lines and a term column
+
+    Parameters
+    ----------
+    page : pdfplumber.page.Page
+        The first page of the file
+    rows : list
+        The rows of the first page (see extract_rows_with_lines)
+
+    Returns
+    -------
+    dict
+        A dict containing the program and the name of the job of the participants (both empty if the first page has no table)
+    """
+
+    if len(rows) == 0:
+        return {"program" : "", "job" : ""}
+
+    program = page.extract_text().split("\n")[0]
+    program = program[program.find("(") + 1 : program.rfind(")")]
+    job = Jobs["Student" if rows[0][0].split()[1].capitalize() == "Participant" else rows[0][0].split()[1].capitalize()]
+    return {"program" : program, "job" : job.name}
+
+pdf_layouts = {
+    layout.name : layout for layout in [
+        PDFLayout("no_lines_program", extract_rows_no_lines_program, read_header_no_header, create_entries_no_lines_program),
+        PDFLayout("no_lines_term", extract_rows_no_lines_term, read_header_no_lines_term, create_entries_no_lines_term),
+        PDFLayout("with_lines_term", extract_rows_with_lines, read_header_with_lines_term, create_entries_with_lines_term,
+                  learn_columns = learn_table_geometry, learn_rows = True),
+        PDFLayout("with_lines_area", extract_rows_with_lines, read_header_with_lines_area, create_entries_with_lines_area,
+                  learn_columns = learn_table_geometry, learn_rows = True),
+        PDFLayout("no_lines_program_chars", char_columns.extract_rows_no_lines_program, read_header_no_header, create_entries_no_lines_program,
+                  learn_columns = char_columns.learn_columns, settings = char_columns.char_column_settings),
+        PDFLayout("no_lines_term_chars", char_columns.extract_rows_no_lines_term, read_header_no_lines_term, create_entries_no_lines_term,
+                  learn_columns = char_columns.learn_columns, settings = char_columns.char_column_settings),
+    ]
+}
@@ -0,0 +1,292 @@
+#!/bin/env python3
+
+"""people_table
+
+This module contains a columnar alternative to the lists of Person objects. A PeopleTable stores each attribute of the
+people in its own column, so the filters, counts, and coordinates needed by the plots are computed on whole columns
+instead of walking a list of objects attribute by attribute. The programs, jobs, laboratories, institution names,
+and years are stored as categories and the coordinates of the home institutions as float arrays.
+
+Constants
+---------
+categorical_columns : list
+    The names of the columns stored as categories
+people_columns : list
+    The names of the columns of a PeopleTable, in order
+
+Classes
+----------
+PeopleTable
+    Stores the information about a list of people column by column
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from laboratory import Laboratories
+from person import Jobs, Person
+
+categorical_columns = ["program", "job", "institution_name", "host_doe_laboratory", "year"]
+people_columns = [
+    "program", "job", "first_name", "last_name", "home_institution", "institution_name", "latitude", "longitude",
+    "host_doe_laboratory", "topic", "year",
+]
+
+class PeopleTable:
+    """A class which stores the information about a list of people column by column.
+
+    The jobs and the laboratories are stored by name, while the home_institution column keeps the (shared) Institution
+    objects so that the Person objects can be rebuilt exactly.
+
+    Attributes
+    ----------
+    data : DataFrame
+        The table of people, with the columns listed in people_columns (the coordinates are NaN for the people whose
+        home institution is unknown)
+
+    Methods
+    -------
+    concat(tables)
+        Returns a new table containing the people of several tables, in order
+    count_by(*columns)
+        Returns the number of people for each combination of the values of some columns
+    filter_by_topic(strict = False, topics = None)
+        Returns a new table containing only the people selected by their research topic(s)
+    from_columns(columns)
+        Returns a new table built from a dict of the values of each attribute of the Person class
+    from_entries(entries, institutions)
+        Returns a new table built from the entries created by the parsers and their resolved institutions
+    from_people(people)
+        Returns a new table built from a list of Person objects
+    laboratory_coordinates
+        Returns the longitude and latitude of the host laboratory of each person
+    sort_by_job
+        Returns a new table sorted by job classification
+    to_people
+        Returns the list of Person objects stored in the table
+    """
+
+    def __init__(self, data):
+        """This method initializes the data members of the PeopleTable class.
+
+        Parameters
+        ----------
+        data : DataFrame
+            The table of people, with the columns listed in people_columns
+        """
+
+        self.data = data
+
+    def __getitem__(self, selection):
+        """Return the Person object of a row, or a new table containing the rows selected by a slice or a boolean mask"""
+
+        if isinstance(selection, (int, np.integer)):
+            # a list keeps the row as a table and raises an IndexError past the end, which ends the iteration protocol
+            return PeopleTable(self.data.iloc[[selection]].reset_index(drop = True)).to_people()[0]
+        return PeopleTable(self.data.iloc[selection].reset_index(drop = True))
+
+    def __iter__(self):
+        """Return an iterator over the Person objects stored in the table"""
+
+        return iter(self.to_people())
+
+    def __len__(self):
+        """Return the number of people in the table"""
+
+        return len(self.data)
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"PeopleTable({len(self)} people)"
+
+    @classmethod
+    def concat(cls, tables):
+        """Return a new table containing the people of several tables, in order
+
+        Parameters
+        ----------
+        tables : list
+            The PeopleTable objects to combine
+
+        Returns
+        -------
+        PeopleTable
+            The combined table
+        """
+
+        if len(tables) == 0:
+            return cls.from_people([])
+        data = pd.concat([table.data.astype({name : object for name in categorical_columns}) for table in tables], ignore_index = True)
+        return cls(data.astype({name : "category" for name in categorical_columns}))
+
+    def count_by(self, *columns):
+        """Return the number of people for each combination of the values of some columns
+
+        Parameters
+        ----------
+        columns : str
+            The names of the columns to group by (i.e. 'program' and 'year')
+
+        Returns
+        -------
+        Series
+            The number of people in each group, indexed by the values of the columns
+        """
+
+        return self.data.groupby(list(columns), observed = True).size()
+
+    def filter_by_topic(self, strict = False, topics = None):
+        """Return a new table containing only the people selected by their research topic(s)
+
+        The people are selected in the same way as filter_people_by_topic.
+
+        Parameters
+        ----------
+        strict : bool, optional
+            If strict is True, then the people with no topic stored are removed as well
+        topics : list, optional
+            A list of keyword strings that must be present in the research topic in order for the person to be kept
+
+        Returns
+        -------
+        PeopleTable
+            The filtered table
+
+        Raises
+        ------
+        TypeError
+            If topics is not a list of strings
+        """
+
+        if not isinstance(topics, list):
+            raise TypeError("ERROR::PeopleTable.filter_by_topic() The 'topics' argument must be a list of strings.")
+
+        topic = self.data["topic"].fillna("").astype(str)
+        keep = np.zeros(len(self), dtype = bool)
+        if not strict:
+            keep |= (topic == "").to_numpy()
+        if len(topics) > 0:
+            keep |= topic.str.contains("|".join(re.escape(t) for t in topics), regex = True).to_numpy()
+        return self[keep]
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Return a new table built from a dict of the values of each attribute of the Person class
+
+        Parameters
+        ----------
+        columns : dict
+            A dict of {str : list} containing the values of each of the attributes of the Person class, where the
+            home institutions are Institution objects (or None) and the laboratories are Laboratories members
+
+        Returns
+        -------
+        PeopleTable
+            The new table
+        """
+
+        institutions = columns["home_institution"]
+        data = pd.DataFrame({
+            "program" : pd.Categorical(columns["program"]),
+            "job" : pd.Categorical([job.name if isinstance(job, Jobs) else job for job in columns["job"]]),
+            "first_name" : pd.Series(columns["first_name"], dtype = object),
+            "last_name" : pd.Series(columns["last_name"], dtype = object),
+            "home_institution" : pd.Series(institutions, dtype = object),
+            "institution_name" : pd.Categorical([inst.name if inst is not None else None for inst in institutions]),
+            "latitude" : np.array([inst.latitude if inst is not None else np.nan for inst in institutions], dtype = float),
+            "longitude" : np.array([inst.longitude if inst is not None else np.nan for inst in institutions], dtype = float),
+            "host_doe_laboratory" : pd.Categorical([laboratory.name if laboratory is not None else None
+                                                    for laboratory in columns["host_doe_laboratory"]]),
+            "topic" : pd.Series(columns["topic"], dtype = object),
+            "year" : pd.Categorical(columns["year"]),
+        }, columns = people_columns)
+        return cls(data)
+
+    @classmethod
+    def from_entries(cls, entries, institutions):
+        """Return a new table built from the entries created by the parsers and their resolved institutions
+
+        Parameters
+        ----------
+        entries : list
+            A list of dicts containing the arguments needed to create each Person (see pdf_parsers.create_people)
+        institutions : list
+            The Institution object (or None) of each of the entries
+
+        Returns
+        -------
+        PeopleTable
+            The new table
+        """
+
+        columns = {name : [entry[name] for entry in entries] for name in Person.__slots__}
+        columns["home_institution"] = institutions
+        return cls.from_columns(columns)
+
+    @classmethod
+    def from_people(cls, people):
+        """Return a new table built from a list of Person objects
+
+        Parameters
+        ----------
+        people : list
+            A list of Person objects
+
+        Returns
+        -------
+        PeopleTable
+            The new table
+        """
+
+        return cls.from_columns({name : [getattr(person, name) for person in people] for name in Person.__slots__})
+
+    def laboratory_coordinates(self):
+        """Return the longitude and latitude of the host laboratory of each person
+
+        Returns
+        -------
+        tuple
+            A tuple of two numpy arrays containing the longitudes and the latitudes (NaN if the laboratory is unknown)
+        """
+
+        # the code of a missing laboratory is -1, which selects the NaN appended to the coordinates
+        codes = self.data["host_doe_laboratory"].cat.codes.to_numpy()
+        laboratories = [Laboratories[name].value for name in self.data["host_doe_laboratory"].cat.categories]
+        longitudes = np.array([laboratory.longitude for laboratory in laboratories] + [np.nan], dtype = float)
+        latitudes = np.array([laboratory.latitude for laboratory in laboratories] + [np.nan], dtype = float)
+        return longitudes[codes], latitudes[codes]
+
+    def sort_by_job(self):
+        """Return a new table sorted by job classification ("Faculty", "Student", etc.)
+
+        The sort is stable, so the people with the same job keep their order, like sort_people.
+
+        Returns
+        -------
+        PeopleTable
+            The sorted table
+        """
+
+        return PeopleTable(self.data.sort_values("job", kind = "stable", key = lambda job: job.astype(str)).reset_index(drop = True))
+
+    def to_people(self):
+        """Return the list of Person objects stored in the table
+
+        Returns
+        -------
+        list
+            A list of Person objects, in the order of the rows
+        """
+
+        data = self.data
+        jobs = [Jobs[name] if name in Jobs.__members__ else name for name in data["job"].tolist()]
+        laboratories = [Laboratories[name] if isinstance(name, str) else None for name in data["host_doe_laboratory"].tolist()]
+        return [
+            Person(*values) for values in zip(
+                data["program"].tolist(), jobs, data["first_name"].tolist(), data["last_name"].tolist(),
+                data["home_institution"].tolist(), laboratories, data["topic"].tolist(), data["year"].tolist()
+            )
+        ]
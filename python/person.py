@@ -12,14 +12,20 @@ Person
     Stores information about a person who participated in one of the programs tracks by WDTS
 """
 
+from concurrent.futures import Future, ProcessPoolExecutor
+import json
+import operator
 import os
 
 import jsons
 from magiconfig import MagiConfig
+import numpy as np
 
 from laboratory import Laboratories
-from institution import Institution
-from utilities import ExtendedEnum, get_formatted_filename
+from institution import Institution, shared_institution
+from page_cache import page_cache
+from school_registry import configure_school_registry, school_registry
+from utilities import ExtendedEnum, get_formatted_filename, intern_string
 
 class Jobs(ExtendedEnum):
     """Enumerate the job classifications"""
@@ -61,6 +67,8 @@ class Person:
         Returns a formated string containing the first and last names of the Person
     """
 
+    __slots__ = ("program", "job", "first_name", "last_name", "home_institution", "host_doe_laboratory", "topic", "year")
+
     def __init__(self, program, job, first_name, last_name, home_institution, host_doe_laboratory, topic, year):
         """This method initializes the data members of the Person class.
 
@@ -84,13 +92,13 @@ class Person:
             The year the program took place
         """
 
-        self.program = program
+        self.program = intern_string(program)
         self.job = job
         self.first_name = first_name
         self.last_name = last_name
         self.home_institution = home_institution
         self.host_doe_laboratory = host_doe_laboratory
-        self.topic = topic
+        self.topic = intern_string(topic)
         self.year = year
 
     def __repr__(self):
@@ -106,10 +114,153 @@ class Person:
 
         return f"{self.last_name}, {self.first_name}"
 
-def get_people(files, types, years, process_file_map, debug = False):
+def cap_page_jobs(file_jobs, page_jobs):
+    """Return the number of page processes each of the file processes can start without outnumbering the CPUs
+
+    Each of the file processes starts its own pool of page processes, so the two numbers multiply.
+
+    Parameters
+    ----------
+    file_jobs : int
+        The number of processes parsing the files
+    page_jobs : int
+        The requested number of processes extracting the pages of each file
+
+    Returns
+    -------
+    int
+        The number of page processes to use for each file
+    """
+
+    capped = max(1, (os.cpu_count() or 1) // file_jobs)
+    if page_jobs > capped:
+        print(f"WARNING::Using {capped} page processes per file instead of {page_jobs}, so that the {file_jobs} file processes "
+              "don't start more processes than there are CPUs")
+        return capped
+    return page_jobs
+
+def check_input_files(files, types, years, process_file_map):
+    """Make sure that every input file can be processed before any of them are parsed
+
+    Parameters
+    ----------
+    files : list
+        A list of strings containing the path to the input files
+    types : list
+        A list of strings containing the initials of the programs represented
+    years : list
+        A list of integer years that the programs took place
+    process_file_map : dict
+        A dictionary of parser functions whose key is a tuple of (program, year)
+
+    Returns
+    -------
+    list
+        The extension of each file
+    """
+
+    extensions = [os.path.splitext(filename)[1] for filename in files]
+    for ifilename, file_extension in enumerate(extensions):
+        if file_extension == ".pdf":
+            if years[ifilename] <= 2014:
+                raise RuntimeError("Unfortunately we are unable to get university/institution locations for any year prior to 2015.")
+            if (types[ifilename], years[ifilename]) not in process_file_map:
+                raise RuntimeError(f"We don't know how to process {types[ifilename]} files for the year {years[ifilename]}.")
+        elif file_extension not in [".txt", ".npz", ".jsonl"]:
+            raise RuntimeError(f"Uh oh! We don't know how to read a '{file_extension}' file.")
+    return extensions
+
+def configure_worker(max_memory = None, use_cache = True, use_page_cache = True):
+    """Copy the options of the shared school registry and page cache into a worker process
+
+    Parameters
+    ----------
+    max_memory : int, optional
+        The maximum estimated size, in bytes, of the loaded school indexes (None for no limit)
+    use_cache : bool, optional
+        Read from and write to the on-disk caches of the school databases and of the name resolutions
+    use_page_cache : bool, optional
+        Read from and write to the on-disk cache of the rows extracted from the PDF files
+    """
+
+    configure_school_registry(max_memory, use_cache)
+    page_cache.enabled = use_page_cache
+
+def decode_strings(categories, codes):
+    """Rebuild a list of strings from its categories and codes in a single bulk lookup
+
+    Parameters
+    ----------
+    categories : numpy.ndarray
+        The distinct strings
+    codes : numpy.ndarray
+        The index of the category of each value (-1 for None)
+
+    Returns
+    -------
+    list
+        The list of strings, where the equal strings are the same object
+    """
+
+    return np.array(categories.tolist() + [None], dtype = object)[codes].tolist()
+
+def deserialize_person(record):
+    """Build a Person object from its serialized attributes (see serialize_person)
+
+    This is much faster than jsons.load, since the objects are built directly from the decoded JSON.
+
+    Parameters
+    ----------
+    record : dict
+        The serialized attributes of the person
+
+    Returns
+    -------
+    Person
+        The person, whose institution is shared with the other people from the same school
+    """
+
+    institution = record["home_institution"]
+    laboratory = record["host_doe_laboratory"]
+    return Person(
+        record["program"],
+        Jobs[record["job"]] if record["job"] in Jobs.__members__ else record["job"],
+        record["first_name"],
+        record["last_name"],
+        shared_institution(**institution) if institution is not None else None,
+        Laboratories[laboratory] if laboratory is not None else None,
+        record["topic"],
+        record["year"],
+    )
+
+def encode_strings(values):
+    """Encode a list of strings as the array of the distinct strings and the index of each value in that array
+
+    Parameters
+    ----------
+    values : list
+        The strings to encode (None is allowed)
+
+    Returns
+    -------
+    tuple
+        The array of the distinct strings, in order of appearance, and the int32 array of codes (-1 for None)
+    """
+
+    index = {}
+    codes = np.array([-1 if value is None else index.setdefault(value, len(index)) for value in values], dtype = np.int32)
+    return np.array(list(index), dtype = str), codes
+
+def get_people(files, types, years, process_file_map, debug = False, jobs = 1, manifest = None, **parser_options):
     """This function first determines the input file type (pdf or txt) and then figures out how to parse that file
     to find a list of participant names. If it's a pdf file, then the code will call one of the pdf parsers. If the file
-    is a serialized list of people, then it will call the necessary functions to deserialize the list.
+    is a serialized list of people, then it will call the necessary functions to deserialize the list. Several saved
+    lists of people can be combined: they are merged in order, without the people already found (see merge_results).
+
+    The pdf files are independent of each other, so they can be parsed in a pool of processes. The results are
+    always merged in the order of the files, which makes the output identical to parsing the files one at a time.
+    When the same pdf file is requested for several programs, it's only parsed once and the people are split up by
+    program afterwards.
 
     Parameters
     ----------
@@ -123,39 +274,222 @@ def get_people(files, types, years, process_file_map, debug = False):
         A dictionary of parser functions whose key is a tuple of (program, year)
     debug : bool
         Print extra information useful for debugging issues
+    jobs : int, optional
+        The number of processes used to parse the pdf files (1 parses them in the current process)
+    manifest : IngestManifest, optional
+        The manifest of the pdf files already parsed (see ingest_manifest). The people of the unchanged files are read
+        back from their shards instead of parsing the files again and the newly parsed files are added to the manifest.
+    parser_options : dict, optional
+        Extra keyword arguments passed to the pdf parsers (i.e. page_jobs). When the files are parsed in a pool of
+        processes, page_jobs is capped so that the processes of the nested page pools don't outnumber the CPUs.
     """
 
-    people = []
+    extensions = check_input_files(files, types, years, process_file_map)
+
+    groups = group_pdf_files(files, types, years, process_file_map)
+
+    executor = None
+    if jobs > 1 and len(groups) > 1:
+        if "page_jobs" in parser_options:
+            parser_options["page_jobs"] = cap_page_jobs(min(jobs, len(groups)), parser_options["page_jobs"])
+        executor = ProcessPoolExecutor(
+            max_workers = min(jobs, len(groups)),
+            initializer = configure_worker,
+            initargs = (school_registry.max_memory, school_registry.use_cache, page_cache.enabled),
+        )
+
+    try:
+        # each result is stored along with the position of the file's people in the list returned by a grouped parse
+        results = []
+        parses = {}
+        parsed = {}
+        for ifilename, filename in enumerate(files):
+            if extensions[ifilename] != ".pdf":
+                results.append((read_people_file(filename, debug = debug), None))
+                continue
+
+            process_file = process_file_map[(types[ifilename], years[ifilename])]
+            group = groups[(filename, years[ifilename], process_file)]
+            if group[0] == ifilename:
+                programs = [types[igroup] for igroup in group]
+                parses[ifilename] = manifest.get(filename, years[ifilename], programs, process_file.__name__, parser_options) \
+                                    if manifest is not None else None
+                if parses[ifilename] is not None:
+                    print(f"Reusing the people of the unchanged file {filename} (year = {years[ifilename]}, program = {', '.join(programs)}) ... ")
+                else:
+                    print(f"Processing the file {filename} (year = {years[ifilename]}, program = {', '.join(programs)}) ... ")
+                    parsed[ifilename] = programs
+                    parses[ifilename] = submit_pdf_parse(process_file, filename, years[ifilename], programs, executor, debug = debug,
+                                                         **parser_options)
+            results.append((parses[group[0]], group.index(ifilename) if len(group) > 1 else None))
+
+        people = merge_results(extensions, results)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures = True)
+
+    # record the newly parsed files, whose results are all available once they have been merged
+    if manifest is not None:
+        for ifilename, programs in parsed.items():
+            manifest.put(files[ifilename], years[ifilename], programs, process_file_map[(types[ifilename], years[ifilename])].__name__,
+                         parser_options, parses[ifilename].result() if isinstance(parses[ifilename], Future) else parses[ifilename])
+        manifest.save()
+    return people
+
+def group_pdf_files(files, types, years, process_file_map):
+    """Group the requests for the same pdf file, year, and parser, which only differ by program
+
+    A file containing several programs (i.e. WDTS-SULI-CCI-VFP-Summer-2021.pdf) is often requested once per program.
+    Grouping the requests allows the file to be parsed a single time and then split up by program.
+
+    Parameters
+    ----------
+    files : list
+        A list of strings containing the path to the input files
+    types : list
+        A list of strings containing the initials of the programs represented
+    years : list
+        A list of integer years that the programs took place
+    process_file_map : dict
+        A dictionary of parser functions whose key is a tuple of (program, year)
+
+    Returns
+    -------
+    dict
+        A dict of {tuple : list} mapping each (filename, year, parser) to the indices of the files requesting it
+    """
+
+    groups = {}
     for ifilename, filename in enumerate(files):
-        _, file_extension = os.path.splitext(filename)
+        if os.path.splitext(filename)[1] == ".pdf":
+            key = (filename, years[ifilename], process_file_map[(types[ifilename], years[ifilename])])
+            groups.setdefault(key, []).append(ifilename)
+    return groups
 
-        if file_extension == ".pdf":
-            if years[ifilename] <= 2014:
-                raise RuntimeError("Unfortunately we are unable to get university/institution locations for any year prior to 2015.")
-            if file_extension == ".pdf" and (types[ifilename], years[ifilename]) not in process_file_map:
-                raise RuntimeError(f"We don't know how to process {types[ifilename]} files for the year {years[ifilename]}.")
+def iter_people(files, types, years, process_file_map, debug = False, **parser_options):
+    """Yield the people found in a list of input files, one at a time, as each page of each PDF file is parsed
+
+    This is the streaming counterpart of get_people. The files are handled one after the other, each PDF file being
+    parsed page by page (see pdf_parsers.iter_file), so the people can be consumed before the later files have been
+    parsed and the complete list never has to be kept in memory. The people are yielded in the order in which they
+    appear in the files; use sort_people as a terminal stage if they need to be ordered by job. Unlike get_people,
+    the duplicate people found in the saved lists of people aren't dropped, since that would require keeping the key of
+    every person yielded.
+
+    Parameters
+    ----------
+    files : list
+        A list of strings containing the paths to the input files
+    types : list
+        The program which each of the files describes
+    years : list
+        The year which each of the files describes
+    process_file_map : dict
+        A dict of {(str, int) : callable} returning the parser to use for each program and year
+    debug : bool, optional
+        Print extra information useful for debugging issues
+    **parser_options
+        Extra keyword arguments forwarded to the PDF parsers (e.g. page_jobs)
 
+    Yields
+    ------
+    Person
+        The next person found in the input files
+    """
+
+    extensions = check_input_files(files, types, years, process_file_map)
+    for ifilename, filename in enumerate(files):
+        if extensions[ifilename] == ".pdf":
             print(f"Processing the file {filename} (year = {years[ifilename]}, program = {types[ifilename]}) ... ")
-            people += process_file_map[(types[ifilename], years[ifilename])](
-                filename,
-                years[ifilename],
-                debug = debug,
-                program_filter = [types[ifilename]]
-            )
-        elif file_extension == ".txt":
+            yield from process_file_map[(types[ifilename], years[ifilename])](filename, years[ifilename], debug = debug,
+                                                                               program_filter = [types[ifilename]],
+                                                                               stream = True, **parser_options)
+        elif extensions[ifilename] == ".jsonl":
             print(f"Processing the file {filename} ... ")
-            with open(filename, "r", encoding="utf8") as file:
-                header = read_header(file)
-                config = jsons.loads(' '.join(header.split()), MagiConfig)
-                for isubfilename, subfilename in enumerate(config.files):
-                    print(f"\tContains people from {subfilename} (year = {config.years[isubfilename]}, program = {config.types[isubfilename]})")
-                people = read_people(file)
-                if debug:
-                    print(people)
+            yield from iter_people_jsonl(filename)
         else:
-            raise RuntimeError(f"Uh oh! We don't know how to read a '{file_extension}' file.")
+            yield from read_people_file(filename, debug)
+
+def iter_people_jsonl(filename, delimiter = "#"):
+    """Yield the people stored in a JSON Lines file one at a time, reading the file line by line
+
+    Only one line is held in memory at a time, whatever the size of the file. The header lines (starting with the
+    delimiter) are skipped, including those written when people were appended to the file by a later run.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the JSON Lines file
+    delimiter : str, optional
+        The string at the begining of a line which denotes that it's part of a header
+
+    Yields
+    ------
+    Person
+        The next person stored in the file
+    """
+
+    with open(filename, "r", encoding="utf8") as file:
+        for line in file:
+            if line.strip() and not line.startswith(delimiter):
+                yield deserialize_person(json.loads(line))
+
+def merge_results(extensions, results):
+    """Merge the people found in each of the input files, in the order of the files
+
+    The people parsed from the pdf files are all kept. The saved lists of people (txt, jsonl, or npz files) are merged
+    with them, dropping the people whose key (see person_key) was already found, so overlapping snapshots can be
+    combined. The keys are kept in a set, so merging takes a time proportional to the number of people.
+
+    Parameters
+    ----------
+    extensions : list
+        The extension of each of the input files
+    results : list
+        A list of (result, position) tuples for each of the input files, where the result is a list of people (or a
+        Future returning it) and the position, if not None, selects the file's people from a grouped parse
+
+    Returns
+    -------
+    list
+        The list of Person objects
+    """
+
+    # the people read from a saved file are only added if they weren't found in an earlier file
+    people = []
+    found = set()
+    for file_extension, (result, position) in zip(extensions, results):
+        result = result.result() if isinstance(result, Future) else result
+        result = result[position] if position is not None else result
+        if file_extension == ".pdf":
+            people += result
+            found.update(map(person_key, result))
+            continue
+        for person in result:
+            key = person_key(person)
+            if key not in found:
+                found.add(key)
+                people.append(person)
     return people
 
+def person_key(person):
+    """Return the key identifying a participant when merging saved lists of people
+
+    Parameters
+    ----------
+    person : Person
+        The person
+
+    Returns
+    -------
+    tuple
+        The program, year, last name, first name, name of the home institution, and name of the host laboratory
+    """
+
+    return (person.program, person.year, person.last_name, person.first_name,
+            getattr(person.home_institution, "name", person.home_institution),
+            getattr(person.host_doe_laboratory, "name", person.host_doe_laboratory))
+
 def read_header(file, delimiter = "#"):
     """Read the header for an open file
 
@@ -197,20 +531,81 @@ def read_people(file, delimiter = "#", header_removed = False):
     if not header_removed:
         _ = read_header(file, delimiter)
     lines = file.readlines()
-    list_people = jsons.loads(''.join(lines))
-    deserialized_people  = []
-    for person in list_people:
-        deserialized_people.append(jsons.load(person, Person))
-        deserialized_people[-1].job = jsons.load(deserialized_people[-1].job, Jobs)
-        deserialized_people[-1].home_institution = jsons.load(deserialized_people[-1].home_institution, Institution)
-        deserialized_people[-1].host_doe_laboratory = jsons.load(deserialized_people[-1].host_doe_laboratory, Laboratories)
-    return deserialized_people
+    return [deserialize_person(person) for person in json.loads(''.join(lines))]
+
+def read_people_file(filename, debug = False):
+    """Read a list of people, along with the header describing where they came from, from a text file (or from a JSON
+    Lines file or a NumPy archive, depending on the extension)
+
+    Parameters
+    ----------
+    filename : str
+        The path to the text file
+    debug : bool, optional
+        Print extra information useful for debugging issues
+
+    Returns
+    -------
+    list
+        A list of Person objects
+    """
+
+    print(f"Processing the file {filename} ... ")
+    extension = os.path.splitext(filename)[1]
+    if extension == ".npz":
+        header, people = read_people_npz(filename)
+    elif extension == ".jsonl":
+        with open(filename, "r", encoding="utf8") as file:
+            header = read_header(file)
+        people = list(iter_people_jsonl(filename))
+    else:
+        with open(filename, "r", encoding="utf8") as file:
+            header = read_header(file)
+            people = read_people(file)
+    config = jsons.loads(' '.join(header.split()), MagiConfig)
+    for isubfilename, subfilename in enumerate(config.files):
+        print(f"\tContains people from {subfilename} (year = {config.years[isubfilename]}, program = {config.types[isubfilename]})")
+    if debug:
+        print(people)
+    return people
+
+def read_people_npz(filename):
+    """Read a list of people, along with the header describing where they came from, from a NumPy archive
+
+    Every attribute is stored as an array (see write_people_npz), so the whole list is decoded with a few bulk lookups
+    instead of deserializing each person. The people from the same institution share one Institution object.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the archive
+
+    Returns
+    -------
+    tuple
+        The header (the serialized MagiConfig arguments) and the list of Person objects
+    """
+
+    with np.load(filename, allow_pickle = False) as archive:
+        arrays = dict(archive.items())
+
+    columns = {name : decode_strings(arrays[f"{name}_categories"], arrays[f"{name}_codes"])
+               for name in ["program", "job", "first_name", "last_name", "host_doe_laboratory", "topic"]}
+    records = zip(*[arrays[f"institution_{name}"].tolist() for name in ["name", "city", "state", "latitude", "longitude"]])
+    institutions = [shared_institution(*record) for record in records] + [None]
+    columns["home_institution"] = [institutions[code] for code in arrays["home_institution_codes"].tolist()]
+    columns["year"] = arrays["year"].tolist()
+    columns["job"] = [Jobs[name] if name in Jobs.__members__ else name for name in columns["job"]]
+    columns["host_doe_laboratory"] = [Laboratories[name] if name is not None else None for name in columns["host_doe_laboratory"]]
+    return str(arrays["header"]), [Person(*values) for values in zip(*[columns[name] for name in Person.__slots__])]
 
 def save_people(arguments, people):
     """Save the list of people to a text file for later review or analysis.
 
     Each Person object will be JSON serialized and then written to a text file. The file will also contain a header which shows
     the MagicConfig arguments used to create the list of people. This is there so that the list can be recreated if needed.
+    The format is chosen by the save_format argument: 'txt' (the default), 'jsonl' (see write_people_jsonl), or 'npz'
+    (see write_people_npz).
 
     Parameters
     ----------
@@ -220,15 +615,201 @@ def save_people(arguments, people):
         A list of Person objects
     """
 
-    output_filename = get_formatted_filename(arguments.output_path, "people", "txt")
-    with open(output_filename, "w", encoding="utf8") as file:
+    save_format = getattr(arguments, "save_format", "txt")
+    write = {"npz" : write_people_npz, "jsonl" : write_people_jsonl}.get(save_format, write_people)
+    write(get_formatted_filename(arguments.output_path, "people", save_format), arguments, people)
+
+def serialize_person(person):
+    """Return the attributes of a person in the form stored in the text and JSON Lines files
+
+    Parameters
+    ----------
+    person : Person
+        The person to serialize
+
+    Returns
+    -------
+    dict
+        The attributes of the person, with the job and the laboratory replaced by their names and the institution by
+        a dict of its attributes
+    """
+
+    institution = person.home_institution
+    return {
+        "first_name" : person.first_name,
+        "home_institution" : {name : getattr(institution, name) for name in Institution.__slots__} if institution is not None else None,
+        "host_doe_laboratory" : person.host_doe_laboratory.name if person.host_doe_laboratory is not None else None,
+        "job" : person.job.name if isinstance(person.job, Jobs) else person.job,
+        "last_name" : person.last_name,
+        "program" : person.program,
+        "topic" : person.topic,
+        "year" : person.year,
+    }
+
+def sort_people(people):
+    """Sort the people by job classification ("Faculty", "Student", etc.)
+
+    The sort is stable, so the people with the same job keep the order in which they were found. It can be used as
+    the terminal stage of a stream of people (see iter_people).
+
+    Parameters
+    ----------
+    people : iterable
+        The Person objects to sort
+
+    Returns
+    -------
+    list
+        A new list of the Person objects sorted by the name of their job
+    """
+
+    return sorted(people, key = operator.attrgetter("job.name"))
+
+def submit_pdf_parse(process_file, filename, year, programs, executor = None, **parser_options):
+    """Parse a pdf file for one or more programs, either in the current process or in a pool of processes
+
+    Parameters
+    ----------
+    process_file : callable
+        The parser to use for the file
+    filename : str
+        The path to the pdf file
+    year : int
+        The year the programs took place
+    programs : list
+        The programs selected from the file
+    executor : concurrent.futures.Executor, optional
+        The pool of processes in which to parse the file (None parses it in the current process)
+    parser_options : dict, optional
+        Extra keyword arguments passed to the parser (i.e. debug and page_jobs)
+
+    Returns
+    -------
+    list or Future
+        The list of people found in the file, or a list of such lists (one per program) if there are several programs,
+        or a Future returning it if the file is parsed in a pool of processes
+    """
+
+    options = dict(parser_options)
+    if len(programs) > 1:
+        options["program_filters"] = [[program] for program in programs]
+    else:
+        options["program_filter"] = programs
+    if executor is not None:
+        return executor.submit(process_file, filename, year, **options)
+    return process_file(filename, year, **options)
+
+def write_header(file, arguments, delimiter = "#"):
+    """Write the header describing where a list of people came from to an open file
+
+    Parameters
+    ----------
+    file : _io.TextIOWrapper
+        The open file object
+    arguments : MagicConfig
+        The arguments used to create the list of people, which must at least contain the files, types, and years
+    delimiter : str, optional
+        The string at the begining of a line which denotes that it's part of the header
+    """
+
+    header = jsons.dumps(arguments, jdkwargs={'indent' : 4, 'sort_keys' : False})
+    for line in header.split("\n"):
+        file.write(f"{delimiter}{line}\n")
+
+def write_people(filename, arguments, people):
+    """Write a list of people, along with the header describing where they came from, to a text file
+
+    The file can be read back with read_people_file.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the text file
+    arguments : MagicConfig
+        The arguments used to create the list of people, which must at least contain the files, types, and years
+    people : list
+        A list of Person objects
+    """
+
+    with open(filename, "w", encoding="utf8") as file:
         # Write a header to the file
-        header = jsons.dumps(arguments, jdkwargs={'indent' : 4, 'sort_keys' : False})
-        for line in header.split("\n"):
-            file.write(f"#{line}\n")
+        write_header(file, arguments)
 
         #for person in people:
         #    serialized_person = jsons.dumps(person, jdkwargs={'indent' : 4, 'sort_keys' : False})
         #    file.write(f"{serialized_person}\n")
         serialized_people = jsons.dumps(people, jdkwargs={'indent' : 4, 'sort_keys' : False})
         file.write(f"{serialized_people}")
+
+def write_people_jsonl(filename, arguments, people, append = False):
+    """Write a list of people, along with the header describing where they came from, to a JSON Lines file
+
+    Each person is written on its own line as soon as it's produced, so people can be a generator (i.e. iter_people)
+    and the list never has to be built in memory. The file can be read back with read_people_file, or lazily with
+    iter_people_jsonl.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the JSON Lines file
+    arguments : MagicConfig
+        The arguments used to create the list of people, which must at least contain the files, types, and years
+    people : iterable
+        The Person objects to write
+    append : bool, optional
+        Add the people (preceded by their own header) to the end of an existing file instead of replacing it
+
+    Returns
+    -------
+    int
+        The number of people written
+    """
+
+    count = 0
+    with open(filename, "a" if append else "w", encoding="utf8") as file:
+        write_header(file, arguments)
+        for person in people:
+            file.write(json.dumps(serialize_person(person)) + "\n")
+            count += 1
+    return count
+
+def write_people_npz(filename, arguments, people):
+    """Write a list of people, along with the header describing where they came from, to a NumPy archive
+
+    Each attribute is stored as an array: the strings as the array of their distinct values and the code of each person
+    (see encode_strings), the institutions as one record per school, and the years as integers. The archive can be
+    read back with read_people_file, which is much faster than reading the same people from a text file.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the archive
+    arguments : MagicConfig
+        The arguments used to create the list of people, which must at least contain the files, types, and years
+    people : list
+        A list of Person objects
+    """
+
+    arrays = {"header" : np.array(jsons.dumps(arguments, jdkwargs={'indent' : 4, 'sort_keys' : False}))}
+    for name in ["program", "first_name", "last_name", "topic"]:
+        arrays[f"{name}_categories"], arrays[f"{name}_codes"] = encode_strings([getattr(person, name) for person in people])
+    arrays["job_categories"], arrays["job_codes"] = encode_strings([person.job.name if isinstance(person.job, Jobs) else person.job
+                                                                    for person in people])
+    arrays["host_doe_laboratory_categories"], arrays["host_doe_laboratory_codes"] = encode_strings(
+        [person.host_doe_laboratory.name if person.host_doe_laboratory is not None else None for person in people]
+    )
+
+    # one record per institution, which are shared by the people from the same school
+    institutions = {}
+    arrays["home_institution_codes"] = np.array([-1 if person.home_institution is None else
+                                                 institutions.setdefault(id(person.home_institution), (len(institutions), person.home_institution))[0]
+                                                 for person in people], dtype = np.int32)
+    records = [institution for _, institution in institutions.values()]
+    for name in ["name", "city", "state"]:
+        arrays[f"institution_{name}"] = np.array([getattr(institution, name) for institution in records], dtype = str)
+    for name in ["latitude", "longitude"]:
+        arrays[f"institution_{name}"] = np.array([getattr(institution, name) for institution in records], dtype = float)
+    arrays["year"] = np.array([person.year for person in people], dtype = np.int64)
+
+    with open(filename, "wb") as file:
+        np.savez(file, **arrays)
@@ -20,6 +20,7 @@ import numpy as np
 import pandas as pd
 
 from laboratory import Laboratories
+from people_table import PeopleTable
 from person import Jobs
 from utilities import get_formatted_filename
 
@@ -49,7 +50,7 @@ def hanging_line(point1, point2):
 
     return (x,y)
 
-def plot_institution_markers(axes, legend_artists, lines, person_data, debug = False):
+def plot_institution_markers(axes, legend_artists, lines, people, debug = False):
     """This function gets and plots the institution markers.
 
     Parameters
@@ -60,21 +61,19 @@ def plot_institution_markers(axes, legend_artists, lines, person_data, debug = F
         A list of matplotlib Line2D objects which will be used for the legend entries
     lines : bool
         Sets whether of not to draw the lines connecting the home institutions and the laboratories (yes = True, no = False)
-    person_data : list
-        The list of Person objects which contain the information to plot
+    people : PeopleTable
+        The table of people which contains the information to plot
     debug : bool, optional
         Print extra information useful for debugging issues
     """
 
+    # only the people whose home institution is known can be placed on the map
+    known = people.data[people.data["home_institution"].notna()]
+    columns = {"institution_name" : "Inst", "latitude" : "Latitude", "longitude" : "Longitude"}
+
     # get the university markers
     if lines:
-        inst_df = pd.DataFrame(
-            {
-                'Inst': [person.home_institution.name for person in person_data if person.home_institution is not None],
-                'Latitude': [person.home_institution.latitude for person in person_data if person.home_institution is not None],
-                'Longitude': [person.home_institution.longitude for person in person_data if person.home_institution is not None],
-            }
-        )
+        inst_df = known[list(columns)].rename(columns = columns).reset_index(drop = True)
         inst_gdf = gpd.GeoDataFrame(
             inst_df, geometry=gpd.points_from_xy(inst_df.Longitude, inst_df.Latitude)
         )
@@ -103,26 +102,15 @@ def plot_institution_markers(axes, legend_artists, lines, person_data, debug = F
             "blue", "mediumblue", "darkblue", "navy", "midnightblue",
         ]
 
-        # get the set of programs from list of people
-        programs = set()
-        for person in person_data:
-            programs.add(person.program)
+        # get the set of programs from the table of people
+        programs = set(people.data["program"].tolist())
 
         if debug:
             print(programs)
 
         # loop over the programs and draw each on separately
         for iprogram, program in enumerate(sorted(programs)):
-            inst_df = pd.DataFrame(
-                {
-                    'Inst': [person.home_institution.name for person in person_data \
-                             if person.home_institution is not None and person.program == program],
-                    'Latitude': [person.home_institution.latitude for person in person_data \
-                                 if person.home_institution is not None and person.program == program],
-                    'Longitude': [person.home_institution.longitude for person in person_data \
-                                  if person.home_institution is not None and person.program == program],
-                }
-            )
+            inst_df = known.loc[known["program"] == program, list(columns)].rename(columns = columns).reset_index(drop = True)
             inst_gdf = gpd.GeoDataFrame(
                 inst_df, geometry=gpd.points_from_xy(inst_df.Longitude, inst_df.Latitude)
             )
@@ -186,7 +174,7 @@ def plot_lab_markers(axes, legend_artists, debug = False):
         )
     )
 
-def plot_lines(axes, legend_artists, person_data):
+def plot_lines(axes, legend_artists, people):
     """This function plots the lines connecting institutions and labs
 
     Parameters
@@ -195,25 +183,25 @@ def plot_lines(axes, legend_artists, person_data):
         A list of axes.Axes on which to draw the markers
     legend_artists: list
         A list of matplotlib Line2D objects which will be used for the legend entries
-    person_data : list
-        The list of Person objects which contain the information to plot
+    people : PeopleTable
+        The table of people which contains the information to plot
     """
 
     legend_artists.append(mlines.Line2D([], [], color='orange', linestyle = "-", label='Faculty'))
     legend_artists.append(mlines.Line2D([], [], color='yellow', linestyle = "--", label='Student'))
-    for person in person_data:
-        if person.home_institution is None:
-            continue
-        start_location = [person.home_institution.longitude, person.home_institution.latitude]
-        end_location = [person.host_doe_laboratory.value.longitude, person.host_doe_laboratory.value.latitude]
-        x_coord, y_coord = hanging_line(start_location, end_location)
+    known = people[(people.data["home_institution"].notna() & people.data["host_doe_laboratory"].notna()).to_numpy()]
+    lab_longitudes, lab_latitudes = known.laboratory_coordinates()
+    students = (known.data["job"] == Jobs.Student.name).to_numpy()
+    for longitude, latitude, lab_longitude, lab_latitude, student in zip(known.data["longitude"].to_numpy(), known.data["latitude"].to_numpy(),
+                                                                         lab_longitudes, lab_latitudes, students):
+        x_coord, y_coord = hanging_line([longitude, latitude], [lab_longitude, lab_latitude])
         for axis in axes:
             axis.plot(
                 x_coord,
                 y_coord,
-                linewidth = 1 if person.job == Jobs.Student else 2,
-                linestyle = "--" if person.job == Jobs.Student else "-",
-                color = "yellow" if person.job == Jobs.Student else "orange"
+                linewidth = 1 if student else 2,
+                linestyle = "--" if student else "-",
+                color = "yellow" if student else "orange"
             )
 
 def plot_map(debug = False, formats = None, lines = True, output_path = "./", person_data = None, show = False, states = None):
@@ -241,8 +229,8 @@ def plot_map(debug = False, formats = None, lines = True, output_path = "./", pe
         Sets whether of not to draw the lines connecting the home institutions and the laboratories (yes = True, no = False)
     output_path : str, optional
         The path to the directory in which to save the output file
-    person_data : list, optional
-        The list of Person objects which contain the information to plot
+    person_data : list or PeopleTable, optional
+        The list of Person objects (or the table of people) which contain the information to plot
     show : bool, optional
         If True, an interactive version of the output plot is printed to the screen
     states : list, optional
@@ -262,15 +250,18 @@ def plot_map(debug = False, formats = None, lines = True, output_path = "./", pe
     # start keeping track of the legend items
     legend_artists = []
 
+    # the markers and lines are drawn from the columns of a table of people
+    people = person_data if isinstance(person_data, PeopleTable) else PeopleTable.from_people(person_data if person_data is not None else [])
+
     # plot the institution markers and add the markers to the legend
-    plot_institution_markers([continental_ax, alaska_ax, hawaii_ax, puerto_rico_ax], legend_artists, lines, person_data, debug = debug)
+    plot_institution_markers([continental_ax, alaska_ax, hawaii_ax, puerto_rico_ax], legend_artists, lines, people, debug = debug)
 
     # plot the laboratory markers
     plot_lab_markers([continental_ax, alaska_ax, hawaii_ax, puerto_rico_ax], legend_artists, debug = debug)
 
     # draw the lines between labs and institutions
     if lines:
-        plot_lines([continental_ax, alaska_ax, hawaii_ax, puerto_rico_ax], legend_artists, person_data)
+        plot_lines([continental_ax, alaska_ax, hawaii_ax, puerto_rico_ax], legend_artists, people)
 
     # add a legend
     continental_ax.legend(handles=legend_artists, prop={'size': 16}, facecolor='Grey', loc='upper right')
@@ -0,0 +1,180 @@
+#!/bin/env python3
+
+"""resolution_cache
+
+This module contains an on-disk cache of the institution name resolutions. The same raw institution names show up
+across programs and years, so once a name has been resolved (or found to be unknown) for a given year of school
+information, the result is stored in an SQLite database and reused by later runs.
+
+Each entry is keyed by the raw name, the version of the school database, and the year. The version is built from the
+signature of the source shapefile and a hash of the modules containing the replacement tables and the matching logic,
+so editing either one automatically invalidates the old entries.
+
+Constants
+---------
+RESOLUTION_CACHE_PATH : str
+    The default location of the cache database
+resolution_modules : list
+    The modules whose content is part of the cache version
+
+Classes
+----------
+ResolutionCache
+    Stores and retrieves institution name resolutions in an SQLite database
+
+Functions
+---------
+code_signature
+    Return a hash of the modules which determine how institution names are resolved
+"""
+
+import hashlib
+import os
+import sqlite3
+
+RESOLUTION_CACHE_PATH = "data/schools/.cache/resolutions.sqlite"
+resolution_modules = ["institution.py", "cross_year_index.py", "fuzzy_matcher.py"]
+
+class ResolutionCache:
+    """A class which stores and retrieves institution name resolutions in an SQLite database.
+
+    A resolution is either a (name, city, state, latitude, longitude) record or None, when the name is known not to
+    match any school.
+
+    Attributes
+    ----------
+    path : str
+        The location of the cache database
+    connection : sqlite3.Connection
+        The open connection to the cache database
+
+    Methods
+    -------
+    close
+        Close the connection to the cache database
+    get_many(raw_names, version, year)
+        Returns a dict of the cached resolutions for the given names
+    prune(version, year)
+        Removes the entries for a year which were made with a different version of the school database
+    put_many(resolutions, version, year)
+        Stores a dict of resolutions
+    """
+
+    def __init__(self, path = RESOLUTION_CACHE_PATH):
+        """This method opens (and if needed creates) the cache database.
+
+        Parameters
+        ----------
+        path : str, optional
+            The location of the cache database
+        """
+
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+        self.connection = sqlite3.connect(path, timeout = 30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            "raw TEXT NOT NULL, version TEXT NOT NULL, year INTEGER NOT NULL, found INTEGER NOT NULL, "
+            "name TEXT, city TEXT, state TEXT, latitude REAL, longitude REAL, "
+            "PRIMARY KEY (raw, version, year))"
+        )
+        self.connection.commit()
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"ResolutionCache({self.path})"
+
+    def close(self):
+        """Close the connection to the cache database"""
+
+        self.connection.close()
+
+    def get_many(self, raw_names, version, year):
+        """Return the cached resolutions for the given names
+
+        Parameters
+        ----------
+        raw_names : list
+            The names of the institutions as written in the PDF files
+        version : str
+            The version of the school database
+        year : int
+            The year the postsecondary school information was collected
+
+        Returns
+        -------
+        dict
+            A dict of {str : tuple} containing the record (or None) for each of the names found in the cache
+        """
+
+        resolutions = {}
+        raw_names = list(dict.fromkeys(raw_names))
+        # stay well below the SQLite limit on the number of query parameters
+        for start in range(0, len(raw_names), 500):
+            chunk = raw_names[start : start + 500]
+            rows = self.connection.execute(
+                "SELECT raw, found, name, city, state, latitude, longitude FROM resolutions "
+                f"WHERE version = ? AND year = ? AND raw IN ({', '.join('?' * len(chunk))})",
+                [version, year] + chunk,
+            )
+            for raw, found, *record in rows:
+                resolutions[raw] = tuple(record) if found else None
+        return resolutions
+
+    def prune(self, version, year):
+        """Remove the entries for a year which were made with a different version of the school database
+
+        Parameters
+        ----------
+        version : str
+            The version of the school database to keep
+        year : int
+            The year the postsecondary school information was collected
+        """
+
+        with self.connection:
+            self.connection.execute("DELETE FROM resolutions WHERE year = ? AND version != ?", (year, version))
+
+    def put_many(self, resolutions, version, year):
+        """Store a dict of resolutions
+
+        Parameters
+        ----------
+        resolutions : dict
+            A dict of {str : tuple} containing the record (or None) for each raw institution name
+        version : str
+            The version of the school database
+        year : int
+            The year the postsecondary school information was collected
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (raw, version, year, record is not None, *(record if record is not None else (None,) * 5))
+                    for raw, record in resolutions.items()
+                ],
+            )
+
+def code_signature(modules = None):
+    """Return a hash of the modules which determine how institution names are resolved
+
+    Parameters
+    ----------
+    modules : list, optional
+        The names of the modules to hash (default is resolution_modules)
+
+    Returns
+    -------
+    str
+        The SHA-1 hash of the content of the modules
+    """
+
+    digest = hashlib.sha1()
+    for module in modules if modules is not None else resolution_modules:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), module), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
@@ -0,0 +1,260 @@
+#!/bin/env python3
+
+"""row_repairs
+
+This module contains the known fixes for the rows of text which are mangled when parsing the PDF files. Each fix is a
+rule made of the year it applies to (None for every year), a matcher which recognizes the broken rows, and a transform
+which returns the repaired row. The rules are compiled once into a table of the rules which apply to each year, so
+repairing a file is a single pass over its rows which only tries the rules of its year. A new fix is added by
+appending a rule to row_repairs.
+
+Constants
+---------
+laboratory_names : re.Pattern
+    A regex matching the short name of any of the DOE laboratories
+multiple_words : re.Pattern
+    A regex matching a string containing more than one word
+repair_table : dict
+    A dict of {int : list} containing the (matcher, transform) pairs tried, in order, on the rows of each year (the
+    rules for every year are under the None key)
+row_repairs : list
+    A list of (year, matcher, transform) rules, in order of priority (the first rule matching a row is applied)
+
+Functions
+---------
+compile_repairs
+    Build the table of the rules which apply to each year
+repair_rows
+    Apply the first matching rule to each of the rows of a file
+repair_split_first_column
+    Split the last name, the first name, and the institution which were merged into the first column
+repair_split_institution
+    Split the institution and the laboratory which ended up in the same column
+repair_split_last_name
+    Split a last name of two words from the first name it was merged with
+repair_split_quoted_name
+    Split the name with a nickname in quotes from the institution it was merged with
+repair_split_row
+    Rebuild a row whose columns were merged or split on the wrong spaces
+repair_split_truncated_name
+    Split a first name which was cut off from the institution it was merged with, restoring its end
+repair_tjnaf
+    Split the name of Thomas Jefferson National Accelerator Facility from the column following it
+split_institution_laboratory
+    Split a list of words into the name of the institution and the laboratory (two words for Sandia)
+"""
+
+import re
+
+from laboratory import Laboratories
+
+laboratory_names = re.compile("|".join(re.escape(name) for name in Laboratories.list_names()))
+multiple_words = re.compile(r"\S\s+\S")
+
+def compile_repairs(rules):
+    """Build the table of the rules which apply to each year
+
+    Parameters
+    ----------
+    rules : list
+        A list of (year, matcher, transform) rules, in order of priority
+
+    Returns
+    -------
+    dict
+        A dict of {int : list} containing the (matcher, transform) pairs of each year, in order of priority, followed
+        by the rules for every year (which are also stored under the None key)
+    """
+
+    table = {None : [(matcher, transform) for year, matcher, transform in rules if year is None]}
+    for year in {year for year, _, _ in rules if year is not None}:
+        table[year] = [(matcher, transform) for rule_year, matcher, transform in rules if rule_year in (year, None)]
+    return table
+
+def repair_rows(lines, year, debug = False):
+    """Apply the first matching rule to each of the rows of a file
+
+    Every matcher and transform gets the row as it was extracted, so the result doesn't depend on any other rule.
+
+    Parameters
+    ----------
+    lines : list
+        A list of lists of strings containing the text from the PDF file, broken up by row and then column
+    year : int
+        The year the program took place
+    debug : bool, optional
+        Print extra information useful for debugging issues
+
+    Returns
+    -------
+    list
+        The corrected list of lines (modified in place)
+    """
+
+    rules = repair_table.get(year, repair_table[None])
+    for iline, line in enumerate(lines):
+        if debug:
+            print(line)
+        for matcher, transform in rules:
+            if matcher(line):
+                lines[iline] = transform(line)
+                if debug:
+                    print(lines[iline])
+                break
+    return lines
+
+def repair_split_first_column(line):
+    """Split the last name, the first name, and the institution which were merged into the first column
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    words = line[0].split()
+    return [" ".join(words[0:2]), " ".join(words[2:4]), " ".join(words[4:]), line[1]]
+
+def repair_split_institution(line):
+    """Split the institution and the laboratory which ended up in the same column
+
+    Parameters
+    ----------
+    line : list
+        The name, in two columns, followed by the institution and the laboratory
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    return line[0:2] + split_institution_laboratory(line[2].split())
+
+def repair_split_last_name(line):
+    """Split a last name of two words from the first name it was merged with
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    words = line[0].split()
+    return [" ".join(words[0:2]), words[2]] + line[1:]
+
+def repair_split_quoted_name(line):
+    """Split the name with a nickname in quotes from the institution it was merged with
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    end = line[1].rfind("\"") + 1
+    return line[0:1] + [line[1][:end], line[1][end:]] + line[2:]
+
+def repair_split_row(line):
+    """Rebuild a row whose columns were merged or split on the wrong spaces
+
+    The row is broken up into words, which are then regrouped as the last name, the first name, the institution, and
+    the laboratory.
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    words = [word for line_part in line for word in line_part.split()]
+    if words[0] == "De":
+        words = [" ".join(words[0:2])] + words[2:]
+    return words[0:2] + split_institution_laboratory(words, start = 2)
+
+def repair_split_truncated_name(line):
+    """Split a first name which was cut off from the institution it was merged with, restoring its end
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    parts = line[1].split("Roxa")
+    return line[0:1] + [parts[0] + "Roxane"] + parts[1:] + line[2:]
+
+def repair_tjnaf(line):
+    """Split the name of Thomas Jefferson National Accelerator Facility from the column following it
+
+    Parameters
+    ----------
+    line : list
+        The row to repair
+
+    Returns
+    -------
+    list
+        The repaired row
+    """
+
+    parts = line[3].split("TJNA")
+    return line[0:3] + [parts[0] + "TJNAF)"] + parts[1:]
+
+def split_institution_laboratory(words, start = 0):
+    """Split a list of words into the name of the institution and the laboratory (two words for Sandia)
+
+    Parameters
+    ----------
+    words : list
+        The words of a row, ending with those of the institution and the laboratory
+    start : int, optional
+        The index of the first word of the institution
+
+    Returns
+    -------
+    list
+        The name of the institution followed by the one or two words of the laboratory
+    """
+
+    if words[-2] == "SNL":
+        return [" ".join(words[start:-2])] + words[-2:]
+    return [" ".join(words[start:-1]), words[-1]]
+
+# the most specific fixes come first, since only one fix is applied to each row
+row_repairs = [
+    (2020, lambda line: len(line) >= 2 and "\"" in line[1], repair_split_quoted_name),
+    (2020, lambda line: "Vazquez Olivas" in line[0], repair_split_last_name),
+    (2020, lambda line: "Teutu Talla Serges Love" in line[0], repair_split_first_column),
+    (2020, lambda line: multiple_words.search(line[0]) is not None or multiple_words.search(line[1]) is not None, repair_split_row),
+    (2020, lambda line: len(line) == 3 and laboratory_names.search(line[2]) is not None, repair_split_institution),
+    (2021, lambda line: "Ouango, Boinzemwende Jarmila Roxa" in line[1], repair_split_truncated_name),
+    (None, lambda line: any("Thomas Jefferson National" in item for item in line), repair_tjnaf),
+]
+
+repair_table = compile_repairs(row_repairs)
@@ -0,0 +1,186 @@
+#!/bin/env python3
+
+"""school_cache
+
+This module contains functions which keep a slim, columnar copy of the postsecondary school shapefiles on disk.
+Parsing a shapefile with geopandas reads the geometry and every attribute column, even though only a handful of
+columns are ever used. The first time a shapefile is loaded, the needed columns are written to a NumPy .npz file
+next to it. Later loads read the .npz file instead, as long as the source files haven't changed size or modification time.
+
+Constants
+---------
+CACHE_FORMAT_VERSION : int
+    The version of the cache layout. Increment it whenever the content of the cache files changes.
+
+Functions
+---------
+cache_filename
+    Returns the path to the cache file for a given shapefile
+load_cached_table
+    Returns the requested columns of a shapefile, reading from and updating the cache as needed
+read_cache
+    Reads a cache file and returns its content if it's still valid
+source_signature
+    Returns a string which changes whenever the source shapefile changes
+write_cache
+    Writes a table to a cache file
+"""
+
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+
+def cache_filename(filename, cache_dir = None):
+    """Return the path to the cache file for a given shapefile
+
+    Parameters
+    ----------
+    filename : str
+        The path to the shapefile
+    cache_dir : str, optional
+        The directory in which to store the cache files (default is a '.cache' directory next to the shapefile)
+
+    Returns
+    -------
+    str
+        The path to the cache file
+    """
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(filename), ".cache")
+    stem, _ = os.path.splitext(os.path.basename(filename))
+    return os.path.join(cache_dir, f"{stem}.npz")
+
+def source_signature(filename):
+    """Return a string which changes whenever the source shapefile changes
+
+    The attribute columns of a shapefile are stored in the .dbf file next to the .shp file, so both are included.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the shapefile
+
+    Returns
+    -------
+    str
+        A string built from the cache format version and the size and modification time of the source files
+    """
+
+    signature = [f"v{CACHE_FORMAT_VERSION}"]
+    stem, _ = os.path.splitext(filename)
+    for extension in [".shp", ".dbf"]:
+        if os.path.exists(stem + extension):
+            stat = os.stat(stem + extension)
+            signature.append(f"{extension}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(signature)
+
+def read_cache(path, signature):
+    """Read a cache file and return its content if it's still valid
+
+    Parameters
+    ----------
+    path : str
+        The path to the cache file
+    signature : str
+        The signature of the source shapefile (see source_signature)
+
+    Returns
+    -------
+    DataFrame
+        The cached table or None if the cache file doesn't exist or is out of date
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path) as cache:
+            if str(cache["__signature__"]) != signature:
+                return None
+            columns = [str(column) for column in np.asarray(cache["__columns__"])]
+            return pd.DataFrame({column : cache[column] for column in columns})
+    except (OSError, KeyError, ValueError):
+        return None
+
+def write_cache(path, table, signature):
+    """Write a table to a cache file
+
+    The file is written to a temporary location first and then moved into place, so that an interrupted
+    write never leaves a corrupt cache behind.
+
+    Parameters
+    ----------
+    path : str
+        The path to the cache file
+    table : DataFrame
+        The table to store
+    signature : str
+        The signature of the source shapefile (see source_signature)
+    """
+
+    arrays = {}
+    for column in table.columns:
+        if pd.api.types.is_numeric_dtype(table[column]):
+            arrays[column] = table[column].to_numpy()
+        else:
+            arrays[column] = table[column].to_numpy(dtype = str)
+
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(
+            file,
+            __signature__ = np.array(signature),
+            __columns__ = np.array(list(table.columns)),
+            **arrays,
+        )
+    os.replace(temporary_path, path)
+
+def load_cached_table(filename, columns, use_cache = True, cache_dir = None):
+    """Return the requested columns of a shapefile, reading from and updating the cache as needed
+
+    Parameters
+    ----------
+    filename : str
+        The path to the shapefile
+    columns : list
+        The names of the columns to keep
+    use_cache : bool, optional
+        If False, the shapefile is always read and the cache is neither read nor written
+    cache_dir : str, optional
+        The directory in which to store the cache files (see cache_filename)
+
+    Returns
+    -------
+    DataFrame
+        A table containing only the requested columns (the geometry is dropped)
+    """
+
+    signature = source_signature(filename)
+    path = cache_filename(filename, cache_dir)
+
+    if use_cache:
+        table = read_cache(path, signature)
+        if table is not None and list(table.columns) == list(columns):
+            return table
+
+    table = gpd.read_file(filename, columns = columns, ignore_geometry = True)
+    table = pd.DataFrame(table[columns])
+
+    # missing text values are stored as empty strings so that a fresh read and a cached read give the same table
+    for column in columns:
+        if not pd.api.types.is_numeric_dtype(table[column]):
+            table[column] = table[column].fillna("").astype(str)
+
+    if use_cache:
+        try:
+            write_cache(path, table, signature)
+        except OSError as error:
+            print(f"WARNING::Unable to write the school cache file {path} ({error})")
+
+    return table
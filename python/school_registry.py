@@ -0,0 +1,272 @@
+#!/bin/env python3
+
+"""school_registry
+
+This module keeps the databases of postsecondary schools loaded for the lifetime of the process, so that every parser
+which needs a given year of school information shares a single SchoolIndex instead of loading its own copy. Unless the
+on-disk caches are turned off, each SchoolIndex is also connected to the shared cache of institution name resolutions.
+The names which can't be found in their own year are looked up in a single index shared by all of the years, which is
+stored on disk as a compact table and counts towards the memory cap like the indexes of each year.
+
+Constants
+---------
+CROSS_YEAR_CACHE_PATH : str
+    The default location of the compact table of the school names of all the years
+school_registry : SchoolRegistry
+    The registry shared by all of the parsers in the process
+
+Classes
+----------
+SchoolRegistry
+    Loads each year's SchoolIndex once and hands out the shared instance
+
+Functions
+---------
+configure_school_registry
+    Set the options of the shared registry (used to configure the worker processes)
+get_school_index
+    Return the shared SchoolIndex for a given year
+"""
+
+from collections import OrderedDict
+import sqlite3
+
+from cross_year_index import CrossYearIndex
+from institution import available_school_years
+from institution import load_schools
+from institution import school_filename
+from institution import SchoolIndex
+from resolution_cache import code_signature
+from resolution_cache import RESOLUTION_CACHE_PATH
+from resolution_cache import ResolutionCache
+from school_cache import source_signature
+
+CROSS_YEAR_CACHE_PATH = "data/schools/.cache/cross_year.npz"
+
+class SchoolRegistry:
+    """A class which loads each year's SchoolIndex once and hands out the shared instance.
+
+    When a memory cap is set, the least recently used years are evicted until the estimated size of the loaded
+    indexes is under the cap. The most recently requested year is never evicted, even if it's larger than the cap.
+    The least recently used names of the cross-year index are then dropped until the total is under the cap. The
+    memory use is only checked when a new year is loaded.
+
+    Attributes
+    ----------
+    max_memory : int
+        The maximum estimated size, in bytes, of the loaded indexes (None for no limit)
+    indexes : OrderedDict
+        A dict of {int : SchoolIndex} ordered from the least to the most recently used year
+    sizes : dict
+        A dict of {int : int} containing the estimated size, in bytes, of each loaded index
+    use_cache : bool
+        Read from and write to the on-disk caches of the school databases and of the name resolutions
+    resolution_cache_path : str
+        The location of the cache of name resolutions
+    resolution_cache : ResolutionCache
+        The cache of name resolutions (opened the first time an index is loaded)
+    use_cross_year : bool
+        Look up the names missing from one year in the other available years
+    cross_year_index : CrossYearIndex
+        The index shared by all of the years (created the first time an index is loaded)
+    cross_year_cache_path : str
+        The location of the compact table of the school names of all the years
+
+    Methods
+    -------
+    clear
+        Remove all of the loaded indexes
+    connect_resolution_cache(index)
+        Connect an index to the cache of name resolutions, opening the cache if needed
+    cross_year
+        Return the CrossYearIndex shared by all of the years, creating it if needed
+    evict
+        Remove the least recently used indexes, then the least recently used cross-year names, until they fit within max_memory
+    get(year)
+        Return the shared SchoolIndex for a given year, loading it if needed
+    memory_usage
+        Return the estimated size, in bytes, of all the loaded indexes, including the cross-year records
+    school_signature(year)
+        Return a string which changes whenever the school databases used to resolve the names of a year change
+    """
+
+    def __init__(self, max_memory = None, use_cache = True, resolution_cache_path = RESOLUTION_CACHE_PATH, use_cross_year = True,
+                 cross_year_cache_path = CROSS_YEAR_CACHE_PATH):
+        """This method initializes the data members of the SchoolRegistry class.
+
+        Parameters
+        ----------
+        max_memory : int, optional
+            The maximum estimated size, in bytes, of the loaded indexes (None for no limit)
+        use_cache : bool, optional
+            Read from and write to the on-disk caches of the school databases and of the name resolutions
+        resolution_cache_path : str, optional
+            The location of the cache of name resolutions
+        use_cross_year : bool, optional
+            Look up the names missing from one year in the other available years
+        cross_year_cache_path : str, optional
+            The location of the compact table of the school names of all the years
+        """
+
+        self.max_memory = max_memory
+        self.indexes = OrderedDict()
+        self.sizes = {}
+        self.use_cache = use_cache
+        self.resolution_cache_path = resolution_cache_path
+        self.resolution_cache = None
+        self.use_cross_year = use_cross_year
+        self.cross_year_index = None
+        self.cross_year_cache_path = cross_year_cache_path
+
+    def __contains__(self, year):
+        """Return True if the index for the year is currently loaded"""
+
+        return year in self.indexes
+
+    def __repr__(self):
+        """Return a formated string representation of the class object"""
+
+        return f"SchoolRegistry(years = {list(self.indexes)}, memory = {self.memory_usage()})"
+
+    def clear(self):
+        """Remove all of the loaded indexes"""
+
+        self.indexes.clear()
+        self.sizes.clear()
+        self.cross_year_index = None
+
+    def get(self, year):
+        """Return the shared SchoolIndex for a given year, loading it if needed
+
+        Parameters
+        ----------
+        year : int
+            The year the postsecondary school information was collected
+
+        Returns
+        -------
+        SchoolIndex
+            The index of postsecondary schools for the given year
+        """
+
+        if year in self.indexes:
+            self.indexes.move_to_end(year)
+            return self.indexes[year]
+
+        index = SchoolIndex(load_schools(year, use_cache = self.use_cache), year)
+        if self.use_cross_year:
+            index.fallback = self.cross_year()
+        if self.use_cache:
+            self.connect_resolution_cache(index)
+        self.indexes[year] = index
+        self.sizes[year] = index.memory_usage()
+        self.evict()
+        return index
+
+    def connect_resolution_cache(self, index):
+        """Connect an index to the cache of name resolutions, opening the cache if needed
+
+        The version of the index combines the signatures of the source shapefiles (the other years are included when
+        the index has a cross-year fallback) and the hash of the modules which resolve the names. The cached resolutions
+        made with any other version of the same year are removed.
+
+        Parameters
+        ----------
+        index : SchoolIndex
+            The index to connect
+        """
+
+        try:
+            if self.resolution_cache is None:
+                self.resolution_cache = ResolutionCache(self.resolution_cache_path)
+            years = sorted({index.year, *index.fallback.years}) if index.fallback is not None else [index.year]
+            signatures = [source_signature(school_filename(year)) for year in years]
+            index.version = "|".join([*signatures, code_signature()])
+            index.resolution_cache = self.resolution_cache
+            self.resolution_cache.prune(index.version, index.year)
+        except (OSError, sqlite3.Error) as error:
+            print(f"WARNING::Unable to use the institution resolution cache {self.resolution_cache_path} ({error})")
+            index.resolution_cache = None
+
+    def cross_year(self):
+        """Return the CrossYearIndex shared by all of the years, creating it if needed
+
+        The index only covers the years whose shapefiles were available when it was created and it isn't built
+        until the first time a name is missing from its own year. It reuses the records of the loaded indexes and,
+        unless the on-disk caches are turned off, the compact table of all the years stored at cross_year_cache_path.
+        """
+
+        if self.cross_year_index is None:
+            years = available_school_years()
+            self.cross_year_index = CrossYearIndex(
+                years, loader = lambda year: load_schools(year, use_cache = self.use_cache), indexes = self.indexes,
+                cache_path = self.cross_year_cache_path if self.use_cache else None,
+                signature = "|".join([*(f"{year}:{source_signature(school_filename(year))}" for year in years), code_signature()]),
+            )
+        return self.cross_year_index
+
+    def evict(self):
+        """Remove the least recently used indexes, then the least recently used cross-year names, until they fit within max_memory"""
+
+        # the cross-year names give way to the indexes of the years, which are needed for every lookup
+        while self.max_memory is not None and len(self.indexes) > 1 and sum(self.sizes.values()) > self.max_memory:
+            year, _ = self.indexes.popitem(last = False)
+            del self.sizes[year]
+        if self.max_memory is not None and self.cross_year_index is not None and self.memory_usage() > self.max_memory:
+            self.cross_year_index.shrink(max(0, self.max_memory - sum(self.sizes.values())))
+
+    def memory_usage(self):
+        """Return the estimated size, in bytes, of all the loaded indexes, including the cross-year records"""
+
+        return sum(self.sizes.values()) + (self.cross_year_index.memory_usage() if self.cross_year_index is not None else 0)
+
+    def school_signature(self, year):
+        """Return a string which changes whenever the school databases used to resolve the names of a year change
+
+        The other available years are included when the names missing from the year are looked up in them.
+
+        Parameters
+        ----------
+        year : int
+            The year the postsecondary school information was collected
+
+        Returns
+        -------
+        str
+            The signatures of the source shapefiles (see school_cache.source_signature)
+        """
+
+        years = sorted({year, *available_school_years()}) if self.use_cross_year else [year]
+        return "|".join(source_signature(school_filename(year)) for year in years)
+
+school_registry = SchoolRegistry()
+
+def configure_school_registry(max_memory = None, use_cache = True):
+    """Set the options of the shared registry (used to configure the worker processes)
+
+    Parameters
+    ----------
+    max_memory : int, optional
+        The maximum estimated size, in bytes, of the loaded indexes (None for no limit)
+    use_cache : bool, optional
+        Read from and write to the on-disk caches of the school databases and of the name resolutions
+    """
+
+    school_registry.max_memory = max_memory
+    school_registry.use_cache = use_cache
+
+def get_school_index(year):
+    """Return the shared SchoolIndex for a given year
+
+    Parameters
+    ----------
+    year : int
+        The year the postsecondary school information was collected
+
+    Returns
+    -------
+    SchoolIndex
+        The index of postsecondary schools for the given year
+    """
+
+    return school_registry.get(year)
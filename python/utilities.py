@@ -13,11 +13,21 @@ Functions
 ---------
 filter_people_by_topic(people, strict = False)
     Filters the list of People by their research topic(s)
+get_peak_memory_usage
+    Returns the peak resident memory, in MB, of the process and of the largest of its finished child processes
+intern_string
+    Returns the interned copy of a string
 """
 
 from datetime import date
 from enum import Enum
 import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 class ExtendedEnum(Enum):
     """An extension to the Enum class
@@ -102,3 +112,39 @@ def get_formatted_filename(path, filename, fmt):
     while os.path.exists(f"{output_filename}_v{i}.{fmt}"):
         i += 1
     return f"{output_filename}_v{i}.{fmt}"
+
+def get_peak_memory_usage():
+    """Return the peak resident memory, in MB, of the process and of the largest of its finished child processes
+
+    The child processes are the worker processes used to parse the files and to extract the pages. Only the workers
+    which have already exited are counted.
+
+    Returns
+    -------
+    tuple
+        The peak resident memory of the process and of its largest child process, or (None, None) if the platform
+        doesn't provide the information
+    """
+
+    if resource is None:
+        return None, None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return tuple(resource.getrusage(who).ru_maxrss / scale for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN])
+
+def intern_string(value):
+    """Return the interned copy of a string, so that the many copies of the same text share one object
+
+    Parameters
+    ----------
+    value : str or None
+        The string to intern (any other value, like None, is returned unchanged)
+
+    Returns
+    -------
+    str or None
+        The interned string
+    """
+
+    return sys.intern(value) if isinstance(value, str) else value
@@ -2,12 +2,24 @@
 
 """This module contains the pytest tests for the modules:
     1. WDTSscraper.py
-    2. check_for_dependencies.py
-    3. institution.py
-    4. laboratory.py
-    5. pdf_parsers.py
-    6. person.py
-    7. utilities.py
+    2. char_columns.py
+    3. check_for_dependencies.py
+    4. cross_year_index.py
+    5. fuzzy_matcher.py
+    6. ingest_manifest.py
+    7. institution.py
+    8. laboratory.py
+    9. layout_detection.py
+    10. page_cache.py
+    11. page_extraction.py
+    12. pdf_parsers.py
+    13. people_table.py
+    14. person.py
+    15. resolution_cache.py
+    16. row_repairs.py
+    17. school_cache.py
+    18. school_registry.py
+    19. utilities.py
 
     Note: The plotter code is not tested as we haven't figured out a good way to test the output for consistency
     Note: you can use the decorator '@pytest.mark.skip(reason="taskes a long time to run")' to skip over a test
@@ -17,18 +29,84 @@ from __future__ import absolute_import
 from datetime import date
 import glob
 import os
+import pickle
 import sys
+
+import geopandas as gpd
+from magiconfig import MagiConfig
+import numpy as np
+import pandas as pd
+import pytest
+
 sys.path.insert(1, os.path.dirname(os.path.realpath(__file__))+'/../python/')
 # pylint: disable=wrong-import-position
+import char_columns
 import check_for_dependencies
+import cross_year_index
+import fuzzy_matcher
+import ingest_manifest
 import institution
 import laboratory
+import layout_detection
+import page_cache
+import page_extraction
 import pdf_parsers
+import people_table
 import person
+import resolution_cache
+import row_repairs
+import school_cache
+import school_registry
 import utilities
 import WDTSscraper
 # pylint: enable=wrong-import-position
 # pylint: disable=no-self-use
+# pylint: disable=too-many-lines
+
+class TestCharColumns:
+    """Class containing the tests for the char_columns module."""
+
+    class FakePage: # pylint: disable=too-few-public-methods
+        """Stand-in for a pdfplumber page containing lines of fixed width characters"""
+
+        def __init__(self, lines, width = 5.0):
+            self.chars = [
+                {"text" : char, "x0" : ichar * width, "x1" : (ichar + 1) * width, "top" : 10.0 * iline + (0.5 if ichar % 2 else 0.0)}
+                for iline, line in enumerate(lines) for ichar, char in enumerate(line)
+            ]
+
+    lines = [
+        "2020 Visiting Faculty Program (VFP) Faculty",
+        "Term         Last     Institution",
+        "Summer 2020  Doe      Lewis University",
+        "Summer 2020  Roe      St. Mary's University",
+        "Summer 2020  Smith    Ohio University",
+        "Summer 2020  Jones    Lewis University",
+        "Summer 2020  Brown    Mills College",
+        "Summer 2020  Davis    Ohio University",
+        "Summer 2020  Evans    Lewis University",
+        "Summer 2020  Moore    Mills College",
+        "Summer 2020  Young    Ohio University",
+        "                  3",
+    ]
+
+    def test_learn_columns(self):
+        """Tests that the boundaries are found in the empty strips which are wider than a space, despite the title"""
+
+        columns = char_columns.learn_columns(self.FakePage(self.lines))
+        assert columns == [pytest.approx(60.0, abs = 2.5), pytest.approx(105.0, abs = 2.5)]
+        assert char_columns.learn_columns(self.FakePage([])) == []
+
+    def test_split_chars(self):
+        """Tests that the characters are assigned to cells and that the lines spanning the columns are kept whole"""
+
+        page = self.FakePage(self.lines)
+        rows = char_columns.split_chars(page, char_columns.learn_columns(page))
+        assert rows[0] == ["2020 Visiting Faculty Program (VFP) Faculty"]
+        assert rows[1] == ["Term", "Last", "Institution"]
+        assert rows[3] == ["Summer 2020", "Roe", "St. Mary's University"]
+        assert rows[-1] == ["3"]
+        assert char_columns.split_chars(page) == [[" ".join(line.split())] for line in self.lines]
 
 class TestCheckForDependencies:
     """Class containing the tests for the check_for_dependencies module.
@@ -58,6 +136,140 @@ class TestCheckForDependencies:
         dep = ["ls"]
         assert len(check_for_dependencies.check_system_dependencies(dep)) == 0
 
+class TestCrossYearIndex:
+    """Class containing the tests for the cross_year_index module."""
+
+    def test_cross_year_index(self, tmp_path):
+        """Tests that a name missing from one year is resolved to the record of the nearest year"""
+
+        def fake_load_schools(year):
+            names = {2016 : ["Old College"], 2018 : ["Old College", "Renamed College"], 2020 : ["New College"]}[year]
+            return pd.DataFrame(
+                {"name" : names, "city" : [str(year)] * len(names), "state" : ["IL"] * len(names),
+                 "latitude" : [1.0] * len(names), "longitude" : [2.0] * len(names)}
+            )
+
+        fallback = cross_year_index.CrossYearIndex([2020, 2016, 2018], loader = fake_load_schools)
+        assert fallback.find("Old College", 2021)[0] == 2018
+        assert fallback.find("Old  College", 2015)[1][1] == "2016"
+        assert fallback.find("Unknown College", 2020) is None
+
+        index = institution.SchoolIndex(fake_load_schools(2020), 2020)
+        assert institution.get_institution(index, "Renamed College", 2020) is None
+        index.fallback = fallback
+        assert institution.get_institution(index, "Renamed College", 2020).city == "2018"
+
+        # the records of the loaded indexes are reused and the union is read back from the on-disk table
+        loaded = []
+        def counting_load_schools(year):
+            loaded.append(year)
+            return fake_load_schools(year)
+        path = str(tmp_path / "cross_year.npz")
+        fallback = cross_year_index.CrossYearIndex([2016, 2018, 2020], loader = counting_load_schools, indexes = {2020 : index},
+                                                   cache_path = path, signature = "v1")
+        records = fallback.build()
+        assert loaded == [2016, 2018] and fallback.memory_usage() > 0
+        fallback.clear()
+        assert fallback.memory_usage() == 0 and fallback.build() == records and loaded == [2016, 2018]
+        fallback = cross_year_index.CrossYearIndex([2016, 2018, 2020], loader = counting_load_schools, cache_path = path, signature = "v2")
+        assert fallback.build() == records and loaded == [2016, 2018, 2016, 2018, 2020]
+
+        # the least recently used names are dropped first and the union is built again when one of them is looked up
+        assert fallback.find("Renamed College", 2020)[0] == 2018
+        fallback.shrink(fallback.memory_usage() - 1)
+        assert not fallback.complete and next(reversed(fallback.records)) == institution.normalize_institution_name("Renamed College")
+        assert fallback.find("Renamed College", 2020)[0] == 2018 and not fallback.complete
+        assert fallback.find("Old College", 2016)[0] == 2016 and fallback.complete
+        fallback.shrink(0)
+        assert fallback.records is None and fallback.memory_usage() == 0
+
+class TestFuzzyMatcher:
+    """Class containing the tests for the fuzzy_matcher module."""
+
+    def test_normalize_name(self):
+        """Tests that the common spelling variations are normalized away"""
+
+        assert fuzzy_matcher.normalize_name("St. Mary's University") == fuzzy_matcher.normalize_name("Saint Marys University")
+        assert fuzzy_matcher.normalize_name("Texas A&M University--Kingsville") == "texas a and m university kingsville"
+        assert fuzzy_matcher.normalize_name("The University of Texas at Austin") == "university of texas austin"
+
+    def test_fuzzy_matcher(self):
+        """Tests that the matcher ranks the candidates and keeps similar, but different, names apart"""
+
+        matcher = fuzzy_matcher.FuzzyMatcher([
+            "University of Alabama", "University of Alaska Fairbanks", "University of Montana", "Saint Mary's University",
+            "Montana State University", "Lewis University",
+        ])
+        assert matcher.match("St. Mary's University") == [("Saint Mary's University", 1.0)]
+        best = matcher.match("Universty of Montana", limit = 2)
+        assert best[0][0] == "University of Montana" and best[0][1] > 0.8 and best[0][1] > best[1][1]
+        assert all(score < 0.8 for name, score in matcher.match("University of Alaska") if name == "University of Alabama")
+        assert not matcher.match("Completely Unrelated Name", min_score = 0.5)
+
+class TestIngestManifest:
+    """Class containing the tests for the ingest_manifest module."""
+
+    def test_incremental_get_people(self, tmp_path):
+        """Tests that only the new or changed files are parsed again and that the result is the same as a full parse"""
+
+        calls = []
+        def parse_fake_file(filename, year, debug = False, program_filter = None, program_filters = None): # pylint: disable=unused-argument
+            calls.append(os.path.basename(filename))
+            school = institution.Institution("Lewis University", "Romeoville", "IL", 41.6, -88.1)
+            def people(program):
+                return [
+                    person.Person(program, person.Jobs.Student, "Jane", os.path.basename(filename), school, laboratory.Laboratories.ANL, "", year),
+                    person.Person(program, person.Jobs.Faculty, "John", "Roe", None, laboratory.Laboratories.SNL_CA, "Fusion", year),
+                ]
+            return [people(selection[0]) for selection in program_filters] if program_filters is not None else people(program_filter[0])
+
+        for name in ["all.pdf", "other.pdf"]:
+            (tmp_path / name).write_bytes(b"%PDF " + name.encode("utf8"))
+        files = [str(tmp_path / name) for name in ["all.pdf", "other.pdf", "all.pdf"]]
+        types, years = ["SULI", "SULI", "CCI"], [2021, 2020, 2021]
+        process_file_map = {(program, year) : parse_fake_file for program, year in zip(types, years)}
+        path = str(tmp_path / "cache" / "manifest.json")
+
+        full = repr(person.get_people(files, types, years, process_file_map, manifest = ingest_manifest.IngestManifest(path)))
+        assert calls == ["all.pdf", "other.pdf"]
+        assert repr(person.get_people(files, types, years, process_file_map, manifest = ingest_manifest.IngestManifest(path))) == full
+        assert calls == ["all.pdf", "other.pdf"]
+
+        (tmp_path / "other.pdf").write_bytes(b"%PDF changed")
+        manifest = ingest_manifest.IngestManifest(path)
+        assert repr(person.get_people(files, types, years, process_file_map, manifest = manifest)) == full
+        assert calls == ["all.pdf", "other.pdf", "other.pdf"]
+        assert len(manifest.entries) == 3 and len(os.listdir(tmp_path / "cache" / "shards")) == 3
+        assert manifest.entries[ingest_manifest.entry_key(files[2], "CCI", 2021)]["rows"] == 2
+
+        # the people found with different options are not reused
+        assert manifest.get(files[1], 2020, ["SULI"], "parse_fake_file", {"char_engine" : True}) is None
+
+        # nor are the people found with a different version of the layout, of the parsing modules, of the name
+        # resolution, or of the schools
+        assert manifest.get(files[1], 2020, ["SULI"], "parse_fake_file", {}) is not None
+        for name in ["layout", "modules", "resolution", "schools"]:
+            manifest = ingest_manifest.IngestManifest(path)
+            manifest.signatures[("parse_fake_file", 2020, False)] = {**manifest.signature("parse_fake_file", 2020, {}), name : "changed"}
+            assert manifest.get(files[1], 2020, ["SULI"], "parse_fake_file", {}) is None
+
+    def test_signature(self, tmp_path):
+        """Tests that the signatures of a parser include the one of the layout selected by its options"""
+
+        manifest = ingest_manifest.IngestManifest(str(tmp_path / "manifest.json"))
+        parser = pdf_parsers.process_file_table_with_lines_name_institution_laboratory_term.__name__
+        signature = manifest.signature(parser, 2019, {})
+        assert signature["layout"] == pdf_parsers.pdf_layouts["with_lines_term"].signature()
+        assert signature["modules"] == resolution_cache.code_signature(ingest_manifest.result_modules)
+        assert signature["resolution"] == resolution_cache.code_signature()
+        assert signature["schools"] == school_registry.school_registry.school_signature(2019)
+        assert manifest.signature(parser, 2019, {"char_engine" : True})["layout"] == signature["layout"]
+        assert manifest.signature("parse_fake_file", 2019, {})["layout"] is None
+
+        parser = pdf_parsers.process_file_table_no_lines_term_lastname_firstname_institution_laboratory.__name__
+        assert manifest.signature(parser, 2020, {})["layout"] == pdf_parsers.pdf_layouts["no_lines_term"].signature()
+        assert manifest.signature(parser, 2020, {"char_engine" : True})["layout"] == pdf_parsers.pdf_layouts["no_lines_term_chars"].signature()
+
 class TestInstitution:
     """Class containing the tests for the institution module."""
 
@@ -65,20 +277,30 @@ class TestInstitution:
         """Tests the ability to load a database of postsecondary school locations"""
 
         year= 2021
-        inst_name = "NAME"
         schools = institution.load_schools(year)
-        assert schools.iloc[-1][inst_name] == "Zorganics Institute Beauty and Wellness"
+        assert schools.iloc[-1]["name"] == "Zorganics Institute Beauty and Wellness"
+        assert list(schools.columns) == institution.school_schema
 
     def test_append_institutions(self):
         """Tests the ability to append a set of values to the database of postsecondary school locations"""
 
         year = 2021
-        inst_name = "NAME"
         schools = institution.load_schools(year)
-        schools = institution.append_institutions(schools, year, inst_name)
-        school = schools.loc[schools[inst_name].isin(["University of Melbourne"])]
+        schools = institution.append_institutions(schools)
+        school = schools.loc[schools["name"].isin(["University of Melbourne"])]
         assert not school.empty
-        assert school.iloc[0][inst_name] == "University of Melbourne"
+        assert school.iloc[0]["name"] == "University of Melbourne"
+
+    def test_compact_schools(self):
+        """Tests that the appended institutions keep the compact data types of the normalized schema"""
+
+        schools = pd.DataFrame(
+            {"name" : ["Lewis University"], "city" : ["Romeoville"], "state" : ["IL"], "latitude" : [41.6], "longitude" : [-88.1]}
+        )
+        schools = institution.append_institutions(institution.compact_schools(schools))
+        assert str(schools["state"].dtype) == "category" and str(schools["city"].dtype) == "category"
+        assert schools["latitude"].dtype == "float32" and schools["longitude"].dtype == "float32"
+        assert schools["state"].tolist()[:2] == ["IL", "MA"]
 
     def test_institution(self):
         """Tests the Institution class to make sure that it's attributes are set correctly"""
@@ -90,6 +312,17 @@ class TestInstitution:
                inst.latitude == -37.798583273349905 and \
                inst.longitude == 144.96136023807165
 
+    def test_shared_institution(self):
+        """Tests that the people from the same school share one Institution object, even after being pickled"""
+
+        record = ("University of Melbourne", "Melbourne", "Australia", -37.798583273349905, 144.96136023807165)
+        inst = institution.shared_institution(*record)
+        assert institution.shared_institution(*record) is inst
+        assert pickle.loads(pickle.dumps(inst)) is inst
+        assert institution.shared_institution(*record[:-1], 0.0) is not inst
+        with pytest.raises(AttributeError):
+            inst.country = "Australia"
+
     def test_get_institution(self):
         """Tests the ability to form an Insitution object based on the name of the institution"""
 
@@ -99,8 +332,180 @@ class TestInstitution:
         assert inst.name == "University of Melbourne" and \
                inst.city == "Melbourne" and \
                inst.state == "Australia" and \
-               inst.latitude == -37.798583273349905 and \
-               inst.longitude == 144.96136023807165
+               inst.latitude == pytest.approx(-37.798583273349905, abs = 1e-5) and \
+               inst.longitude == pytest.approx(144.96136023807165, abs = 1e-5)
+
+    def test_school_index(self):
+        """Tests that the SchoolIndex maps normalized names to records and includes the appended institutions"""
+
+        schools = pd.DataFrame(
+            {
+                "name" : ["Lewis University", "Ohio State University-Main Campus", "Lewis University"],
+                "city" : ["Romeoville", "Columbus", "Elsewhere"],
+                "state" : ["IL", "OH", "XX"],
+                "latitude" : [41.6, 40.0, 0.0],
+                "longitude" : [-88.1, -83.0, 0.0],
+            }
+        )
+        index = institution.SchoolIndex(schools, 2021)
+        assert index.find("Lewis  University ") == ("Lewis University", "Romeoville", "IL", pytest.approx(41.6), pytest.approx(-88.1))
+        assert "University of Melbourne" in index
+        assert index.find("Unknown College") is None
+        assert index.lookup("Unknown College") is None
+        assert index.lookup("Ohio State University-Main Campus").city == "Columbus"
+
+    def test_get_institution_replaced(self):
+        """Tests that get_institution applies the primary and secondary replacement tables when using a SchoolIndex"""
+
+        schools = pd.DataFrame(
+            {
+                "name" : ["Ohio State University-Main Campus", "CUNY Hostos Community College"],
+                "city" : ["Columbus", "Bronx"],
+                "state" : ["OH", "NY"],
+                "latitude" : [40.0, 40.8],
+                "longitude" : [-83.0, -73.9],
+            }
+        )
+        index = institution.SchoolIndex(schools, 2021)
+        assert institution.get_institution(index, "The Ohio State University Main Campus", 2021).name == "Ohio State University-Main Campus"
+        assert institution.get_institution(index, "Hostos Community College‐City University of New York", 2021).name == \
+               "CUNY Hostos Community College"
+        assert institution.get_institution(index, "Unknown College", 2021) is None
+
+    def test_get_institutions(self):
+        """Tests that the batched lookup returns the same results as calling get_institution on each name"""
+
+        schools = pd.DataFrame(
+            {
+                "name" : ["Ohio State University-Main Campus", "CUNY Hostos Community College", "Lewis University"],
+                "city" : ["Columbus", "Bronx", "Romeoville"],
+                "state" : ["OH", "NY", "IL"],
+                "latitude" : [40.0, 40.8, 41.6],
+                "longitude" : [-83.0, -73.9, -88.1],
+            }
+        )
+        index = institution.SchoolIndex(schools, 2021)
+        names = [
+            "Lewis University", "The Ohio State University Main Campus", "Hostos Community College‐City University of New York",
+            "Unknown College", "Lewis University", "University of Melbourne",
+        ]
+        batch = institution.get_institutions(index, names, 2021)
+        single = [institution.get_institution(index, name, 2021) for name in names]
+        assert [inst.name if inst else None for inst in batch] == [inst.name if inst else None for inst in single]
+        assert batch[3] is None and batch[0].city == "Romeoville"
+        assert not institution.get_institutions(index, [], 2021)
+
+    def test_get_institution_fuzzy(self, capsys):
+        """Tests that get_institution falls back on the fuzzy matcher when all of the replacements fail"""
+
+        schools = pd.DataFrame(
+            {"name" : ["University of Montana"], "city" : ["Missoula"], "state" : ["MT"], "latitude" : [46.9], "longitude" : [-114.0]}
+        )
+        index = institution.SchoolIndex(schools, 2021)
+        assert institution.get_institution(index, "Universty of Montana", 2021).name == "University of Montana"
+        assert index.fuzzy_match("Universty of Montana", limit = 1)[0][0][1] == "Missoula"
+        assert "fuzzy matched" not in capsys.readouterr().out
+        institution.get_institution(index, "Universty of Montana", 2021, debug = True)
+        assert "fuzzy matched" in capsys.readouterr().out
+
+class TestLayoutDetection:
+    """Class containing the tests for the layout_detection module."""
+
+    def test_fingerprint_page(self):
+        """Test that the layout, programs, and year are worked out from the first page"""
+
+        class FakePage: # pylint: disable=too-few-public-methods
+            """Stand-in for a pdfplumber page with some text and, optionally, the ruling lines of a table"""
+            def __init__(self, text, ruled):
+                self.text = text
+                self.edges = [{"orientation" : orientation} for orientation in ["v", "v", "h", "h"]] if ruled else []
+            def extract_text(self):
+                """Return the text of the page"""
+                return self.text
+
+        pages = [
+            ("Summer 2021 Participants\nWDTS Programs\nProgram Name Institution\nVFP Faculty Doe,Jane\nSULI Roe,John", False),
+            ("2020 Visiting Faculty Program (VFP) Faculty\nTerm Last First Institution Lab", False),
+            ("2019 Visiting Faculty Program (VFP) Participants\nVFP FACULTY PARTICIPANT INSTITUTION LABORATORY TERM", True),
+            ("2019 Solicitation 1 Student Research (SCGSR) Awards\nName Institution Host Lab Area", True),
+            ("Participants\nName Institution Host Lab", True),
+        ]
+        fingerprints = [layout_detection.fingerprint_page(FakePage(text, ruled)) for text, ruled in pages]
+        assert fingerprints == [
+            {"layout" : "no_lines_program", "programs" : ["VFP", "SULI"], "year" : 2021},
+            {"layout" : "no_lines_term", "programs" : ["VFP"], "year" : 2020},
+            {"layout" : "with_lines_term", "programs" : ["VFP"], "year" : 2019},
+            {"layout" : "with_lines_area", "programs" : ["SCGSR"], "year" : 2019},
+            {"layout" : "with_lines_term", "programs" : [], "year" : None},
+        ]
+
+    def test_plan_input_files(self, tmp_path, monkeypatch):
+        """Test that directories are expanded and that a detected multi-program file is requested once per program"""
+
+        for name in ["WDTS-SULI-CCI-Summer-2021.pdf", "VFP-2019.pdf", "notes.txt"]:
+            (tmp_path / name).write_bytes(b"")
+        fingerprints = {
+            "WDTS-SULI-CCI-Summer-2021.pdf" : {"layout" : "no_lines_program", "programs" : ["SULI", "CCI"], "year" : 2021},
+            "VFP-2019.pdf" : {"layout" : "with_lines_area", "programs" : ["VFP"], "year" : 2019},
+        }
+        monkeypatch.setattr(layout_detection, "detect_layout", lambda filename: fingerprints[os.path.basename(filename)])
+
+        files, types, years, process_file_map = layout_detection.plan_input_files([str(tmp_path)])
+        assert [os.path.basename(filename) for filename in files] == ["VFP-2019.pdf"] + ["WDTS-SULI-CCI-Summer-2021.pdf"] * 2
+        assert types == ["VFP", "SULI", "CCI"] and years == [2019, 2021, 2021]
+        # the layout known to be used by the VFP files of 2019 wins over the detected one
+        assert process_file_map[("VFP", 2019)] is layout_detection.layout_parsers["with_lines_term"]
+        assert process_file_map[("CCI", 2021)] is layout_detection.layout_parsers["no_lines_program"]
+
+        files = [str(tmp_path / "notes.txt"), str(tmp_path / "VFP-2019.pdf")]
+        files, types, years, _ = layout_detection.plan_input_files(files, years = [None, 2018])
+        assert types == [None, "VFP"] and years == [None, 2018]
+        with pytest.raises(ValueError):
+            layout_detection.plan_input_files([str(tmp_path)], types = ["VFP"])
+
+        # the first page isn't read when the layout of the given program and year is known
+        def fail(filename):
+            raise AssertionError(f"{filename} shouldn't be fingerprinted")
+        monkeypatch.setattr(layout_detection, "detect_layout", fail)
+        files = [str(tmp_path / "VFP-2019.pdf")]
+        _, _, _, process_file_map = layout_detection.plan_input_files(files, types = ["SCGSR"], years = [2019])
+        assert process_file_map == {("SCGSR", 2019) : layout_detection.layout_parsers["with_lines_area"]}
+
+        # two files of the same program and year can't use different parsers
+        (tmp_path / "VFP-2030.pdf").write_bytes(b"")
+        (tmp_path / "VFP-2030-ruled.pdf").write_bytes(b"")
+        fingerprints = {
+            "VFP-2030.pdf" : {"layout" : "no_lines_term", "programs" : ["VFP"], "year" : 2030},
+            "VFP-2030-ruled.pdf" : {"layout" : "with_lines_term", "programs" : ["VFP"], "year" : 2030},
+        }
+        monkeypatch.setattr(layout_detection, "detect_layout", lambda filename: fingerprints[os.path.basename(filename)])
+        with pytest.raises(ValueError):
+            layout_detection.plan_input_files([str(tmp_path / name) for name in fingerprints])
+
+    def test_detect_layout_cache(self, tmp_path, monkeypatch):
+        """Test that the first page of a file is only read again when the file changes"""
+
+        class FakePDF:
+            """Stand-in for a pdfplumber PDF counting the number of times it is opened"""
+            opened = 0
+            def __init__(self, filename):
+                FakePDF.opened += 1
+                self.pages = [filename]
+            def __enter__(self):
+                return self
+            def __exit__(self, *args):
+                return False
+
+        monkeypatch.setattr(layout_detection.pdfplumber, "open", FakePDF)
+        monkeypatch.setattr(layout_detection, "detected_layouts", {})
+        monkeypatch.setattr(layout_detection, "fingerprint_page", lambda page: {"layout" : "no_lines_term", "programs" : [], "year" : None})
+        path = tmp_path / "SULI-2020.pdf"
+        path.write_bytes(b"")
+        fingerprint = {"layout" : "no_lines_term", "programs" : ["SULI"], "year" : 2020}
+        assert layout_detection.detect_layout(str(path)) == fingerprint
+        assert layout_detection.detect_layout(str(path)) == fingerprint and FakePDF.opened == 1
+        path.write_bytes(b"changed")
+        assert layout_detection.detect_layout(str(path)) == fingerprint and FakePDF.opened == 2
 
 class TestLaboratory:
     """Class containing the tests for the laboratory module."""
@@ -145,11 +550,125 @@ class TestLaboratory:
         assert laboratory.Laboratories.list_values()[0].name == \
                laboratory.Laboratory("Ames National Laboratory","AMES","Ames","IA",42.02997,-93.648319).name
 
+    def test_laboratories_pickle(self):
+        """Tests that the laboratories survive being sent to another process"""
+
+        assert pickle.loads(pickle.dumps(laboratory.Laboratories.BNL)) is laboratory.Laboratories.BNL
+
+    def test_laboratories_resolve(self):
+        """Tests that the different spellings of the host laboratories found in the PDF files are resolved"""
+
+        resolve = laboratory.Laboratories.resolve
+        assert resolve("Argonne National Laboratory (ANL)") is laboratory.Laboratories.ANL
+        assert resolve("Argonne National\nLaboratory (") is laboratory.Laboratories.ANL
+        assert resolve(" GA / DIII-D") is resolve("General Atomics") is laboratory.Laboratories.GA_DIII_D
+        assert resolve("Thomas Jefferson National Accelerator Facility (TJNA") is laboratory.Laboratories.TJNAF
+        assert resolve("Sandia\xa0National\xa0Laboratories (SNL)", "Mills College") is laboratory.Laboratories.SNL_CA
+        assert resolve("SNL", "Lewis University") is laboratory.Laboratories.SNL_NM
+        assert resolve("SNL CA", "Lewis University") is laboratory.Laboratories.SNL_CA
+        with pytest.raises(KeyError):
+            resolve("Acme Laboratory")
+
+class TestPageCache:
+    """Class containing the tests for the page_cache module."""
+
+    def test_page_cache(self, tmp_path):
+        """Tests storing and retrieving the rows of the pages of a file, including a file which is only partly cached"""
+
+        cache = page_cache.PageCache(str(tmp_path / "pages.sqlite"))
+        assert cache.get("digest", "layout") == (None, None, {})
+
+        cache.put("digest", "layout", {"program" : "SULI", "job" : "Student"}, 3, {0 : [["a", None]], 2 : [["b", "c"]]})
+        cache.put("digest", "layout", {"program" : "SULI", "job" : "Student"}, 3, {1 : []})
+        assert cache.get("digest", "layout") == ({"program" : "SULI", "job" : "Student"}, 3, {0 : [["a", None]], 1 : [], 2 : [["b", "c"]]})
+        assert cache.get("digest", "other layout") == (None, None, {})
+
+        cache.enabled = False
+        assert cache.get("digest", "layout") == (None, None, {})
+        cache.close()
+
+class TestPageExtraction:
+    """Class containing the tests for the page_extraction module."""
+
+    def test_cached_iter_pages(self, tmp_path, monkeypatch):
+        """Tests that a file whose pages are all cached is never opened"""
+
+        filename = tmp_path / "participants.pdf"
+        filename.write_bytes(b"not really a pdf")
+        cache = page_cache.PageCache(str(tmp_path / "pages.sqlite"))
+        monkeypatch.setattr(page_extraction, "page_cache", cache)
+
+        layout = pdf_parsers.pdf_layouts["with_lines_area"]
+        cache.put(page_cache.file_digest(str(filename)), layout.signature(), {"program" : "SCGSR", "job" : "Student"}, 2,
+                  {0 : [["NAME"]], 1 : [["Jane Doe"]]})
+        header = {"program" : "SCGSR", "job" : "Student"}
+        assert list(page_extraction.iter_pages(layout, str(filename))) == [(header, 0, [["NAME"]]), (header, 1, [["Jane Doe"]])]
+        cache.close()
+
+    def test_page_chunks(self):
+        """Test that the pages are split into contiguous chunks which cover every page once"""
+
+        chunks = page_extraction.page_chunks(list(range(1, 12)), 2)
+        assert [page for chunk in chunks for page in chunk] == list(range(1, 12))
+        assert len(chunks) == 6 and all(len(chunk) <= 2 for chunk in chunks)
+        assert page_extraction.page_chunks([1], 8) == [[1]]
+
+    def test_iter_page_range(self, monkeypatch):
+        """Test that only the requested pages are loaded and that each page and the file are closed once extracted"""
+
+        closed = []
+        class FakePage: # pylint: disable=too-few-public-methods
+            """Stand-in for a pdfplumber page which records when it's closed"""
+            def __init__(self, page_number):
+                self.page_number = page_number
+            def close(self):
+                """Record that the page was closed"""
+                closed.append(self.page_number - 1)
+
+        class FakePDF:
+            """Stand-in for a pdfplumber document containing only the requested pages"""
+            def __init__(self, filename, pages): # pylint: disable=unused-argument
+                self.pages = [FakePage(page_number) for page_number in pages]
+            def __enter__(self):
+                return self
+            def __exit__(self, *args):
+                closed.append("file")
+
+        monkeypatch.setattr(page_extraction.pdfplumber, "open", FakePDF)
+        pages = page_extraction.iter_page_range("participants.pdf", lambda page, ipage: [[str(ipage)], list(closed)], [3, 5])
+        assert next(pages) == [["3"], []]
+        assert closed == [3]
+        assert list(pages) == [[["5"], [3]]]
+        assert closed == [3, 5, "file"]
+
 class TestPDFParsers:
     """Class containing the tests for the pdf_parsers module."""
 
     # pylint: disable=C0103
 
+    def test_no_lines_term_title_split_into_cells(self):
+        """Test that a title whose word gaps line up with the column gaps is read as the header and not as a person"""
+
+        def line(*cells):
+            return "".join(cell.ljust(width) for cell, width in zip(cells, [14, 12, 12, 24, 10]))
+
+        people = [("Doe", "Jane", "Lewis University", "ANL"), ("Roe", "John", "Mills College", "BNL"), ("Smith", "Ann", "Ohio University", "ORNL")]
+        lines = [line("2020", "Visiting", "Faculty", "Program (VFP)", "Faculty"), line("Term", "Last Name", "First Name", "Institution", "Host Lab")]
+        lines += [line("Summer 2020", *person) for person in people * 3] + [line("", "", "3")]
+        page = TestCharColumns.FakePage(lines)
+        layout = pdf_parsers.pdf_layouts["no_lines_term_chars"]
+        rows = layout.row_extractor(layout.learn_columns(page))(page, 0)
+        assert len(rows[0]) > 1
+
+        header = pdf_parsers.read_header_no_lines_term(page, rows)
+        assert header == {"program" : "VFP", "job" : "Faculty"}
+        entries = pdf_parsers.create_entries_no_lines_term(rows, 0, 2020, header)
+        assert [(entry["last_name"], entry["first_name"]) for entry in entries] == [person[:2] for person in people * 3]
+        assert entries[2]["host_doe_laboratory"] == laboratory.Laboratories.ORNL
+
+        # the column headers repeated on the following pages are removed as well
+        assert len(pdf_parsers.create_entries_no_lines_term(rows[1:], 1, 2020, header)) == 9
+
     def test_handle_known_issues_parsing_input(self):
         """Test the ability of the handle_known_issues_parsing_input() function to return the correct values"""
 
@@ -169,6 +688,74 @@ class TestPDFParsers:
         year = 2021
         assert pdf_parsers.handle_known_issues_parsing_input(lines = lines, year = year) == lines_fixed
 
+    @staticmethod
+    def write_ruled_pdf(path, pages, columns = (100, 200, 300, 400), height = 792):
+        """Write a minimal PDF file containing one ruled table per page, below an optional title
+
+        Each page is a (title, top, rows) tuple, where top is the distance from the top of the page to the table.
+        """
+
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+        for title, top, rows in pages:
+            tops = [height - top - 20 * irow for irow in range(len(rows) + 1)]
+            stream = [f"{columns[0]} {y} m {columns[-1]} {y} l S" for y in tops]
+            stream += [f"{x} {tops[0]} m {x} {tops[-1]} l S" for x in columns]
+            texts = [(columns[0], height - 40, title)] if title else []
+            texts += [(x + 5, y - 14, cell) for y, row in zip(tops, rows) for x, cell in zip(columns, row)]
+            stream += [f"BT /F1 10 Tf {x} {y} Td ({text}) Tj ET" for x, y, text in texts]
+            stream = "\n".join(stream)
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 {height}] /Resources << /Font << /F1 3 0 R >> >> "
+                           f"/Contents {len(objects) + 2} 0 R >>")
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        kids = " ".join(f"{iobject} 0 R" for iobject in range(4, len(objects) + 1, 2))
+        objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>"
+
+        content, offsets = "%PDF-1.4\n", []
+        for iobject, body in enumerate(objects):
+            offsets.append(len(content))
+            content += f"{iobject + 1} 0 obj\n{body}\nendobj\n"
+        xref = len(content)
+        content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+        content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+        path.write_bytes(content.encode("latin-1"))
+
+    def test_learn_table_geometry(self, tmp_path):
+        """Test that the geometry of the table is learned from the first page and used to extract the following pages"""
+
+        first = [["Name", "Institution", "Laboratory"], ["Doe, Jane", "Lewis University", "ANL"]]
+        second = [["Roe, John", "Mills College", "BNL"], ["Smith, Ann", "Ohio University", "ORNL"]]
+        path = tmp_path / "ruled.pdf"
+        self.write_ruled_pdf(path, [("Science Graduate Student Research (SCGSR)", 100, first), (None, 30, second)])
+
+        with pdf_parsers.pdfplumber.open(path) as pdf:
+            geometry, rows = pdf_parsers.learn_table_geometry(pdf.pages[0])
+            assert geometry["columns"] == pytest.approx([100, 200, 300, 400])
+            assert geometry["bbox"] == pytest.approx([100, 100, 400, 140])
+            assert rows == first
+
+            # the table of the second page starts higher than the one of the first page
+            assert pdf_parsers.extract_rows_with_lines(pdf.pages[1], 1, columns = geometry) == second
+            assert pdf_parsers.extract_rows_with_lines(pdf.pages[1], 1) == second
+
+            layout = pdf_parsers.pdf_layouts["with_lines_area"]
+            header, rows = layout.read_first_page(pdf.pages[0])
+            assert rows == first and header["columns"] == geometry
+            assert pdf_parsers.learn_table_geometry(pdf.pages[0].crop((0, 0, 612, 50))) == (None, [])
+
+    def test_create_entries_with_lines_area(self):
+        """Test that the rows of each page are turned into entries using the header read from the first page"""
+
+        header = {"program" : "SCGSR", "job" : "Student"}
+        pages = [
+            [["NAME", "INSTITUTION", "LABORATORY", "AREA"], ["Jane Q Doe", "Lewis\nUniversity", "Argonne (ANL)", "High Energy\nPhysics"]],
+            [["John Roe", "Mills College", "Sandia National Laboratories (SNL)", "Fusion"]],
+        ]
+        entries = [entry for ipage, rows in enumerate(pages) for entry in pdf_parsers.create_entries_with_lines_area(rows, ipage, 2015, header)]
+        assert [(entry["first_name"], entry["last_name"], entry["home_institution"]) for entry in entries] == \
+               [("Jane Q", "Doe", "Lewis University"), ("John", "Roe", "Mills College")]
+        assert entries[0]["host_doe_laboratory"] == laboratory.Laboratories.ANL and entries[0]["topic"] == "High EnergyPhysics"
+        assert entries[1]["host_doe_laboratory"] == laboratory.Laboratories.SNL_CA and entries[1]["program"] == "SCGSR"
+
     def test_process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic(self):
         """Test the process_file_table_no_lines_program_lastfirstname_institution_laboratory_topic() function to parse the 2021 WDTS input file"""
 
@@ -232,6 +819,61 @@ class TestPDFParsers:
         )
         assert people[0].participant() == ref_people[0].participant() and people[-1].participant() == ref_people[-1].participant()
 
+class TestPeopleTable:
+    """Class containing the tests for the people_table module."""
+
+    @staticmethod
+    def make_people():
+        """Return a list of people with and without a known home institution, job, and topic"""
+
+        school = institution.shared_institution("University of Melbourne", "Melbourne", "Australia", -37.798583273349905, 144.96136023807165)
+        return [
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", school, laboratory.Laboratories.ANL, "HEP", 2020),
+            person.Person("VFP", person.Jobs.Faculty, "john", "doe", None, laboratory.Laboratories.SNL_NM, "", 2021),
+            person.Person("SULI", "", "jim", "roe", school, laboratory.Laboratories.BNL, "Biology", 2020),
+            person.Person("SULI", person.Jobs.Faculty, "joan", "roe", school, laboratory.Laboratories.BNL, "High Energy Physics", 2020),
+        ]
+
+    def test_people_table(self):
+        """Tests that a PeopleTable gives back the same people and stores the institution coordinates as float arrays"""
+
+        people = self.make_people()
+        table = people_table.PeopleTable.from_people(people)
+        assert len(table) == 4
+        assert [repr(jane) for jane in table.to_people()] == [repr(jane) for jane in people]
+        assert table.to_people()[0].home_institution is people[0].home_institution
+        assert table.data["latitude"].dtype == float and table.data["latitude"].isna().tolist() == [False, True, False, False]
+        assert table.data["program"].dtype == "category" and table.data["year"].dtype == "category"
+        assert table.count_by("program").to_dict() == {"SULI" : 3, "VFP" : 1}
+        assert table.laboratory_coordinates()[0][0] == laboratory.Laboratories.ANL.value.longitude
+
+        nobody = person.Person("SULI", person.Jobs.Student, "jim", "roe", None, None, "", 2020)
+        unknown = people_table.PeopleTable.from_people([nobody])
+        assert unknown.to_people()[0].host_doe_laboratory is None and np.isnan(unknown.laboratory_coordinates()[0][0])
+
+        combined = people_table.PeopleTable.concat([table, table[1:3]])
+        assert [jane.first_name for jane in combined.to_people()] == ["jane", "john", "jim", "joan", "john", "jim"]
+        assert combined.data["year"].dtype == "category" and isinstance(combined.to_people()[-1].year, int)
+
+        # the rows are Person objects when the table is indexed by an integer or iterated over
+        assert [repr(jane) for jane in table] == [repr(jane) for jane in people]
+        assert repr(table[1]) == repr(people[1]) and repr(table[-1]) == repr(people[-1])
+        with pytest.raises(IndexError):
+            table[4] # pylint: disable=pointless-statement
+
+    def test_people_table_filter(self):
+        """Tests that the vectorized filter and sort select the same people as filter_people_by_topic and sort_people"""
+
+        people = self.make_people()[:2] + self.make_people()[3:]
+        table = people_table.PeopleTable.from_people(people)
+        for strict in [False, True]:
+            expected = utilities.filter_people_by_topic(people, strict = strict, topics = ["HEP", "High Energy Physics"])
+            selected = table.filter_by_topic(strict = strict, topics = ["HEP", "High Energy Physics"])
+            assert [repr(jane) for jane in selected.to_people()] == [repr(jane) for jane in expected]
+        assert [repr(jane) for jane in table.sort_by_job().to_people()] == [repr(jane) for jane in person.sort_people(people)]
+        with pytest.raises(TypeError):
+            table.filter_by_topic(topics = "HEP")
+
 class TestPerson:
     """Class containing the tests for the person module."""
 
@@ -257,6 +899,273 @@ class TestPerson:
                jane.year == 9999
         assert jane.participant() == "doe, jane"
 
+    @staticmethod
+    def parse_fake_file(filename, year, debug = False, program_filter = None): # pylint: disable=unused-argument
+        """Stand-in for a pdf parser which returns one person per file"""
+
+        return [person.Person(program_filter[0], person.Jobs.Student, "jane", os.path.basename(filename), None, None, "", year)]
+
+    def test_get_people_jobs(self):
+        """Tests that parsing the files in a pool of processes gives the same people, in the same order, as a serial run"""
+
+        files = [f"file{ifile}.pdf" for ifile in range(4)]
+        types = ["SULI", "VFP", "SULI", "CCI"]
+        years = [2021, 2020, 2019, 2021]
+        process_file_map = {(program, year) : self.parse_fake_file for program, year in zip(types, years)}
+        serial = person.get_people(files, types, years, process_file_map)
+        parallel = person.get_people(files, types, years, process_file_map, jobs = 3)
+        assert [repr(jane) for jane in parallel] == [repr(jane) for jane in serial]
+        assert [jane.last_name for jane in parallel] == files
+
+    @staticmethod
+    def parse_fake_file_page_jobs(filename, year, debug = False, program_filter = None, page_jobs = 1): # pylint: disable=unused-argument
+        """Stand-in for a pdf parser which stores the number of page processes it was given in the topic"""
+
+        return [person.Person(program_filter[0], person.Jobs.Student, "jane", os.path.basename(filename), None, None, str(page_jobs), year)]
+
+    def test_get_people_page_jobs(self, monkeypatch):
+        """Tests that the page processes of the files parsed in parallel are capped by the number of CPUs"""
+
+        monkeypatch.setattr(person.os, "cpu_count", lambda: 8)
+        files = [f"file{ifile}.pdf" for ifile in range(4)]
+        process_file_map = {("SULI", 2021) : self.parse_fake_file_page_jobs}
+        people = person.get_people(files, ["SULI"] * 4, [2021] * 4, process_file_map, jobs = 4, page_jobs = 8)
+        assert [jane.topic for jane in people] == ["2"] * 4
+        people = person.get_people(files, ["SULI"] * 4, [2021] * 4, process_file_map, page_jobs = 8)
+        assert [jane.topic for jane in people] == ["8"] * 4
+
+    def test_get_people_grouped(self):
+        """Tests that a file requested for several programs is parsed once and split up by program"""
+
+        calls = []
+        def parse_combined_file(filename, year, debug = False, program_filter = None, program_filters = None): # pylint: disable=unused-argument
+            calls.append(filename)
+            if program_filters is not None:
+                return [[person.Person(selection[0], person.Jobs.Student, "jane", filename, None, None, "", year)] for selection in program_filters]
+            return [person.Person(program_filter[0], person.Jobs.Student, "jane", filename, None, None, "", year)]
+
+        files = ["all.pdf", "other.pdf", "all.pdf", "all.pdf"]
+        types = ["SULI", "SULI", "CCI", "VFP"]
+        process_file_map = {(program, 2021) : parse_combined_file for program in types}
+        people = person.get_people(files, types, [2021] * 4, process_file_map)
+        assert sorted(calls) == ["all.pdf", "other.pdf"]
+        assert [(jane.program, jane.last_name) for jane in people] == list(zip(types, files))
+
+    def test_iter_people(self):
+        """Tests that the people are streamed file by file, in the order of the files, and can be sorted at the end"""
+
+        def stream_fake_file(filename, year, debug = False, program_filter = None, stream = False): # pylint: disable=unused-argument
+            assert stream
+            for job in [person.Jobs.Student, person.Jobs.Faculty]:
+                yield person.Person(program_filter[0], job, "jane", filename, None, None, "", year)
+
+        files = ["first.pdf", "second.pdf"]
+        process_file_map = {("SULI", 2021) : stream_fake_file, ("VFP", 2020) : stream_fake_file}
+        people = person.iter_people(files, ["SULI", "VFP"], [2021, 2020], process_file_map)
+        assert next(people).last_name == "first.pdf"
+        people = [next(people)] + list(people)
+        assert [(jane.last_name, jane.job.name) for jane in people] == \
+               [("first.pdf", "Faculty"), ("second.pdf", "Student"), ("second.pdf", "Faculty")]
+        assert [(jane.last_name, jane.job.name) for jane in person.sort_people(people)] == \
+               [("first.pdf", "Faculty"), ("second.pdf", "Faculty"), ("second.pdf", "Student")]
+
+    def test_save_people_npz(self, tmp_path):
+        """Tests that the people saved to a NumPy archive are read back identically, sharing their institutions"""
+
+        school = institution.shared_institution("University of Melbourne", "Melbourne", "Australia", -37.798583273349905, 144.96136023807165)
+        people = [
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", school, laboratory.Laboratories.ANL, "HEP", 2020),
+            person.Person("VFP", "", "john", "doe", None, laboratory.Laboratories.SNL_NM, "", 2021),
+            person.Person("SULI", person.Jobs.Faculty, "joan", "roe", school, laboratory.Laboratories.BNL, "High Energy Physics", 2020),
+        ]
+        arguments = MagiConfig()
+        arguments.files, arguments.types, arguments.years = ["all.pdf", "all.pdf"], ["SULI", "VFP"], [2020, 2021]
+        arguments.output_path, arguments.save_format = str(tmp_path), "npz"
+        person.save_people(arguments, people)
+
+        filename = glob.glob(str(tmp_path / "*_people_v0.npz"))[0]
+        people_read = person.get_people([filename], [None], [None], {})
+        assert [repr(jane) for jane in people_read] == [repr(jane) for jane in people]
+        assert people_read[0].home_institution is people_read[2].home_institution
+        assert people_read[0].job is person.Jobs.Student and isinstance(people_read[1].year, int)
+
+    def test_write_people_jsonl(self, tmp_path):
+        """Tests that the people are written to a JSON Lines file one at a time, can be appended to, and are read back lazily"""
+
+        school = institution.shared_institution("University of Melbourne", "Melbourne", "Australia", -37.798583273349905, 144.96136023807165)
+        people = [
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", school, laboratory.Laboratories.ANL, "HEP", 2020),
+            person.Person("VFP", person.Jobs.Faculty, "john", "doe", None, laboratory.Laboratories.SNL_NM, "", 2021),
+        ]
+        arguments = MagiConfig()
+        arguments.files, arguments.types, arguments.years = ["all.pdf"], ["SULI"], [2020]
+        filename = str(tmp_path / "people.jsonl")
+        assert person.write_people_jsonl(filename, arguments, (jane for jane in people)) == 2
+        assert person.write_people_jsonl(filename, arguments, people[:1], append = True) == 1
+
+        people_read = person.iter_people_jsonl(filename)
+        assert repr(next(people_read)) == repr(people[0])
+        assert [repr(jane) for jane in people_read] == [repr(jane) for jane in people[1:] + people[:1]]
+        # get_people drops the person appended a second time
+        people_read = person.get_people([filename], [None], [None], {})
+        assert [repr(jane) for jane in people_read] == [repr(jane) for jane in people]
+        assert people_read[0].home_institution is school
+
+    def test_get_people_merge_saved(self, tmp_path):
+        """Tests that several saved lists of people are merged with the parsed people, dropping the duplicates"""
+
+        school = institution.shared_institution("University of Melbourne", "Melbourne", "Australia", -37.798583273349905, 144.96136023807165)
+        people = [
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", school, laboratory.Laboratories.ANL, "HEP", 2021),
+            person.Person("SULI", person.Jobs.Student, "john", "doe", school, laboratory.Laboratories.ANL, "HEP", 2021),
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", school, laboratory.Laboratories.BNL, "HEP", 2021),
+            person.Person("SULI", person.Jobs.Student, "jane", "doe", None, laboratory.Laboratories.ANL, "HEP", 2021),
+        ]
+        arguments = MagiConfig()
+        arguments.files, arguments.types, arguments.years = ["all.pdf"], ["SULI"], [2021]
+        person.write_people(str(tmp_path / "first.txt"), arguments, people[:2])
+        person.write_people_jsonl(str(tmp_path / "second.jsonl"), arguments, people[1:] + people[1:2])
+
+        def parse_fake_file(filename, year, debug = False, program_filter = None): # pylint: disable=unused-argument
+            return [people[0], people[0]]
+
+        files = ["fake.pdf", str(tmp_path / "first.txt"), str(tmp_path / "second.jsonl")]
+        merged = person.get_people(files, ["SULI", None, None], [2021, None, None], {("SULI", 2021) : parse_fake_file})
+        assert [repr(jane) for jane in merged] == [repr(jane) for jane in [people[0], people[0], people[1], people[2], people[3]]]
+
+class TestResolutionCache:
+    """Class containing the tests for the resolution_cache module."""
+
+    def test_resolution_cache(self, tmp_path):
+        """Tests storing, retrieving, and pruning the cached resolutions"""
+
+        cache = resolution_cache.ResolutionCache(str(tmp_path / "resolutions.sqlite"))
+        record = ("Lewis University", "Romeoville", "IL", 41.6, -88.1)
+        cache.put_many({"Lewis University" : record, "Unknown College" : None}, "v1", 2021)
+        assert cache.get_many(["Lewis University", "Unknown College", "Howard University"], "v1", 2021) == \
+               {"Lewis University" : record, "Unknown College" : None}
+        assert not cache.get_many(["Lewis University"], "v1", 2020)
+        assert not cache.get_many(["Lewis University"], "v2", 2021)
+
+        cache.prune("v2", 2021)
+        assert not cache.get_many(["Lewis University"], "v1", 2021)
+        cache.close()
+
+    def test_cached_get_institutions(self, tmp_path):
+        """Tests that get_institutions stores its resolutions and reuses them for the same version of the schools"""
+
+        schools = pd.DataFrame(
+            {"name" : ["Lewis University"], "city" : ["Romeoville"], "state" : ["IL"], "latitude" : [41.6], "longitude" : [-88.1]}
+        )
+        cache = resolution_cache.ResolutionCache(str(tmp_path / "resolutions.sqlite"))
+        index = institution.SchoolIndex(schools, 2021, version = "v1")
+        index.resolution_cache = cache
+        assert institution.get_institutions(index, ["Lewis University", "Unknown College"], 2021)[1] is None
+        assert cache.get_many(["Lewis University", "Unknown College"], "v1", 2021) == \
+               {"Lewis University" : ("Lewis University", "Romeoville", "IL", pytest.approx(41.6), pytest.approx(-88.1)), "Unknown College" : None}
+
+        # a cached resolution is used even when the school is no longer in the index
+        index.records.clear()
+        assert institution.get_institution(index, "Lewis University", 2021).city == "Romeoville"
+        cache.close()
+
+class TestRowRepairs:
+    """Class containing the tests for the row_repairs module."""
+
+    def test_compile_repairs(self):
+        """Tests that each year gets its own rules, in order, followed by the rules for every year"""
+
+        rules = [(2020, "a", "fix_a"), (None, "b", "fix_b"), (2021, "c", "fix_c"), (2020, "d", "fix_d")]
+        table = row_repairs.compile_repairs(rules)
+        assert table == {None : [("b", "fix_b")], 2020 : [("a", "fix_a"), ("b", "fix_b"), ("d", "fix_d")], 2021 : [("b", "fix_b"), ("c", "fix_c")]}
+
+    def test_repair_rows(self):
+        """Tests that only the first matching rule of the year is applied to each row"""
+
+        lines = [
+            ["SULI", "Doe, Jane", "Lewis University", "Thomas Jefferson National Accelerator Facility (TJNAF)Nuclear Physics"],
+            ["Vazquez Olivas Maria", "Lewis University", "FNAL"],
+            ["Roe", "John", "Mills College ANL"],
+            ["Doe", "Jane", "Lewis University", "FNAL"],
+        ]
+        assert row_repairs.repair_rows([list(line) for line in lines], 2019) == [
+            ["SULI", "Doe, Jane", "Lewis University", "Thomas Jefferson National Accelerator Facility (TJNAF)", "F)Nuclear Physics"],
+        ] + lines[1:]
+        assert row_repairs.repair_rows([list(line) for line in lines[1:]], 2020) == [
+            ["Vazquez Olivas", "Maria", "Lewis University", "FNAL"],
+            ["Roe", "John", "Mills College", "ANL"],
+            ["Doe", "Jane", "Lewis University", "FNAL"],
+        ]
+
+class TestSchoolCache:
+    """Class containing the tests for the school_cache module."""
+
+    def test_load_cached_table(self, tmp_path):
+        """Tests that a shapefile is cached on first use, read back from the cache, and refreshed when the source changes"""
+
+        filename = str(tmp_path / "schools.shp")
+        schools = gpd.GeoDataFrame(
+            {"NAME" : ["Lewis University", "Howard University"], "CITY" : ["Romeoville", None], "EXTRA" : [1, 2]},
+            geometry = gpd.points_from_xy([-88.1, -77.0], [41.6, 38.9]),
+            crs = "EPSG:4269",
+        )
+        schools["LAT"] = [41.6, 38.9]
+        schools.to_file(filename)
+
+        table = school_cache.load_cached_table(filename, ["NAME", "CITY", "LAT"])
+        cache_file = school_cache.cache_filename(filename)
+        assert os.path.exists(cache_file)
+        assert list(table.columns) == ["NAME", "CITY", "LAT"]
+
+        cached = school_cache.read_cache(cache_file, school_cache.source_signature(filename))
+        assert cached["NAME"].tolist() == ["Lewis University", "Howard University"]
+        assert cached["CITY"].tolist() == ["Romeoville", ""]
+        assert cached["LAT"].tolist() == [41.6, 38.9]
+
+        schools["NAME"] = ["Lewis University", "Howard University (DC)"]
+        schools.to_file(filename)
+        assert school_cache.read_cache(cache_file, school_cache.source_signature(filename)) is None
+        assert school_cache.load_cached_table(filename, ["NAME", "CITY", "LAT"])["NAME"].tolist()[-1] == "Howard University (DC)"
+
+class TestSchoolRegistry:
+    """Class containing the tests for the school_registry module."""
+
+    def test_school_registry(self, monkeypatch):
+        """Tests that each year is loaded once and that the least recently used year is evicted when over the memory cap"""
+
+        loaded = []
+        def fake_load_schools(year, use_cache = True): # pylint: disable=unused-argument
+            loaded.append(year)
+            return pd.DataFrame({"name" : [f"College {year}"], "city" : ["City"], "state" : ["ST"], "latitude" : [1.0], "longitude" : [2.0]})
+        monkeypatch.setattr(school_registry, "load_schools", fake_load_schools)
+        monkeypatch.setattr(school_registry, "available_school_years", lambda: [2018, 2019, 2020])
+
+        registry = school_registry.SchoolRegistry(use_cache = False)
+        assert registry.get(2018) is registry.get(2018)
+        assert loaded == [2018]
+
+        registry.max_memory = int(2.5 * registry.memory_usage())
+        registry.get(2019)
+        registry.get(2018)
+        registry.get(2020)
+        assert list(registry.indexes) == [2018, 2020]
+        assert loaded == [2018, 2019, 2020]
+        assert registry.memory_usage() <= registry.max_memory
+
+        # the cross-year records count towards the memory cap, but they're only shrunk when a new year is loaded
+        registry.cross_year().build()
+        assert loaded == [2018, 2019, 2020, 2019]
+        assert registry.memory_usage() == sum(registry.sizes.values()) + registry.cross_year_index.memory_usage() > registry.max_memory
+        registry.get(2020)
+        assert registry.cross_year_index.complete
+        registry.get(2019)
+        assert list(registry.indexes) == [2020, 2019] and not registry.cross_year_index.complete
+        assert registry.memory_usage() <= registry.max_memory
+
+        # the dropped names are found again
+        assert registry.cross_year_index.find("College 2018", 2019)[0] == 2018
+        assert registry.cross_year_index.complete and loaded == [2018, 2019, 2020, 2019, 2019, 2018]
+
 class TestUtilities:
     """Class containing the tests for the utilities module."""
 
@@ -309,6 +1218,18 @@ class TestUtilities:
         filename = utilities.get_formatted_filename("", "test_file_name", "txt")
         assert filename == expected
 
+    def test_get_peak_memory_usage(self):
+        """Tests that the peak memory use of the process is reported in MB"""
+
+        peak, peak_children = utilities.get_peak_memory_usage()
+        assert peak is None or (1 < peak < 1024 * 1024 and peak_children >= 0)
+
+    def test_intern_string(self):
+        """Tests that equal strings are interned to the same object and that the other values are unchanged"""
+
+        assert utilities.intern_string("".join(["Phys", "ics"])) is utilities.intern_string("Physics")
+        assert utilities.intern_string(None) is None
+
 class TestWDTSscraper:
     """This section covers the integration tests.
     These tests will make sure that all of the code works in harmony.